@@ -0,0 +1,190 @@
+import math
+
+import numpy as np
+
+
+def align_frame(price_frame, field='close', symbols=None):
+    """
+    Aligns one PriceFrame field into a (dates x symbols) matrix.
+
+    Args:
+        price_frame (PriceFrame): Per-symbol columns.
+        field (str): Column to align (default: 'close').
+        symbols (list of str, optional): Column order (default: the frame's symbols).
+
+    Returns:
+        tuple: (dates as datetime64[D] array, list of symbols, float64 matrix with NaN where a
+            symbol has no bar on a date).
+    """
+    symbols = [s for s in (symbols or price_frame.symbols) if s in price_frame]
+    if not symbols:
+        return np.empty(0, dtype='datetime64[D]'), [], np.empty((0, 0))
+    dates = np.unique(np.concatenate([price_frame[s]['date'] for s in symbols]))
+    matrix = np.full((len(dates), len(symbols)), np.nan)
+    for j, symbol in enumerate(symbols):
+        columns = price_frame[symbol]
+        matrix[np.searchsorted(dates, columns['date']), j] = columns[field]
+    return dates, symbols, matrix
+
+
+def _forward_fill_index(mask):
+    # For every cell, the row index of the latest True at or above it in the same column (-1 if none)
+    rows = np.arange(mask.shape[0])[:, None]
+    index = np.where(mask, rows, -1)
+    return np.maximum.accumulate(index, axis=0)
+
+
+def positions_from_signals(prices, signals):
+    """
+    Turns +1/-1/0 signals into long/flat positions with evaluate_signals() semantics:
+    a +1 opens a long when flat, a -1 closes it, everything else holds.
+    Signals on bars without a price are ignored.
+
+    Args:
+        prices (numpy.ndarray): (dates x symbols) prices, NaN where missing.
+        signals (numpy.ndarray): (dates x symbols) signals.
+
+    Returns:
+        numpy.ndarray: (dates x symbols) int8 matrix, 1 while long after that bar's close.
+    """
+    signals = np.where(np.isnan(prices), 0, signals)
+    last = _forward_fill_index(signals != 0)
+    held = np.take_along_axis(signals, np.maximum(last, 0), axis=0) == 1
+    return (held & (last >= 0)).astype(np.int8)
+
+
+def run_backtest(prices, signals, cost_bps=0.0, slippage_bps=0.0, notional=None,
+                 initial_capital=None, periods_per_year=252):
+    """
+    Backtests long/flat signals for many symbols at once on aligned price and signal matrices.
+
+    Args:
+        prices (array-like): (dates x symbols) execution prices, NaN where a symbol has no bar.
+        signals (array-like): (dates x symbols) signals, +1 (buy), -1 (sell), 0 (hold).
+        cost_bps (float): Transaction cost per side, in basis points of traded notional.
+        slippage_bps (float): Price slippage per side in basis points (buys fill higher, sells lower).
+        notional (float, optional): Cash per trade; None trades one share like evaluate_signals().
+        initial_capital (float, optional): Starting equity (default: one trade's worth per symbol).
+        periods_per_year (int): Bars per year for the annualised Sharpe ratio (default: 252).
+
+    Returns:
+        dict: {
+            'trades': dict of arrays 'symbol_index', 'entry_index', 'exit_index', 'entry_price',
+                'exit_price', 'shares', 'pnl' (closed trades only, by symbol then exit),
+            'equity_curve': numpy.ndarray of mark-to-market equity per date,
+            'total_pnl': float (closed trades), 'win_rate': float, 'sharpe': float,
+            'turnover': float (traded notional / initial capital), 'n_trades': int
+        }
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    signals = np.asarray(signals, dtype=np.float64)
+    if prices.ndim == 1:
+        prices, signals = prices[:, None], signals[:, None]
+    n_dates, n_symbols = prices.shape
+    held = positions_from_signals(prices, signals)
+    previous = np.vstack([np.zeros((1, n_symbols), dtype=np.int8), held[:-1]])
+    entries = (held == 1) & (previous == 0)
+    exits = (held == 0) & (previous == 1)
+
+    slip = slippage_bps / 1e4
+    cost = cost_bps / 1e4
+    fill = np.where(entries, prices * (1 + slip), np.where(exits, prices * (1 - slip), 0.0))
+    if notional is None:
+        entry_shares = entries.astype(np.float64)
+    else:
+        entry_shares = np.where(entries, notional / np.where(entries, fill, 1.0), 0.0)
+
+    # Shares held after each bar, carried forward from the opening trade
+    last_entry = _forward_fill_index(entries)
+    shares = np.take_along_axis(entry_shares, np.maximum(last_entry, 0), axis=0) * (last_entry >= 0)
+    held_shares = shares * held
+    exit_shares = np.where(exits, np.vstack([np.zeros((1, n_symbols)), held_shares[:-1]]), 0.0)
+
+    # Closed trades: pair the k-th entry of each symbol with its k-th exit
+    exit_sym, exit_t = np.nonzero(exits.T)
+    entry_sym, entry_t = np.nonzero(entries.T)
+    n_closed = np.bincount(exit_sym, minlength=n_symbols)
+    entry_rank = np.arange(len(entry_sym)) - np.searchsorted(entry_sym, entry_sym)
+    closed = entry_rank < n_closed[entry_sym]
+    entry_sym, entry_t = entry_sym[closed], entry_t[closed]
+    trade_shares = entry_shares[entry_t, entry_sym]
+    entry_fill = fill[entry_t, entry_sym]
+    exit_fill = fill[exit_t, exit_sym]
+    pnl = (exit_fill - entry_fill) * trade_shares - cost * (entry_fill + exit_fill) * trade_shares
+
+    # Mark-to-market equity on forward-filled prices, with costs charged on trade bars
+    last_price = _forward_fill_index(~np.isnan(prices))
+    marks = np.take_along_axis(prices, np.maximum(last_price, 0), axis=0)
+    marks = np.where(last_price >= 0, marks, 0.0)
+    price_moves = np.diff(marks, axis=0, prepend=marks[:1])
+    bar_pnl = (np.vstack([np.zeros((1, n_symbols)), held_shares[:-1]]) * price_moves)
+    traded = fill * (entry_shares + exit_shares)
+    bar_pnl -= cost * traded
+    bar_pnl -= np.where(entries, (fill - prices) * entry_shares, 0.0)
+    bar_pnl -= np.where(exits, (prices - fill) * exit_shares, 0.0)
+    bar_pnl = np.nan_to_num(bar_pnl)
+
+    if initial_capital is None:
+        first_price = marks[np.minimum(np.argmax(last_price >= 0, axis=0), n_dates - 1), np.arange(n_symbols)] \
+            if n_dates else np.zeros(n_symbols)
+        initial_capital = notional * n_symbols if notional is not None else float(first_price.sum())
+    equity = initial_capital + np.cumsum(bar_pnl.sum(axis=1))
+
+    sharpe = 0.0
+    if n_dates > 2 and initial_capital > 0:
+        prev_equity = np.concatenate(([initial_capital], equity[:-1]))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.diff(np.concatenate(([initial_capital], equity))) / prev_equity
+        returns = returns[np.isfinite(returns)]
+        std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+        if std > 0:
+            sharpe = float(returns.mean() / std * math.sqrt(periods_per_year))
+
+    n_trades = len(pnl)
+    return {
+        'trades': {
+            'symbol_index': exit_sym,
+            'entry_index': entry_t,
+            'exit_index': exit_t,
+            'entry_price': entry_fill,
+            'exit_price': exit_fill,
+            'shares': trade_shares,
+            'pnl': pnl
+        },
+        'equity_curve': equity,
+        'total_pnl': float(pnl.sum()),
+        'win_rate': float((pnl > 0).sum() / n_trades) if n_trades else 0,
+        'sharpe': sharpe,
+        'turnover': float(np.nansum(traded) / initial_capital) if initial_capital else 0.0,
+        'n_trades': n_trades
+    }
+
+
+def trades_to_records(result, dates, symbols):
+    """
+    Converts run_backtest() trade arrays into evaluate_signals()-style dicts.
+
+    Args:
+        result (dict): Output of run_backtest().
+        dates (array-like of datetime64[D]): Row labels of the matrices.
+        symbols (list of str): Column labels of the matrices.
+
+    Returns:
+        list of dict: {'symbol','entry_date','exit_date','entry_price','exit_price','pnl'}
+    """
+    trades = result['trades']
+    labels = np.datetime_as_string(np.asarray(dates, dtype='datetime64[D]'), unit='D')
+    return [
+        {
+            'symbol': symbols[s],
+            'entry_date': str(labels[entry]),
+            'exit_date': str(labels[exit_]),
+            'entry_price': entry_price,
+            'exit_price': exit_price,
+            'pnl': pnl
+        }
+        for s, entry, exit_, entry_price, exit_price, pnl in zip(
+            trades['symbol_index'].tolist(), trades['entry_index'].tolist(), trades['exit_index'].tolist(),
+            trades['entry_price'].tolist(), trades['exit_price'].tolist(), trades['pnl'].tolist()
+        )
+    ]
@@ -0,0 +1,261 @@
+"""
+Benchmarks for the analytics functions in new.py and the basicdata tool path.
+
+Runs every function on synthetic OHLCV data across symbol counts and date spans, and reports
+wall time, peak traced memory and the memory and blocks allocated during each call.
+Results can be saved as a JSON baseline and compared against a later run.
+
+Usage:
+    python servers/benchmark.py                          # full grid, print a table
+    python servers/benchmark.py --quick                  # 1 and 100 symbols, 1 month and 1 year
+    python servers/benchmark.py --no-alloc               # skip allocation counting (several times faster)
+    python servers/benchmark.py --output bench.json      # save a baseline
+    python servers/benchmark.py --compare bench.json     # fail on >20% wall-time regressions
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import new
+from providers import FlakyProvider, ReplayProvider, SyntheticProvider
+
+
+SYMBOL_COUNTS = (1, 100, 2000)
+SPANS = {'1m': 30, '1y': 365, '10y': 3652}
+END_DATE = '2024-12-31'
+
+
+def _cases(frame, records, start_date, end_date):
+    # (name, callable) pairs; records is None when the case is too large for the list-of-dicts view
+    provider = ReplayProvider(frame)
+    symbols = frame.symbols
+    cases = [
+        ('fetch_historical_nse_data', lambda: new.fetch_historical_nse_data(
+            symbols, start_date, end_date, as_frame=True, provider=provider)),
+        # Retry overhead when one provider call in five fails (no latency or backoff sleeps)
+        ('fetch_historical_nse_data(flaky)', lambda: new.fetch_historical_nse_data(
+            symbols, start_date, end_date, as_frame=True, backoff=0,
+            provider=FlakyProvider(provider, latency=0, failure_rate=0.2, seed=0))),
+        ('compute_summary_statistics', lambda: new.compute_summary_statistics(frame)),
+        ('generate_moving_average_signals', lambda: new.generate_moving_average_signals(frame)),
+        ('generate_rsi_signals', lambda: new.generate_rsi_signals(frame)),
+        ('calculate_atr', lambda: new.calculate_atr(frame)),
+        ('calculate_money_flow_index', lambda: new.calculate_money_flow_index(frame)),
+        ('compute_indicators', lambda: new.compute_indicators(frame)),
+        ('fetch_market_sentiment', lambda: new.fetch_market_sentiment(symbols, start_date, end_date)),
+        ('fetch_options_data', lambda: [new.fetch_options_data(symbol) for symbol in symbols]),
+    ]
+    signals = new.generate_moving_average_signals(frame) if records is not None else None
+    if records is not None:
+        cases += [
+            ('PriceFrame.to_records', frame.to_records),
+            ('PriceFrame.from_records', lambda: new.PriceFrame.from_records(records)),
+            ('evaluate_signals', lambda: new.evaluate_signals(frame, signals)),
+        ]
+    server = _load_server(provider)
+    if server is not None:
+        cases.append(('basicdata', lambda: asyncio.run(server.basicdata(symbols, start_date, end_date))))
+    return cases
+
+
+def _load_server(provider):
+    # The basicdata path needs the MCP SDK; skip it when it is not installed
+    os.environ.setdefault('MARKET_DATA_PROVIDER', 'synthetic')
+    os.environ.setdefault('PRICE_CACHE_PATH', '')
+    try:
+        import newmcpserver
+    except ImportError:
+        return None
+    newmcpserver.provider = provider
+    newmcpserver.price_cache = None
+    # Run the indicator math in this process, as COMPUTE_WORKERS=0 does, so tracemalloc sees it
+    if newmcpserver.compute_pool is not newmcpserver.download_pool:
+        newmcpserver.compute_pool.shutdown()
+        newmcpserver.compute_pool = newmcpserver.download_pool
+    # Time the computation, not result-cache hits from the earlier repeats
+    newmcpserver.result_cache = None
+    return newmcpserver
+
+
+def _allocations(func):
+    # Runs func() under tracemalloc and a profile hook that samples traced memory at every Python
+    # and C call and return, summing the increases: memory freed in between is not subtracted, so
+    # short-lived temporaries count towards the total
+    state = [0, 0, 0, sys.getallocatedblocks()]  # bytes allocated, blocks allocated, last bytes, last blocks
+
+    def sample(frame, event, arg, traced=tracemalloc.get_traced_memory, blocks=sys.getallocatedblocks):
+        current, count = traced()[0], blocks()
+        if current > state[2]:
+            state[0] += current - state[2]
+        if count > state[3]:
+            state[1] += count - state[3]
+        state[2] = current
+        state[3] = count
+
+    gc.collect()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    state[2], state[3] = tracemalloc.get_traced_memory()[0], sys.getallocatedblocks()
+    sys.setprofile(sample)
+    try:
+        result = func()
+    finally:
+        sys.setprofile(None)
+    sample(None, 'return', None)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak, state[0], state[1]
+
+
+def measure(func, repeat=3, allocations=True):
+    """
+    Times func() and traces its memory.
+
+    Returns:
+        dict: 'wall_s' (best of `repeat` untraced runs), 'peak_bytes' (tracemalloc peak during one
+            traced run), and 'alloc_bytes' / 'alloc_blocks' (memory and Python object blocks allocated
+            during that run, including temporaries freed before it returned; None without `allocations`,
+            which avoids the profile hook's several-fold slowdown of the traced run).
+    """
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+        del result
+
+    if allocations:
+        peak, alloc_bytes, alloc_blocks = _allocations(func)
+    else:
+        gc.collect()
+        tracemalloc.start()
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+        alloc_bytes = alloc_blocks = None
+    return {'wall_s': min(timings), 'peak_bytes': peak, 'alloc_bytes': alloc_bytes, 'alloc_blocks': alloc_blocks}
+
+
+def run(symbol_counts=SYMBOL_COUNTS, spans=tuple(SPANS), functions=None, repeat=3, max_bars=2_000_000,
+        allocations=True):
+    """
+    Runs the benchmark grid.
+
+    Args:
+        symbol_counts (iterable of int): Universe sizes.
+        spans (iterable of str): Keys of SPANS.
+        functions (set of str, optional): Only run these case names.
+        repeat (int): Untraced timing runs per case.
+        max_bars (int): Skip grid points with more bars than this (0 = no limit); the
+            list-of-dict outputs of the largest grid points need several GB of memory.
+        allocations (bool): Count allocations per call (see measure()).
+
+    Returns:
+        dict: { '<function>/<symbols>x<span>': measure() result }
+    """
+    results = {}
+    provider = SyntheticProvider(seed=42)
+    for n_symbols in symbol_counts:
+        for span in spans:
+            start_date = (datetime.strptime(END_DATE, '%Y-%m-%d') - timedelta(days=SPANS[span])).strftime('%Y-%m-%d')
+            tickers = [f"SYN{i:04d}.NS" for i in range(n_symbols)]
+            frame = provider.download(tickers, start_date, END_DATE)
+            if max_bars and len(frame) > max_bars:
+                print(f"skip {n_symbols}x{span}: {len(frame):,} bars > --max-bars {max_bars:,}", file=sys.stderr)
+                continue
+            records = frame.to_records() if len(frame) <= 1_000_000 else None
+            for name, func in _cases(frame, records, start_date, END_DATE):
+                if functions and name not in functions:
+                    continue
+                key = f"{name}/{n_symbols}x{span}"
+                results[key] = measure(func, repeat, allocations)
+                print(_format_row(key, results[key]), file=sys.stderr)
+    return results
+
+
+def _format_row(key, result):
+    row = f"{key:<52} {result['wall_s'] * 1000:>11.2f} ms {result['peak_bytes'] / 2**20:>9.1f} MiB peak"
+    if result.get('alloc_bytes') is None:
+        return row
+    return f"{row} {result['alloc_bytes'] / 2**20:>9.1f} MiB {result['alloc_blocks']:>11,} blocks allocated"
+
+
+def _metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine()
+    }
+
+
+def compare(results, baseline, threshold=1.2):
+    """
+    Prints wall-time ratios against a baseline.
+
+    Returns:
+        list of str: Keys whose wall time grew by more than `threshold`x.
+    """
+    regressions = []
+    for key, result in sorted(results.items()):
+        if key not in baseline:
+            continue
+        ratio = result['wall_s'] / baseline[key]['wall_s'] if baseline[key]['wall_s'] else float('inf')
+        flag = 'REGRESSION' if ratio > threshold else ''
+        print(f"{key:<52} {ratio:>6.2f}x {flag}")
+        if ratio > threshold:
+            regressions.append(key)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--quick', action='store_true', help='1 and 100 symbols, 1m and 1y spans only')
+    parser.add_argument('--symbols', type=int, nargs='+', help='symbol counts to run')
+    parser.add_argument('--spans', nargs='+', choices=list(SPANS), help='date spans to run')
+    parser.add_argument('--functions', nargs='+', help='only run these functions')
+    parser.add_argument('--repeat', type=int, default=3, help='timing runs per case (default: 3)')
+    parser.add_argument('--no-alloc', action='store_true', help='skip allocation counting (much faster)')
+    parser.add_argument('--max-bars', type=int, default=2_000_000, help='skip larger grid points (0 = no limit)')
+    parser.add_argument('--output', help='write results as a JSON baseline')
+    parser.add_argument('--compare', help='compare against a JSON baseline and exit 1 on regressions')
+    parser.add_argument('--threshold', type=float, default=1.2, help='regression ratio (default: 1.2)')
+    args = parser.parse_args(argv)
+
+    symbol_counts = args.symbols or ((1, 100) if args.quick else SYMBOL_COUNTS)
+    spans = args.spans or (('1m', '1y') if args.quick else tuple(SPANS))
+    results = run(symbol_counts, spans, set(args.functions or ()), args.repeat, args.max_bars, not args.no_alloc)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'meta': _metadata(), 'results': results}, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"comparing against {baseline['meta'].get('commit') or args.compare}")
+        if compare(results, baseline['results'], args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
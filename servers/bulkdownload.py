@@ -0,0 +1,114 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from priceframe import PriceFrame
+
+
+# Outcome of each symbol in a bulk download report
+STATUSES = ('ok', 'cached', 'missing', 'failed')
+
+
+def _symbol(ticker):
+    return ticker.replace('.NS', '')
+
+
+def backoff_delay(attempt, backoff=1.0, max_backoff=30.0):
+    """
+    Seconds to wait before retry number `attempt` (1-based): exponential with jitter.
+    """
+    delay = min(max_backoff, backoff * 2 ** (attempt - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _download_chunk(provider, tickers, start_date, end_date, retries, backoff, max_backoff, retry_missing):
+    # Retries the whole chunk on errors and only the symbols still missing otherwise
+    columns = {}
+    report = {}
+    pending = list(tickers)
+    error = None
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(backoff_delay(attempt, backoff, max_backoff))
+        for ticker in pending:
+            report[_symbol(ticker)] = {'status': 'missing', 'attempts': attempt + 1, 'bars': 0, 'error': None}
+        try:
+            downloaded = provider.download(pending, start_date, end_date)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            continue
+        error = None
+        # A symbol with no bars counts as missing, like one left out of the download
+        received = {_symbol(ticker) for ticker in pending
+                    if _symbol(ticker) in downloaded and len(downloaded[_symbol(ticker)]['date'])}
+        for symbol in received:
+            columns[symbol] = downloaded[symbol]
+            report[symbol].update(status='ok', bars=len(downloaded[symbol]['date']))
+        pending = [ticker for ticker in pending if _symbol(ticker) not in received]
+        if not pending or not retry_missing:
+            break
+    if error is not None:
+        for ticker in pending:
+            report[_symbol(ticker)].update(status='failed', error=error)
+    # Symbols recovered on a retry arrive late; add everything back in ticker order
+    frame = PriceFrame()
+    for ticker in tickers:
+        if _symbol(ticker) in columns:
+            frame.add(_symbol(ticker), columns[_symbol(ticker)])
+    return frame, report
+
+
+def bulk_download(provider, tickers, start_date, end_date, chunk_size=100, max_workers=4, retries=2,
+                  backoff=1.0, max_backoff=30.0, retry_missing=None):
+    """
+    Downloads many tickers in chunks on a bounded thread pool, retrying failures with backoff.
+
+    A chunk whose download raises is retried as a whole; symbols absent from an otherwise
+    successful download are retried on their own (for providers with retry_missing set, unless
+    the caller turns that off, e.g. for a single day that may simply have no bar).
+    A symbol returned without bars counts as missing. Nothing is dropped silently: every ticker
+    gets an entry in the report, and symbols the provider returns without being asked are ignored.
+
+    Args:
+        provider (MarketDataProvider): Data source.
+        tickers (list of str): NSE tickers with the '.NS' suffix.
+        start_date (str): Inclusive start date in 'YYYY-MM-DD'.
+        end_date (str): Inclusive end date in 'YYYY-MM-DD'.
+        chunk_size (int): Tickers per provider call (0 or None = one call for all).
+        max_workers (int): Chunks downloaded at once.
+        retries (int): Extra attempts per chunk after the first.
+        backoff (float): Base delay in seconds, doubled on every retry (with jitter).
+        max_backoff (float): Cap on a single delay.
+        retry_missing (bool, optional): Retry symbols absent from a successful download
+            (default: provider.retry_missing).
+
+    Returns:
+        tuple: (PriceFrame sorted by symbol, report) where report is
+            { symbol: {'status': 'ok'|'missing'|'failed', 'attempts': int, 'bars': int,
+                       'error': str or None} }
+    """
+    unique = sorted(set(tickers), key=_symbol)
+    size = chunk_size or len(unique) or 1
+    chunks = [unique[i:i + size] for i in range(0, len(unique), size)]
+
+    if retry_missing is None:
+        retry_missing = provider.retry_missing
+
+    def run(chunk):
+        return _download_chunk(provider, chunk, start_date, end_date, retries, backoff, max_backoff,
+                               retry_missing)
+
+    if max_workers <= 1 or len(chunks) <= 1:
+        results = [run(chunk) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bulk-download') as pool:
+            results = list(pool.map(run, chunks))
+
+    frame = PriceFrame()
+    report = {}
+    # Chunks are disjoint and in symbol order, so concatenating keeps the frame sorted
+    for chunk_frame, chunk_report in results:
+        for symbol, columns in chunk_frame.items():
+            frame.add(symbol, columns)
+        report.update(chunk_report)
+    return frame, report
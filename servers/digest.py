@@ -0,0 +1,195 @@
+import numpy as np
+
+
+# Thresholds used for the regime flags and day counts
+MFI_OVERBOUGHT = 80
+MFI_OVERSOLD = 20
+RECENT_BARS = 20
+RECENT_DAYS = 7
+
+
+def _round(value, precision):
+    if value is None:
+        return None
+    value = float(value)
+    return None if np.isnan(value) else round(value, precision)
+
+
+def _day(value):
+    return str(np.datetime64(value, 'D'))
+
+
+def trend_slope(closes):
+    """
+    Least-squares slope of log price, as percent change per bar (None with fewer than 2 bars).
+    """
+    n = len(closes)
+    if n < 2:
+        return None
+    x = np.arange(n) - (n - 1) / 2
+    y = np.log(closes)
+    slope = (x @ (y - y.mean())) / (x @ x)
+    return (np.exp(slope) - 1) * 100
+
+
+def drawdown_episodes(dates, closes, limit=3):
+    """
+    Finds peak-to-recovery drawdown episodes.
+
+    Returns:
+        tuple: (number of episodes, the `limit` deepest as dicts with 'peak_date', 'trough_date',
+            'recovery_date' (None while still under water), 'depth' (fraction) and 'bars')
+    """
+    if len(closes) < 2:
+        return 0, []
+    drawdown = closes / np.maximum.accumulate(closes) - 1
+    under = drawdown < 0
+    # Episode boundaries: where the under-water mask switches on and off
+    edges = np.diff(np.concatenate(([False], under, [False])).astype(np.int8))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if not len(starts):
+        return 0, []
+    troughs = np.minimum.reduceat(drawdown, starts)
+    deepest = np.argsort(troughs, kind='stable')[:limit]
+    episodes = []
+    for i in deepest:
+        start, end = starts[i], ends[i]
+        trough = start + int(np.argmin(drawdown[start:end]))
+        episodes.append({
+            'peak_date': _day(dates[start - 1]),
+            'trough_date': _day(dates[trough]),
+            'recovery_date': _day(dates[end]) if end < len(closes) else None,
+            'depth': float(-troughs[i]),
+            'bars': int(end - start)
+        })
+    return len(starts), episodes
+
+
+def _rsi_features(rows, precision):
+    if not rows:
+        return None
+    rsi = np.array([row['rsi'] for row in rows], dtype=np.float64)
+    signals = np.array([row['signal'] for row in rows], dtype=np.int8)
+    fired = np.flatnonzero(signals)
+    last = rows[fired[-1]] if len(fired) else None
+    return {
+        'latest': _round(rsi[-1], precision),
+        'mean': _round(rsi.mean(), precision),
+        'min': _round(rsi.min(), precision),
+        'max': _round(rsi.max(), precision),
+        'overbought_days': int((signals == -1).sum()),
+        'oversold_days': int((signals == 1).sum()),
+        'latest_signal': int(signals[-1]),
+        'last_signal': {'date': last['date'], 'signal': last['signal']} if last else None
+    }
+
+
+def _atr_features(rows, precision):
+    if not rows:
+        return None
+    percents = np.array([row['atr_percent'] for row in rows], dtype=np.float64)
+    median = np.median(percents)
+    latest = percents[-1]
+    regime = 'high' if latest > 1.25 * median else 'low' if latest < 0.8 * median else 'normal'
+    return {
+        'latest': _round(rows[-1]['atr'], precision),
+        'latest_percent': _round(latest, precision),
+        'median_percent': _round(median, precision),
+        'volatility_regime': regime
+    }
+
+
+def _mfi_features(rows, precision):
+    if not rows:
+        return None
+    mfi = np.array([row['mfi'] for row in rows], dtype=np.float64)
+    return {
+        'latest': _round(mfi[-1], precision),
+        'mean': _round(mfi.mean(), precision),
+        'overbought_days': int((mfi > MFI_OVERBOUGHT).sum()),
+        'oversold_days': int((mfi < MFI_OVERSOLD).sum())
+    }
+
+
+def _sentiment_features(columns, precision):
+    if columns is None or not len(columns['date']):
+        return None
+    news, social = columns['news_sentiment'], columns['social_sentiment']
+    recent = slice(-RECENT_DAYS, None)
+    combined = (news.mean() + social.mean()) / 2
+    return {
+        'days': int(len(news)),
+        'news_mean': _round(news.mean(), precision),
+        'social_mean': _round(social.mean(), precision),
+        'recent_news_mean': _round(news[recent].mean(), precision),
+        'recent_social_mean': _round(social[recent].mean(), precision),
+        'news_count': int(columns['news_count'].sum()),
+        'social_mentions': int(columns['social_mentions'].sum()),
+        'tone': 'positive' if combined > 0.1 else 'negative' if combined < -0.1 else 'neutral'
+    }
+
+
+def digest_symbol(columns, indicators, sentiment=None, max_episodes=3, precision=4):
+    """
+    Condenses one symbol's bars, indicators and sentiment into a fixed-size summary.
+
+    Args:
+        columns (dict): The symbol's PriceFrame columns.
+        indicators (dict): The symbol's compute_by_symbol() entry ('stats', 'rsi', 'atr', 'mfi').
+        sentiment (dict, optional): SentimentStore.query() columns for the same range.
+        max_episodes (int): Drawdown episodes listed (deepest first).
+        precision (int): Decimal places for floats.
+
+    Returns:
+        dict: 'period', 'price', 'returns', 'trend', 'drawdowns', 'rsi', 'atr', 'mfi' and
+            'sentiment'; sections without enough data are None.
+    """
+    dates, closes = columns['date'], columns['close']
+    if not len(closes):
+        return {'period': {'bars': 0}}
+    stats = indicators.get('stats') or {}
+    count, episodes = drawdown_episodes(dates, closes, max_episodes)
+    slope = trend_slope(closes)
+    recent_slope = trend_slope(closes[-RECENT_BARS:])
+    sma_window = 50 if len(closes) >= 50 else RECENT_BARS
+    sma = closes[-sma_window:].mean() if len(closes) >= sma_window else None
+    if sma is None or slope is None:
+        regime = None
+    elif closes[-1] > sma and slope > 0:
+        regime = 'uptrend'
+    elif closes[-1] < sma and slope < 0:
+        regime = 'downtrend'
+    else:
+        regime = 'sideways'
+    for episode in episodes:
+        episode['depth'] = _round(episode['depth'], precision)
+    return {
+        'period': {'start': _day(dates[0]), 'end': _day(dates[-1]), 'bars': int(len(closes))},
+        'price': {
+            'first_close': _round(closes[0], precision),
+            'last_close': _round(closes[-1], precision),
+            'change_percent': _round((closes[-1] / closes[0] - 1) * 100, precision),
+            'high': _round(columns['high'].max(), precision),
+            'low': _round(columns['low'].min(), precision)
+        },
+        'returns': {
+            'avg_return': _round(stats.get('avg_return'), precision),
+            'volatility': _round(stats.get('volatility'), precision),
+            'annualized_volatility': _round(stats['volatility'] * np.sqrt(252), precision)
+            if stats.get('volatility') is not None else None,
+            'max_drawdown': _round(stats.get('max_drawdown'), precision)
+        },
+        'trend': {
+            'slope_percent_per_bar': _round(slope, precision),
+            'recent_slope_percent_per_bar': _round(recent_slope, precision),
+            f'sma{sma_window}': _round(sma, precision),
+            'above_sma': bool(closes[-1] > sma) if sma is not None else None,
+            'regime': regime
+        },
+        'drawdowns': {'episodes': count, 'deepest': episodes},
+        'rsi': _rsi_features(indicators.get('rsi'), precision),
+        'atr': _atr_features(indicators.get('atr'), precision),
+        'mfi': _mfi_features(indicators.get('mfi'), precision),
+        'sentiment': _sentiment_features(sentiment, precision)
+    }
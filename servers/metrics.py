@@ -0,0 +1,239 @@
+import bisect
+import cProfile
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+# Histogram bucket upper bounds: seconds from 0.5 ms to ~2 min, bytes from 1 KB to ~1 GB
+LATENCY_BUCKETS = tuple(0.0005 * 2 ** k for k in range(19))
+SIZE_BUCKETS = tuple(1024 * 4 ** k for k in range(11))
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram; quantiles are interpolated within the bucket that contains them.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                value = lower + (upper - lower) * (rank - seen) / n
+                return min(max(value, self.min), self.max)
+            seen += n
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else None,
+            'min': self.min,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'max': self.max,
+            'buckets': {f"le_{bound:g}": n for bound, n in zip(self.buckets + ('inf',), self.counts) if n}
+        }
+
+
+class Registry:
+    """
+    Process-wide, thread-safe store of named histograms and counters.
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(buckets)
+            histogram.observe(value)
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: 'uptime' (seconds), 'counters' ({name: int}) and 'histograms'
+                ({name: {'count', 'sum', 'mean', 'min', 'p50', 'p90', 'p99', 'max', 'buckets'}}).
+        """
+        with self._lock:
+            return {
+                'uptime': time.time() - self.started,
+                'counters': dict(sorted(self.counters.items())),
+                'histograms': {name: self.histograms[name].snapshot() for name in sorted(self.histograms)}
+            }
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.started = time.time()
+
+
+REGISTRY = Registry()
+
+# Trace of the tool call running in the current asyncio task, if any
+current_trace = ContextVar('current_trace', default=None)
+
+# Worker threads and processes running traced() buffer their events here instead
+_local = threading.local()
+_trace_ids = itertools.count(1)
+
+
+class Trace:
+    """
+    Spans of one tool call, optionally written to `profile_dir` with cProfile output per stage.
+    """
+
+    def __init__(self, tool, profile_dir=None):
+        self.tool = tool
+        self.id = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{next(_trace_ids)}"
+        self.profile_dir = profile_dir
+        self.started = time.time()
+        self.spans = []
+        self.attributes = {}
+        self._profiles = itertools.count(1)
+
+    def add(self, name, seconds, started=None):
+        self.spans.append({
+            'name': name,
+            'offset': round((started if started is not None else time.time() - seconds) - self.started, 6),
+            'seconds': round(seconds, 6)
+        })
+
+    def profile_path(self, stage):
+        if not self.profile_dir:
+            return None
+        return os.path.join(self.profile_dir, f"{self.id}-{self.tool}-{stage}-{next(self._profiles)}.prof")
+
+    def dump(self):
+        """
+        Writes the trace as <profile_dir>/<id>-<tool>.json (no-op without a profile_dir).
+        """
+        if not self.profile_dir:
+            return None
+        path = os.path.join(self.profile_dir, f"{self.id}-{self.tool}.json")
+        with open(path, 'w') as f:
+            json.dump({'id': self.id, 'tool': self.tool, 'started': self.started,
+                       'attributes': self.attributes, 'spans': self.spans}, f, indent=2, default=str)
+        return path
+
+
+def _emit(kind, name, value, started=None):
+    events = getattr(_local, 'events', None)
+    if events is not None:
+        events.append((kind, name, value, started))
+    else:
+        merge([(kind, name, value, started)])
+
+
+def merge(events):
+    """
+    Adds events collected by traced() to the registry and the current trace.
+    """
+    trace = current_trace.get()
+    for kind, name, value, started in events:
+        if kind == 'span':
+            REGISTRY.observe(f"stage.{name}", value)
+            if trace is not None:
+                trace.add(name, value, started)
+        elif kind == 'size':
+            REGISTRY.observe(name, value, SIZE_BUCKETS)
+        else:
+            REGISTRY.increment(name, value)
+
+
+def record(name, seconds, started=None):
+    """
+    Records a stage that took `seconds` under the 'stage.<name>' histogram.
+    """
+    _emit('span', name, seconds, started)
+
+
+def count(name, amount=1):
+    """
+    Increments a counter.
+    """
+    _emit('count', name, amount)
+
+
+def observe_size(name, size):
+    """
+    Records a size in bytes under the `name` histogram.
+    """
+    _emit('size', name, size)
+
+
+@contextmanager
+def span(name):
+    """
+    Times the enclosed block as stage `name`.
+    """
+    started = time.time()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start, started)
+
+
+def traced(profile_path, func, *args, **kwargs):
+    """
+    Runs func(*args, **kwargs) in an executor worker, buffering the metrics it records.
+
+    Worker processes have their own registry, so events are returned to the caller, which
+    passes them to merge(). With a profile_path, the call runs under cProfile and the stats
+    are written there.
+
+    Returns:
+        tuple: (func's result, list of events)
+    """
+    outer = getattr(_local, 'events', None)
+    _local.events = events = []
+    profiler = cProfile.Profile() if profile_path else None
+    try:
+        if profiler is not None:
+            profiler.enable()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(profile_path)
+    finally:
+        _local.events = outer
+    return result, events
@@ -1,10 +1,106 @@
-import yfinance as yf
 from datetime import datetime, timedelta
 from collections import defaultdict
 import math
+import time
+
+import numpy as np
+
+from backtest import align_frame, run_backtest, trades_to_records
+import metrics
+from bulkdownload import bulk_download
+from options import max_pain as _max_pain
+from pricecache import IST, NSE_OPEN, today_ist
+from priceframe import PRICE_FIELDS, PriceFrame
+from providers import YFinanceProvider
+from rolling import SMA_TIE_TOLERANCE, rolling_mean, rolling_sum, smoothed_mean
+from sentiment import SentimentStore
+
+
+# Provider used when fetch_historical_nse_data() is not given one
+DEFAULT_PROVIDER = YFinanceProvider()
+
+# Placeholder sentiment feed used by fetch_market_sentiment()
+DEFAULT_SENTIMENT_STORE = SentimentStore()
+
+
+# Gaps of at most this many weekdays are downloaded with CLOSED_DAY_LOOKBACK_DAYS of earlier
+# days and without retrying missing symbols. A gap for which every symbol came back empty, while
+# at least one of them returned bars for the earlier days, had no session (a holiday) and is
+# cached as empty, like weekends and today before the open; otherwise an empty symbol is
+# retried on the next call.
+SHORT_GAP_WEEKDAYS = 3
+CLOSED_DAY_LOOKBACK_DAYS = 7
+
+
+def _between(columns, start, end):
+    # Rows of one symbol's columns dated within [start, end]
+    dates = columns['date']
+    keep = (dates >= np.datetime64(start, 'D')) & (dates <= np.datetime64(end, 'D'))
+    return {field: values[keep] for field, values in columns.items()}
+
+
+def _fetch_through_cache(tickers, start_date, end_date, cache, download):
+    # Held symbols are not evicted between storing the downloads and loading them back
+    with cache.in_use(ticker.replace('.NS', '') for ticker in tickers):
+        # Group tickers by missing range so each distinct gap is a single bulk download
+        gaps = defaultdict(list)
+        for ticker in tickers:
+            for gap in cache.missing_ranges(ticker.replace('.NS', ''), start_date, end_date):
+                gaps[gap].append(ticker)
+
+        report = {}
+        for (gap_start, gap_end), gap_tickers in gaps.items():
+            weekdays = np.busday_count(gap_start, gap_end + timedelta(days=1))
+            if weekdays == 0 or (gap_start == today_ist() and datetime.now(IST).time() < NSE_OPEN):
+                # Weekends, or today before the open: there are no bars to download
+                downloaded, gap_report, closed = PriceFrame(), {}, True
+            elif weekdays <= SHORT_GAP_WEEKDAYS:
+                lookback = gap_start - timedelta(days=CLOSED_DAY_LOOKBACK_DAYS)
+                downloaded, gap_report = download(gap_tickers, lookback.isoformat(), gap_end.isoformat(),
+                                                  retry_missing=False)
+                downloaded = PriceFrame({symbol: _between(columns, gap_start, gap_end)
+                                         for symbol, columns in downloaded.items()})
+                closed = bool(downloaded.symbols) and not len(downloaded)
+            else:
+                downloaded, gap_report = download(gap_tickers, gap_start.isoformat(), gap_end.isoformat())
+                closed = False
+            _merge_reports(report, gap_report)
+            for ticker in gap_tickers:
+                symbol = ticker.replace('.NS', '')
+                if symbol in downloaded and len(downloaded[symbol]['date']):
+                    cache.store(symbol, downloaded[symbol], gap_start, gap_end)
+                elif closed:
+                    # Closed days are marked covered; an empty today only goes to the live table, so
+                    # it is fetched again once live_ttl expires
+                    cache.store(symbol, None, gap_start, gap_end)
+                # Otherwise the symbol is not marked covered, so it is retried next time
+
+        frame = PriceFrame()
+        for ticker in sorted(tickers, key=lambda t: t.replace('.NS', '')):
+            symbol = ticker.replace('.NS', '')
+            columns = cache.load(symbol, start_date, end_date)
+            if len(columns['date']):
+                frame.add(symbol, columns)
+            entry = report.setdefault(symbol, {'status': 'cached', 'attempts': 0, 'bars': 0, 'error': None})
+            entry['bars'] = len(columns['date'])
+        return frame, report
+
+
+def _merge_reports(report, gap_report):
+    # A symbol downloaded for several gaps keeps its worst outcome and total attempts
+    rank = {'ok': 0, 'cached': 0, 'missing': 1, 'failed': 2}
+    for symbol, entry in gap_report.items():
+        if symbol not in report:
+            report[symbol] = dict(entry)
+            continue
+        merged = report[symbol]
+        merged['attempts'] += entry['attempts']
+        if rank[entry['status']] > rank[merged['status']]:
+            merged['status'], merged['error'] = entry['status'], entry['error']
 
 
-def fetch_historical_nse_data(symbols, start_date, end_date):
+def fetch_historical_nse_data(symbols, start_date, end_date, as_frame=False, cache=None, provider=None,
+                              chunk_size=100, max_workers=4, retries=2, backoff=1.0, with_report=False):
     """
     Fetches historical OHLCV data from NSE of India and returns a list of simple dicts.
 
@@ -12,40 +108,64 @@ def fetch_historical_nse_data(symbols, start_date, end_date):
         symbols (list of str): NSE ticker symbols (e.g., ['RELIANCE', 'TCS' , 'JIOFIN']).
         start_date (str): Start date in 'YYYY-MM-DD'.
         end_date (str): End date in 'YYYY-MM-DD'.
+        as_frame (bool): Return a columnar PriceFrame instead of the list of dicts.
+        cache (PriceCache, optional): On-disk cache; only date ranges it does not cover yet are downloaded.
+        provider (MarketDataProvider, optional): Data source (default: yfinance).
+        chunk_size (int): Tickers per provider call; chunks download concurrently (0 = one call).
+        max_workers (int): Chunks downloaded at once.
+        retries (int): Extra attempts for a failed chunk or for symbols missing from a download,
+            with exponential backoff starting at `backoff` seconds.
+        backoff (float): First retry delay in seconds.
+        with_report (bool): Also return a per-symbol status report.
 
     Returns:
         list of dict: Each dict has keys: 'symbol', 'date', 'open', 'high', 'low', 'close', 'adj_close', 'volume'.
+            PriceFrame when as_frame is True. With with_report, a tuple (data, report) where report is
+            { symbol: {'status': 'ok'|'cached'|'missing'|'failed', 'attempts': int, 'bars': int,
+                       'error': str or None} }.
     """
     tickers = [sym if sym.endswith('.NS') else f"{sym}.NS" for sym in symbols]
-    yf_end = (datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
-    data = yf.download(
-        tickers,
-        start=start_date,
-        end=yf_end,
-        group_by='ticker',
-        auto_adjust=False,
-        progress=False
-    )
-    results = []
-    if data.empty:
-        return results
-    for ticker in tickers:
-        if ticker not in data:
-            continue
-        df = data[ticker]
-        for idx, row in df.iterrows():
-            results.append({
-                'symbol': ticker.replace('.NS', ''),
-                'date': idx.strftime('%Y-%m-%d'),
-                'open': float(row['Open']),
-                'high': float(row['High']),
-                'low': float(row['Low']),
-                'close': float(row['Close']),
-                'adj_close': float(row['Adj Close']),
-                'volume': int(row['Volume'])
-            })
-    results.sort(key=lambda x: (x['symbol'], x['date']))
-    return results
+    provider = provider or DEFAULT_PROVIDER
+
+    def download(gap_tickers, gap_start, gap_end, retry_missing=None):
+        with metrics.span('download.provider'):
+            return bulk_download(provider, gap_tickers, gap_start, gap_end, chunk_size=chunk_size,
+                                 max_workers=max_workers, retries=retries, backoff=backoff,
+                                 retry_missing=retry_missing)
+
+    if cache is None:
+        frame, report = download(tickers, start_date, end_date)
+    else:
+        frame, report = _fetch_through_cache(tickers, start_date, end_date, cache, download)
+    for entry in report.values():
+        metrics.count(f"download.symbols.{entry['status']}")
+    data = frame if as_frame else frame.to_records()
+    return (data, report) if with_report else data
+
+
+def _moving_average_signals(symbol, columns, dates, short_window=20, long_window=50):
+    closes = columns['close']
+    # SMAs are None until a full window is available
+    short_sma = [None] * len(closes)
+    long_sma = [None] * len(closes)
+    short_sma[short_window-1:] = rolling_mean(closes, short_window).tolist()
+    long_sma[long_window-1:] = rolling_mean(closes, long_window).tolist()
+    signals = []
+    for i in range(len(closes)):
+        s_sma = short_sma[i]
+        l_sma = long_sma[i]
+        sig = 0
+        # SMAs within rounding error of each other (e.g. on flat prices) are a tie, not a crossover
+        if s_sma is not None and l_sma is not None and abs(s_sma - l_sma) > SMA_TIE_TOLERANCE * abs(l_sma):
+            sig = 1 if s_sma > l_sma else -1
+        signals.append({
+            'symbol': symbol,
+            'date': dates[i],
+            'short_sma': s_sma,
+            'long_sma': l_sma,
+            'signal': sig
+        })
+    return signals
 
 
 def generate_moving_average_signals(price_records, short_window=20, long_window=50):
@@ -53,7 +173,7 @@ def generate_moving_average_signals(price_records, short_window=20, long_window=
     Generates simple moving-average crossover signals from price records.
 
     Args:
-        price_records (list of dict): Output from fetch_historical_nse_data(), with keys including 'symbol', 'date', 'close'.
+        price_records (list of dict or PriceFrame): Output from fetch_historical_nse_data(), with keys including 'symbol', 'date', 'close'.
         short_window (int): Window size for short-term SMA.
         long_window (int): Window size for long-term SMA.
 
@@ -61,48 +181,24 @@ def generate_moving_average_signals(price_records, short_window=20, long_window=
         list of dict: Each dict has keys: 'symbol', 'date', 'short_sma', 'long_sma', 'signal'.
             signal = +1 (buy), -1 (sell), 0 (hold).
     """
-    symbol_records = defaultdict(list)
-    for rec in price_records:
-        symbol_records[rec['symbol']].append(rec)
+    frame = PriceFrame.from_records(price_records)
     signals = []
-    for symbol, records in symbol_records.items():
-        records.sort(key=lambda x: x['date'])
-        closes = [r['close'] for r in records]
-        dates = [r['date'] for r in records]
-        short_sma = [None] * len(closes)
-        long_sma = [None] * len(closes)
-        for i in range(len(closes)):
-            if i + 1 >= short_window:
-                short_sma[i] = sum(closes[i+1-short_window:i+1]) / short_window
-            if i + 1 >= long_window:
-                long_sma[i] = sum(closes[i+1-long_window:i+1]) / long_window
-        for i in range(len(closes)):
-            s_sma = short_sma[i]
-            l_sma = long_sma[i]
-            sig = 0
-            if s_sma is not None and l_sma is not None:
-                if s_sma > l_sma:
-                    sig = 1
-                elif s_sma < l_sma:
-                    sig = -1
-            signals.append({
-                'symbol': symbol,
-                'date': dates[i],
-                'short_sma': s_sma,
-                'long_sma': l_sma,
-                'signal': sig
-            })
+    for symbol, columns in frame.items():
+        signals.extend(_moving_average_signals(symbol, columns, frame.dates(symbol), short_window, long_window))
     signals.sort(key=lambda x: (x['symbol'], x['date']))
     return signals
 
 
-def evaluate_signals(price_records, signals):
+def evaluate_signals(price_records, signals, cost_bps=0.0, slippage_bps=0.0):
     """
     Evaluates trading signals to compute trade P&L and summary metrics without real execution.
+    Thin wrapper over backtest.run_backtest(); use that directly for equity curves, Sharpe and turnover.
 
     Args:
-        price_records (list of dict): Historical price data.
+        price_records (list of dict or PriceFrame): Historical price data.
         signals (list of dict): Output from generate_moving_average_signals().
+        cost_bps (float): Transaction cost per side in basis points (default: 0).
+        slippage_bps (float): Slippage per side in basis points (default: 0).
 
     Returns:
         dict: {
@@ -111,35 +207,47 @@ def evaluate_signals(price_records, signals):
             'win_rate': float
         }
     """
-    prices = defaultdict(dict)
-    for rec in price_records:
-        prices[rec['symbol']][rec['date']] = rec['close']
-
-    trades = []
-    open_positions = {}
+    frame = PriceFrame.from_records(price_records)
+    dates, symbols, prices = align_frame(frame, symbols=sorted(frame.symbols))
 
+    # Scatter the signal dicts into a matrix aligned with the prices
+    signal_matrix = np.zeros_like(prices)
+    date_index = {date: i for i, date in enumerate(np.datetime_as_string(dates, unit='D').tolist())}
+    symbol_index = {symbol: j for j, symbol in enumerate(symbols)}
     for sig in signals:
-        sym = sig['symbol']
-        date = sig['date']
-        price = prices[sym].get(date)
-        if price is None:
-            continue
-        if sig['signal'] == 1 and sym not in open_positions:
-            open_positions[sym] = {'entry_date': date, 'entry_price': price}
-        elif sig['signal'] == -1 and sym in open_positions:
-            entry = open_positions.pop(sym)
-            pnl = price - entry['entry_price']
-            trades.append({
-                'symbol': sym,
-                'entry_date': entry['entry_date'],
-                'exit_date': date,
-                'entry_price': entry['entry_price'],
-                'exit_price': price,
-                'pnl': pnl
-            })
+        i = date_index.get(sig['date'])
+        j = symbol_index.get(sig['symbol'])
+        if i is not None and j is not None and sig['signal'] in (1, -1):
+            signal_matrix[i, j] = sig['signal']
+
+    result = run_backtest(prices, signal_matrix, cost_bps=cost_bps, slippage_bps=slippage_bps)
+    trades = trades_to_records(result, dates, symbols)
     total_pnl = sum(t['pnl'] for t in trades)
-    win_rate = sum(1 for t in trades if t['pnl'] > 0) / len(trades) if trades else 0
-    return {'trades': trades, 'total_pnl': total_pnl, 'win_rate': win_rate}
+    return {'trades': trades, 'total_pnl': total_pnl, 'win_rate': result['win_rate']}
+
+
+def _summary_statistics(symbol, columns, dates):
+    prices = columns['close'].tolist()
+    if len(prices) < 2:
+        return None
+    # daily returns
+    returns = [(prices[i] / prices[i-1] - 1) for i in range(1, len(prices))]
+    avg_ret = sum(returns) / len(returns)
+    vol = math.sqrt(sum((r-avg_ret)**2 for r in returns) / (len(returns)-1))
+    # max drawdown
+    peak = prices[0]
+    max_dd = 0
+    for p in prices:
+        if p > peak:
+            peak = p
+        dd = (peak - p) / peak
+        if dd > max_dd:
+            max_dd = dd
+    return {
+        'avg_return': avg_ret,
+        'volatility': vol,
+        'max_drawdown': max_dd
+    }
 
 
 def compute_summary_statistics(price_records):
@@ -147,111 +255,111 @@ def compute_summary_statistics(price_records):
     Computes basic summary stats for each symbol: average daily return, volatility, max drawdown.
 
     Args:
-        price_records (list of dict): Output from fetch_historical_nse_data().
+        price_records (list of dict or PriceFrame): Output from fetch_historical_nse_data().
 
     Returns:
         dict: { symbol: { 'avg_return': float, 'volatility': float, 'max_drawdown': float } }
     """
     stats = {}
-    symbol_records = defaultdict(list)
-    for rec in price_records:
-        symbol_records[rec['symbol']].append(rec)
-    for symbol, records in symbol_records.items():
-        records.sort(key=lambda x: x['date'])
-        prices = [r['close'] for r in records]
-        if len(prices) < 2:
-            continue
-        # daily returns
-        returns = [(prices[i] / prices[i-1] - 1) for i in range(1, len(prices))]
-        avg_ret = sum(returns) / len(returns)
-        vol = math.sqrt(sum((r-avg_ret)**2 for r in returns) / (len(returns)-1))
-        # max drawdown
-        peak = prices[0]
-        max_dd = 0
-        for p in prices:
-            if p > peak:
-                peak = p
-            dd = (peak - p) / peak
-            if dd > max_dd:
-                max_dd = dd
-        stats[symbol] = {
-            'avg_return': avg_ret,
-            'volatility': vol,
-            'max_drawdown': max_dd
-        }
+    frame = PriceFrame.from_records(price_records)
+    for symbol, columns in frame.items():
+        symbol_stats = _summary_statistics(symbol, columns, None)
+        if symbol_stats is not None:
+            stats[symbol] = symbol_stats
     return stats
 
 
-def generate_rsi_signals(price_records, period=14, overbought=70, oversold=30):
+def _rsi_signals(symbol, columns, dates, period=14, overbought=70, oversold=30, smoothing='sma'):
+    # Calculate gains and losses from price changes
+    deltas = np.diff(columns['close'])
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
+    
+    # Average gain/loss for each bar from `period` onwards
+    avg_gains = smoothed_mean(gains, period, smoothing)
+    avg_losses = smoothed_mean(losses, period, smoothing)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi_values = 100 - (100 / (1 + avg_gains / avg_losses))
+    
+    signals = []
+    for i, avg_loss, rsi in zip(range(period, len(dates)), avg_losses.tolist(), rsi_values.tolist()):
+        if avg_loss == 0:
+            rsi = 100
+        
+        # Generate signals
+        signal = 0
+        if rsi <= oversold:
+            signal = 1  # Buy signal
+        elif rsi >= overbought:
+            signal = -1  # Sell signal
+            
+        signals.append({
+            'symbol': symbol,
+            'date': dates[i],
+            'rsi': rsi,
+            'signal': signal
+        })
+    return signals
+
+
+def generate_rsi_signals(price_records, period=14, overbought=70, oversold=30, smoothing='sma'):
     """
     Generates trading signals based on Relative Strength Index (RSI) indicator.
 
     Args:
-        price_records (list of dict): Output from fetch_historical_nse_data(), with keys including 'symbol', 'date', 'close'.
+        price_records (list of dict or PriceFrame): Output from fetch_historical_nse_data(), with keys including 'symbol', 'date', 'close'.
         period (int): RSI calculation period (default: 14 days).
         overbought (int): RSI threshold for overbought condition (default: 70).
         oversold (int): RSI threshold for oversold condition (default: 30).
+        smoothing (str): 'sma' averages gains/losses over a simple moving window (default),
+            'wilder' uses Wilder's smoothing.
 
     Returns:
         list of dict: Each dict has keys: 'symbol', 'date', 'rsi', 'signal'.
             signal = +1 (buy), -1 (sell), 0 (hold).
     """
-    symbol_records = defaultdict(list)
-    for rec in price_records:
-        symbol_records[rec['symbol']].append(rec)
+    frame = PriceFrame.from_records(price_records)
     
     signals = []
-    for symbol, records in symbol_records.items():
-        records.sort(key=lambda x: x['date'])
-        closes = [r['close'] for r in records]
-        dates = [r['date'] for r in records]
-        
-        # Calculate price changes
-        deltas = [closes[i] - closes[i-1] for i in range(1, len(closes))]
-        
-        # Calculate gains and losses
-        gains = [delta if delta > 0 else 0 for delta in deltas]
-        losses = [-delta if delta < 0 else 0 for delta in deltas]
-        
-        # Calculate RSI
-        rsi_values = [None] * len(closes)
-        for i in range(period, len(closes)):
-            avg_gain = sum(gains[i-period:i]) / period
-            avg_loss = sum(losses[i-period:i]) / period
-            
-            if avg_loss == 0:
-                rsi = 100
-            else:
-                rs = avg_gain / avg_loss
-                rsi = 100 - (100 / (1 + rs))
-            
-            rsi_values[i] = rsi
-            
-            # Generate signals
-            signal = 0
-            if rsi <= oversold:
-                signal = 1  # Buy signal
-            elif rsi >= overbought:
-                signal = -1  # Sell signal
-                
-            signals.append({
-                'symbol': symbol,
-                'date': dates[i],
-                'rsi': rsi,
-                'signal': signal
-            })
+    for symbol, columns in frame.items():
+        signals.extend(_rsi_signals(symbol, columns, frame.dates(symbol), period, overbought, oversold, smoothing))
     
     signals.sort(key=lambda x: (x['symbol'], x['date']))
     return signals
 
 
-def calculate_atr(price_records, period=14):
+def _atr(symbol, columns, dates, period=14, smoothing='sma'):
+    highs = columns['high'][1:]
+    lows = columns['low'][1:]
+    closes = columns['close']
+    prev_closes = closes[:-1]
+    
+    # Calculate True Range
+    tr_values = np.maximum.reduce([
+        highs - lows,  # Current high - current low
+        np.abs(highs - prev_closes),  # Current high - previous close
+        np.abs(lows - prev_closes)  # Current low - previous close
+    ])
+    
+    # Calculate ATR for each bar from `period` onwards
+    atr_values = smoothed_mean(tr_values, period, smoothing)
+    atr_percents = (atr_values / closes[period:]) * 100  # ATR as percentage of price
+    
+    return [
+        {'date': dates[i], 'atr': atr, 'atr_percent': atr_percent}
+        for i, atr, atr_percent in zip(range(period, len(dates)), atr_values.tolist(), atr_percents.tolist())
+    ]
+
+
+def calculate_atr(price_records, period=14, smoothing='sma'):
     """
     Calculates Average True Range (ATR) for risk management and position sizing.
 
     Args:
-        price_records (list of dict): Output from fetch_historical_nse_data(), with keys including 'symbol', 'date', 'high', 'low', 'close'.
+        price_records (list of dict or PriceFrame): Output from fetch_historical_nse_data(), with keys including 'symbol', 'date', 'high', 'low', 'close'.
         period (int): ATR calculation period (default: 14 days).
+        smoothing (str): 'sma' averages true ranges over a simple moving window (default),
+            'wilder' uses Wilder's smoothing.
 
     Returns:
         dict: { symbol: { 'date': str, 'atr': float, 'atr_percent': float } }
@@ -259,55 +367,56 @@ def calculate_atr(price_records, period=14):
             atr_percent: ATR as percentage of closing price
     """
     atr_data = {}
-    symbol_records = defaultdict(list)
-    
-    for rec in price_records:
-        symbol_records[rec['symbol']].append(rec)
+    frame = PriceFrame.from_records(price_records)
     
-    for symbol, records in symbol_records.items():
-        records.sort(key=lambda x: x['date'])
-        atr_data[symbol] = []
-        
-        # Calculate True Range
-        tr_values = []
-        for i in range(1, len(records)):
-            high = records[i]['high']
-            low = records[i]['low']
-            prev_close = records[i-1]['close']
-            
-            tr1 = high - low  # Current high - current low
-            tr2 = abs(high - prev_close)  # Current high - previous close
-            tr3 = abs(low - prev_close)  # Current low - previous close
-            
-            tr = max(tr1, tr2, tr3)
-            tr_values.append(tr)
-        
-        # Calculate ATR
-        for i in range(period, len(records)):
-            if i < period:
-                continue
-                
-            # Calculate ATR using simple moving average
-            atr = sum(tr_values[i-period:i]) / period
-            close_price = records[i]['close']
-            atr_percent = (atr / close_price) * 100  # ATR as percentage of price
-            
-            atr_data[symbol].append({
-                'date': records[i]['date'],
-                'atr': atr,
-                'atr_percent': atr_percent
-            })
+    for symbol, columns in frame.items():
+        atr_data[symbol] = _atr(symbol, columns, frame.dates(symbol), period, smoothing)
     
     return atr_data
 
 
+def _money_flow_index(symbol, columns, dates, period=14):
+    if len(dates) <= period:
+        return []
+    
+    # Calculate typical price and money flow
+    typical_prices = (columns['high'] + columns['low'] + columns['close']) / 3
+    money_flows = typical_prices * columns['volume']
+    
+    # Split each bar's money flow into positive (typical price rose) and negative flow
+    rising = typical_prices[1:] > typical_prices[:-1]
+    positive = np.where(rising, money_flows[1:], 0.0)
+    negative = np.where(rising, 0.0, money_flows[1:])
+    
+    # The window for bar i covers the period - 1 price changes between bars i-period and i-1
+    n_values = len(dates) - period
+    positive_flows = rolling_sum(positive, period - 1)[:n_values]
+    negative_flows = rolling_sum(negative, period - 1)[:n_values]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mfi_values = 100 - (100 / (1 + positive_flows / negative_flows))
+    
+    results = []
+    for i, negative_flow, mfi in zip(range(period, len(dates)), negative_flows.tolist(), mfi_values.tolist()):
+        # Calculate Money Flow Index
+        if negative_flow == 0:
+            mfi = 100
+        
+        results.append({
+            'date': dates[i],
+            'mfi': mfi,
+            'typical_price': typical_prices[i].item(),
+            'money_flow': money_flows[i].item()
+        })
+    return results
+
+
 def calculate_money_flow_index(price_records, period=14):
     """
     Calculates Money Flow Index (MFI) which is a volume-weighted RSI that helps identify
     overbought/oversold conditions while considering trading volume.
 
     Args:
-        price_records (list of dict): Output from fetch_historical_nse_data(), with keys including 
+        price_records (list of dict or PriceFrame): Output from fetch_historical_nse_data(), with keys including 
             'symbol', 'date', 'high', 'low', 'close', 'volume'.
         period (int): MFI calculation period (default: 14 days).
 
@@ -318,126 +427,94 @@ def calculate_money_flow_index(price_records, period=14):
             money_flow: typical_price * volume
     """
     mfi_data = {}
-    symbol_records = defaultdict(list)
+    frame = PriceFrame.from_records(price_records)
     
-    for rec in price_records:
-        symbol_records[rec['symbol']].append(rec)
-    
-    for symbol, records in symbol_records.items():
-        records.sort(key=lambda x: x['date'])
-        mfi_data[symbol] = []
-        
-        # Calculate typical price and money flow
-        typical_prices = []
-        money_flows = []
-        
-        for record in records:
-            typical_price = (record['high'] + record['low'] + record['close']) / 3
-            money_flow = typical_price * record['volume']
-            
-            typical_prices.append(typical_price)
-            money_flows.append(money_flow)
-        
-        # Calculate MFI
-        for i in range(period, len(records)):
-            if i < period:
-                continue
-                
-            # Get the period's data
-            period_tp = typical_prices[i-period:i]
-            period_mf = money_flows[i-period:i]
-            
-            # Calculate positive and negative money flow
-            positive_flow = 0
-            negative_flow = 0
-            
-            for j in range(1, len(period_tp)):
-                if period_tp[j] > period_tp[j-1]:
-                    positive_flow += period_mf[j]
-                else:
-                    negative_flow += period_mf[j]
-            
-            # Calculate Money Flow Index
-            if negative_flow == 0:
-                mfi = 100
-            else:
-                money_ratio = positive_flow / negative_flow
-                mfi = 100 - (100 / (1 + money_ratio))
-            
-            mfi_data[symbol].append({
-                'date': records[i]['date'],
-                'mfi': mfi,
-                'typical_price': typical_prices[i],
-                'money_flow': money_flows[i]
-            })
+    for symbol, columns in frame.items():
+        mfi_data[symbol] = _money_flow_index(symbol, columns, frame.dates(symbol), period)
     
     return mfi_data
 
 
-def fetch_market_sentiment(symbols, start_date, end_date):
+# Per-symbol kernel for each indicator name accepted by compute_indicators()
+INDICATOR_KERNELS = {
+    'stats': _summary_statistics,
+    'sma': _moving_average_signals,
+    'rsi': _rsi_signals,
+    'atr': _atr,
+    'mfi': _money_flow_index
+}
+
+
+def compute_indicators(price_records, indicators=('stats', 'rsi', 'atr', 'mfi'), params=None):
+    """
+    Computes several indicators in a single pass per symbol, grouping and sorting the records once.
+
+    Args:
+        price_records (list of dict or PriceFrame): Output from fetch_historical_nse_data().
+        indicators (iterable of str): Any of 'stats', 'sma', 'rsi', 'atr', 'mfi'
+            (default: the four indicators returned by the basicdata tool).
+        params (dict, optional): Keyword arguments per indicator, e.g. {'rsi': {'period': 21}}.
+
+    Returns:
+        dict: { indicator: result } where each result has the same shape as the standalone function:
+            'stats': compute_summary_statistics(), 'sma': generate_moving_average_signals(),
+            'rsi': generate_rsi_signals(), 'atr': calculate_atr(), 'mfi': calculate_money_flow_index()
+    """
+    params = params or {}
+    unknown = [name for name in indicators if name not in INDICATOR_KERNELS]
+    if unknown:
+        raise ValueError(f"Unknown indicators {unknown}; expected any of {list(INDICATOR_KERNELS)}")
+    frame = PriceFrame.from_records(price_records)
+    results = {name: [] if name in ('sma', 'rsi') else {} for name in indicators}
+    # Time per indicator, summed over symbols and recorded once per call
+    seconds = dict.fromkeys(indicators, 0.0)
+
+    for symbol, columns in frame.items():
+        dates = frame.dates(symbol)
+        for name in indicators:
+            start = time.perf_counter()
+            value = INDICATOR_KERNELS[name](symbol, columns, dates, **params.get(name, {}))
+            seconds[name] += time.perf_counter() - start
+            if name in ('sma', 'rsi'):
+                results[name].extend(value)
+            elif value is not None:
+                results[name][symbol] = value
+
+    for name, total in seconds.items():
+        metrics.record(f"indicator.{name}", total)
+
+    for name in ('sma', 'rsi'):
+        if name in results:
+            results[name].sort(key=lambda x: (x['symbol'], x['date']))
+    return results
+
+
+def fetch_market_sentiment(symbols, start_date, end_date, store=None):
     """
     Fetches market sentiment data from news headlines and social media for given symbols.
-    This is a placeholder function that simulates sentiment data collection.
+    This is a placeholder backed by a deterministic synthetic SentimentStore.
 
     Args:
-        symbols (list of str): List of stock symbols to analyze
+        symbols (list of str or PriceFrame): List of stock symbols to analyze
         start_date (str): Start date in 'YYYY-MM-DD' format
         end_date (str): End date in 'YYYY-MM-DD' format
+        store (SentimentStore, optional): Sentiment source (default: DEFAULT_SENTIMENT_STORE)
 
     Returns:
         dict: {
-            'symbol': {
+            'symbol': [{
                 'date': str,
                 'news_sentiment': float,  # -1 to 1 (negative to positive)
                 'social_sentiment': float,  # -1 to 1 (negative to positive)
                 'news_count': int,
                 'social_mentions': int,
                 'top_headlines': list of str
-            }
+            }, ...]  # one entry per calendar day
         }
     """
-    import random  # For simulation purposes
-    from datetime import datetime, timedelta
-    
-    sentiment_data = {}
-    start = datetime.strptime(start_date, '%Y-%m-%d')
-    end = datetime.strptime(end_date, '%Y-%m-%d')
-    current = start
-    
-    while current <= end:
-        date_str = current.strftime('%Y-%m-%d')
-        
-        for symbol in symbols:
-            if symbol not in sentiment_data:
-                sentiment_data[symbol] = []
-            
-            # Simulate sentiment data (in real implementation, this would fetch from APIs)
-            news_sentiment = random.uniform(-1, 1)
-            social_sentiment = random.uniform(-1, 1)
-            news_count = random.randint(5, 50)
-            social_mentions = random.randint(10, 200)
-            
-            # Simulate some sample headlines
-            headlines = [
-                f"{symbol} announces quarterly results",
-                f"Analysts bullish on {symbol}",
-                f"{symbol} expands into new markets",
-                f"Market reacts to {symbol} news",
-                f"{symbol} partners with tech giant"
-            ]
-            
-            sentiment_data[symbol].append({
-                'date': date_str,
-                'news_sentiment': round(news_sentiment, 2),
-                'social_sentiment': round(social_sentiment, 2),
-                'news_count': news_count,
-                'social_mentions': social_mentions,
-                'top_headlines': random.sample(headlines, 3)
-            })
-        
-        current += timedelta(days=1)
-    
-    return sentiment_data
+    if isinstance(symbols, PriceFrame):
+        symbols = symbols.symbols
+    return (store or DEFAULT_SENTIMENT_STORE).records(symbols, start_date, end_date)
 
 
 def fetch_options_data(symbol, expiry_date=None):
@@ -446,7 +523,7 @@ def fetch_options_data(symbol, expiry_date=None):
 
     Args:
         symbol (str): Stock symbol (e.g., 'RELIANCE','JIOFIN'	)
-        expiry_date (str, optional): Options expiry date in 'YYYY-MM-DD' format. If None, fetches nearest expiry.
+        expiry_date (str, optional): Options expiry date in 'YYYY-MM-DD' format, today or later. If None, fetches nearest expiry.
 
     Returns:
         dict: {
@@ -456,9 +533,14 @@ def fetch_options_data(symbol, expiry_date=None):
             'calls': list of dict with keys: 'strike', 'last_price', 'bid', 'ask', 'volume', 'open_interest', 'implied_volatility',
             'puts': list of dict with keys: 'strike', 'last_price', 'bid', 'ask', 'volume', 'open_interest', 'implied_volatility',
             'put_call_ratio': float,
-            'max_pain': float
+            'max_pain': float  # strike minimising the total payout to option holders
         }
+
+    Raises:
+        ValueError: If expiry_date is before today.
     """
+    if expiry_date and datetime.strptime(expiry_date, '%Y-%m-%d').date() < today_ist():
+        raise ValueError(f"Expiry {expiry_date} has already passed")
     import random  # For simulation purposes
     
     # In real implementation, this would fetch from yfinance or other options data provider
@@ -503,10 +585,18 @@ def fetch_options_data(symbol, expiry_date=None):
     total_call_volume = sum(call['volume'] for call in calls)
     put_call_ratio = total_put_volume / total_call_volume if total_call_volume > 0 else float('inf')
     
-    # Calculate max pain (strike price with highest open interest)
-    all_strikes = [(put['strike'], put['open_interest']) for put in puts] + \
-                 [(call['strike'], call['open_interest']) for call in calls]
-    max_pain = max(all_strikes, key=lambda x: x[1])[0] if all_strikes else current_price
+    # Calculate max pain (listed strike where option holders would be paid the least at expiry)
+    contracts = calls + puts
+    if contracts:
+        pain, _ = _max_pain(
+            np.zeros(len(contracts), dtype=np.int64),
+            [c['strike'] for c in contracts],
+            [c['open_interest'] for c in calls] + [0] * len(puts),
+            [0] * len(calls) + [p['open_interest'] for p in puts]
+        )
+        max_pain = int(pain[0])
+    else:
+        max_pain = current_price
     
     return {
         'symbol': symbol,
@@ -1,13 +1,493 @@
+import time
+
+# Startup timings reported by the diagnostics tool
+STARTUP = {'started': time.perf_counter()}
+
+import asyncio
+import functools
+import logging
+import math
+import os
+from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import metrics
 import new
-from mcp.server.fastmcp import FastMCP
+from digest import digest_symbol
+from options import DEFAULT_RATE, analyze_chains, synthetic_chain
+from pricecache import PriceCache, today_ist
+from priceframe import PriceFrame
+from providers import create_provider
+from responseformat import basicdata_response, merge_responses, split_by_symbol
+from resultcache import ResultCache, compute_by_symbol, indicator_key
+from screener import NIFTY50, SCREENER_FIELDS, ScreenerIndex, latest_rows
+from sentiment import SentimentStore
+from singleflight import SingleFlight
+from warmup import WarmupScheduler, parse_times
+from mcp.server.fastmcp import Context, FastMCP
+from starlette.responses import JSONResponse
+
+# Set METRICS_PROFILE_DIR to write every tool call's trace and per-stage cProfile stats there
+METRICS_PROFILE_DIR = os.environ.get('METRICS_PROFILE_DIR', '')
+if METRICS_PROFILE_DIR:
+    os.makedirs(METRICS_PROFILE_DIR, exist_ok=True)
+
+
+class InstrumentedFastMCP(FastMCP):
+    """
+    FastMCP that records each tool call's latency, payload size and errors, and traces the stages
+    it runs.
+    """
+
+    async def call_tool(self, name, arguments):
+        trace = metrics.Trace(name, METRICS_PROFILE_DIR or None)
+        token = metrics.current_trace.set(trace)
+        start = time.perf_counter()
+        try:
+            content = await super().call_tool(name, arguments)
+            payload = sum(len(item.text) for item in content if hasattr(item, 'text'))
+            metrics.observe_size(f"tool.{name}.payload_bytes", payload)
+            trace.attributes['payload_bytes'] = payload
+            return content
+        except Exception as e:
+            # The tool manager wraps tool exceptions in ToolError; count the original type
+            error = e.__cause__ or e
+            metrics.count(f"tool.{name}.errors")
+            metrics.count(f"tool.{name}.errors.{type(error).__name__}")
+            trace.attributes['error'] = f"{type(error).__name__}: {error}"
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            metrics.REGISTRY.observe(f"tool.{name}.seconds", seconds)
+            metrics.count(f"tool.{name}.calls")
+            trace.attributes['seconds'] = seconds
+            metrics.current_trace.reset(token)
+            trace.dump()
+
 
 # Create an MCP server
-mcp = FastMCP()
+mcp = InstrumentedFastMCP()
+
+# Market data backend: 'yfinance', 'replay' (CSV/Parquet fixtures), 'synthetic' (GBM bars)
+# or 'flaky' (synthetic bars with injected latency and failures, for load tests)
+MARKET_DATA_PROVIDER = os.environ.get('MARKET_DATA_PROVIDER', 'yfinance')
+if MARKET_DATA_PROVIDER == 'replay':
+    provider = create_provider('replay', source=os.environ['MARKET_DATA_REPLAY_PATH'])
+elif MARKET_DATA_PROVIDER == 'synthetic':
+    provider = create_provider('synthetic', seed=int(os.environ.get('MARKET_DATA_SEED', '0')))
+elif MARKET_DATA_PROVIDER == 'flaky':
+    provider = create_provider(
+        'flaky',
+        inner=create_provider('synthetic', seed=int(os.environ.get('MARKET_DATA_SEED', '0'))),
+        latency=float(os.environ.get('MARKET_DATA_LATENCY', '0.05')),
+        failure_rate=float(os.environ.get('MARKET_DATA_FAILURE_RATE', '0.1')),
+        missing_rate=float(os.environ.get('MARKET_DATA_MISSING_RATE', '0.0'))
+    )
+else:
+    provider = create_provider(MARKET_DATA_PROVIDER)
+
+# On-disk OHLCV cache shared by all tool calls; set PRICE_CACHE_PATH='' to disable it.
+# Offline backends are already memory-speed, so they skip the cache unless a path is given.
+PRICE_CACHE_PATH = os.environ.get(
+    'PRICE_CACHE_PATH', 'price_cache.sqlite' if MARKET_DATA_PROVIDER == 'yfinance' else ''
+)
+PRICE_CACHE_MAX_MB = float(os.environ.get('PRICE_CACHE_MAX_MB', '512'))
+PRICE_CACHE_LIVE_TTL = float(os.environ.get('PRICE_CACHE_LIVE_TTL', '300'))
+price_cache = PriceCache(
+    PRICE_CACHE_PATH,
+    max_bytes=int(PRICE_CACHE_MAX_MB * 1024 * 1024),
+    live_ttl=PRICE_CACHE_LIVE_TTL
+) if PRICE_CACHE_PATH else None
+
+# Computed indicators per (symbol, date range); ranges reaching today expire after RESULT_CACHE_LIVE_TTL
+RESULT_CACHE_MAX_MB = float(os.environ.get('RESULT_CACHE_MAX_MB', '256'))
+RESULT_CACHE_LIVE_TTL = float(os.environ.get('RESULT_CACHE_LIVE_TTL', '60'))
+result_cache = ResultCache(
+    max_bytes=int(RESULT_CACHE_MAX_MB * 1024 * 1024),
+    live_ttl=RESULT_CACHE_LIVE_TTL
+) if RESULT_CACHE_MAX_MB > 0 else None
+
+BASICDATA_INDICATORS = ('stats', 'rsi', 'atr', 'mfi')
+
+# Placeholder sentiment feed; deterministic for a given SENTIMENT_SEED
+sentiment_store = SentimentStore(seed=int(os.environ.get('SENTIMENT_SEED', '0')))
+
+# Blocking downloads run on a bounded thread pool and indicator math on a process pool, so one
+# slow call does not stall the event loop serving every other client.
+# COMPUTE_WORKERS=0 keeps the math on the thread pool (cheaper for small requests).
+DOWNLOAD_WORKERS = int(os.environ.get('DOWNLOAD_WORKERS', '8'))
+COMPUTE_WORKERS = int(os.environ.get('COMPUTE_WORKERS', str(min(4, os.cpu_count() or 1))))
+TOOL_CONCURRENCY = int(os.environ.get('TOOL_CONCURRENCY', '4'))
+DOWNLOAD_TIMEOUT = float(os.environ.get('DOWNLOAD_TIMEOUT', '60'))
+COMPUTE_TIMEOUT = float(os.environ.get('COMPUTE_TIMEOUT', '120'))
+# Provider calls per download: tickers per call, calls at once, retries with exponential backoff
+DOWNLOAD_CHUNK_SIZE = int(os.environ.get('DOWNLOAD_CHUNK_SIZE', '100'))
+DOWNLOAD_CHUNK_WORKERS = int(os.environ.get('DOWNLOAD_CHUNK_WORKERS', '4'))
+DOWNLOAD_RETRIES = int(os.environ.get('DOWNLOAD_RETRIES', '2'))
+DOWNLOAD_BACKOFF = float(os.environ.get('DOWNLOAD_BACKOFF', '1.0'))
+# Symbols downloaded and analysed per batch; results are delivered batch by batch
+SYMBOL_BATCH_SIZE = int(os.environ.get('SYMBOL_BATCH_SIZE', '25'))
+# Streamed basicdata calls start with batches this small, doubling up to SYMBOL_BATCH_SIZE, so the
+# first companies arrive after a single small download instead of a full batch
+STREAM_FIRST_BATCH_SIZE = int(os.environ.get('STREAM_FIRST_BATCH_SIZE', '1'))
+
+# Watchlist kept warm in the background: prices for the last WATCHLIST_LOOKBACK_DAYS and indicators
+# for ranges of WATCHLIST_WINDOWS days ending today, at startup and at WATCHLIST_REFRESH_TIMES (IST).
+# WATCHLIST is a comma-separated list of symbols or a file with one symbol per line.
+WATCHLIST = os.environ.get('WATCHLIST', '')
+if os.path.isfile(WATCHLIST):
+    with open(WATCHLIST) as f:
+        WATCHLIST = f.read().replace('\n', ',')
+WATCHLIST_LOOKBACK_DAYS = int(os.environ.get('WATCHLIST_LOOKBACK_DAYS', '365'))
+WATCHLIST_WINDOWS = [int(days) for days in os.environ.get('WATCHLIST_WINDOWS', '30').split(',') if days.strip()]
+WATCHLIST_REFRESH_TIMES = parse_times(os.environ.get('WATCHLIST_REFRESH_TIMES', '15:50'))
+
+# Universe screened by the screener tool: 'nifty50', a comma-separated list of symbols or a file
+# with one symbol per line; empty (the default) disables the screener. The latest indicators over the last
+# SCREENER_LOOKBACK_DAYS are indexed at startup and at SCREENER_REFRESH_TIMES (IST), and a screener
+# call made more than SCREENER_MAX_AGE seconds after the last refresh picks up new bars in the background.
+SCREENER_UNIVERSE = os.environ.get('SCREENER_UNIVERSE', '')
+if os.path.isfile(SCREENER_UNIVERSE):
+    with open(SCREENER_UNIVERSE) as f:
+        SCREENER_UNIVERSE = f.read().replace('\n', ',')
+elif SCREENER_UNIVERSE.strip().lower() == 'nifty50':
+    SCREENER_UNIVERSE = ','.join(NIFTY50)
+SCREENER_LOOKBACK_DAYS = int(os.environ.get('SCREENER_LOOKBACK_DAYS', '365'))
+SCREENER_REFRESH_TIMES = parse_times(os.environ.get('SCREENER_REFRESH_TIMES', '15:50'))
+SCREENER_MAX_AGE = float(os.environ.get('SCREENER_MAX_AGE', '300'))
+
+download_pool = ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS, thread_name_prefix='download')
+compute_pool = ProcessPoolExecutor(max_workers=COMPUTE_WORKERS) if COMPUTE_WORKERS > 0 else download_pool
+
+# Per-tool limit on calls running at once; extra calls wait their turn
+tool_limits = {
+    'basicdata': asyncio.Semaphore(TOOL_CONCURRENCY),
+    'sentimentdata': asyncio.Semaphore(TOOL_CONCURRENCY),
+    'optionsdata': asyncio.Semaphore(TOOL_CONCURRENCY),
+    'digest': asyncio.Semaphore(TOOL_CONCURRENCY)
+}
+
+# Identical concurrent calls share one download and computation
+flights = {
+    'basicdata': SingleFlight(),
+    'sentimentdata': SingleFlight(),
+    'digest': SingleFlight(),
+    'screener': SingleFlight()
+}
+
+logger = logging.getLogger(__name__)
+
+# Fire-and-forget tasks, referenced until done so they are not garbage collected mid-run
+background_tasks = set()
+
+
+def _background_done(task):
+    background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background task %s failed", task.get_name(), exc_info=task.exception())
+
+
+def run_in_background(coro, name):
+    """
+    Schedules coro without waiting for it; a failure is logged instead of being lost with the task.
+    """
+    task = asyncio.ensure_future(coro)
+    task.set_name(name)
+    background_tasks.add(task)
+    task.add_done_callback(_background_done)
+    return task
+
+
+async def run_blocking(pool, timeout, func, *args, **kwargs):
+    """
+    Runs func(*args, **kwargs) on an executor and awaits it, raising TimeoutError after `timeout` seconds.
+
+    The call is recorded as stage func.__name__ (including time queued for a worker), together
+    with any stages the function records itself.
+    """
+    loop = asyncio.get_running_loop()
+    trace = metrics.current_trace.get()
+    profile_path = trace.profile_path(func.__name__) if trace is not None else None
+    future = loop.run_in_executor(pool, functools.partial(metrics.traced, profile_path, func, *args, **kwargs))
+    try:
+        with metrics.span(func.__name__):
+            result, events = await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        metrics.count(f"timeouts.{func.__name__}")
+        raise TimeoutError(f"{func.__name__} did not finish within {timeout:g}s") from None
+    metrics.merge(events)
+    return result
+
+
+def _has_request(ctx):
+    # Tools called directly (benchmarks, scripts) have no client session to notify
+    try:
+        return ctx is not None and ctx.request_context is not None
+    except ValueError:
+        return False
+
+
+async def notify_progress(ctx, progress, total, message=None):
+    """
+    Sends an MCP progress notification when the client asked for progress.
+    """
+    if _has_request(ctx):
+        await ctx.report_progress(progress, total, message)
+
+
+async def notify_result(ctx, tool, symbol, result):
+    """
+    Pushes one symbol's finished result to the client as a log notification tied to the request.
+    """
+    if _has_request(ctx):
+        await ctx.session.send_log_message(
+            level='info',
+            data={'tool': tool, 'symbol': symbol, 'result': result},
+            logger=tool,
+            related_request_id=ctx.request_id
+        )
+
+
+def symbol_batches(symbols, first_size):
+    """
+    Splits symbols into batches of `first_size`, doubling with each batch up to SYMBOL_BATCH_SIZE.
+    """
+    batches = []
+    size = max(1, min(first_size, SYMBOL_BATCH_SIZE))
+    i = 0
+    while i < len(symbols):
+        batches.append(symbols[i:i + size])
+        i += size
+        size = min(size * 2, SYMBOL_BATCH_SIZE)
+    return batches
+
+
+def normalize_symbols(company):
+    """
+    Returns the sorted, de-duplicated symbols of a tool call without the '.NS' suffix.
+    """
+    return sorted({symbol.replace('.NS', '') for symbol in company})
+
+
+def page_symbols(company, cursor=None, page_size=0):
+    """
+    Normalizes a symbol list and selects one page of it.
+
+    Args:
+        company (list of str): Symbols as passed to a tool, with or without '.NS'.
+        cursor (str, optional): Opaque cursor from a previous page's 'next_cursor'.
+        page_size (int): Symbols per page (0 = all remaining).
+
+    Returns:
+        tuple: (symbols in this page, next cursor or None)
+    """
+    symbols = normalize_symbols(company)
+    try:
+        start = int(cursor) if cursor else 0
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid cursor {cursor!r}") from None
+    if start < 0 or start > len(symbols):
+        raise ValueError(f"Invalid cursor {cursor!r}")
+    end = min(start + page_size, len(symbols)) if page_size > 0 else len(symbols)
+    return symbols[start:end], (str(end) if end < len(symbols) else None)
+
+
+async def indicators_by_symbol(symbols, start_date, end_date):
+    """
+    Returns { symbol: basicdata indicators }, downloading and analysing only the symbols
+    whose indicators are not in the result cache.
+    """
+    by_symbol = {}
+    missing = []
+    for symbol in symbols:
+        cached = result_cache.get(indicator_key(symbol, start_date, end_date, BASICDATA_INDICATORS)) \
+            if result_cache is not None else None
+        if cached is None:
+            missing.append(symbol)
+        else:
+            by_symbol[symbol] = cached
+    if missing:
+        data = await run_blocking(download_pool, DOWNLOAD_TIMEOUT, new.fetch_historical_nse_data,
+                                  missing, start_date, end_date, as_frame=True, cache=price_cache,
+                                  provider=provider, chunk_size=DOWNLOAD_CHUNK_SIZE,
+                                  max_workers=DOWNLOAD_CHUNK_WORKERS, retries=DOWNLOAD_RETRIES,
+                                  backoff=DOWNLOAD_BACKOFF)
+        computed = await run_blocking(compute_pool, COMPUTE_TIMEOUT, compute_by_symbol,
+                                      data, BASICDATA_INDICATORS)
+        if result_cache is not None:
+            for symbol, value in computed.items():
+                result_cache.put(indicator_key(symbol, start_date, end_date, BASICDATA_INDICATORS),
+                                 value, end_date)
+        by_symbol.update(computed)
+    return by_symbol
+
+
+async def analyse_batch(symbols, start_date, end_date, response_format, detail, precision):
+    """
+    Computes one batch's basicdata response.
+    """
+    by_symbol = await indicators_by_symbol(symbols, start_date, end_date)
+    # Reshaping is cheap dict work that pickling to a process would only slow down
+    return await run_blocking(download_pool, COMPUTE_TIMEOUT, basicdata_response,
+                              by_symbol, response_format, detail, precision)
+
+
+def digest_frame(data, by_symbol, start_date, end_date, max_episodes):
+    """
+    Digests every symbol in a PriceFrame with its indicators and sentiment.
+    """
+    return {symbol: digest_symbol(columns, by_symbol[symbol],
+                                  sentiment_store.query(symbol, start_date, end_date), max_episodes)
+            for symbol, columns in data.items()}
+
+
+async def digest_batch(symbols, start_date, end_date, max_episodes):
+    """
+    Returns { symbol: digest }, building only the digests that are not in the result cache.
+    Each missing symbol's bars are downloaded once and reused for its indicators.
+    """
+    def key(symbol):
+        return (symbol, 'digest', start_date, end_date, max_episodes)
+
+    digests = {}
+    for symbol in symbols:
+        cached = result_cache.get(key(symbol)) if result_cache is not None else None
+        if cached is not None:
+            digests[symbol] = cached
+    missing = [symbol for symbol in symbols if symbol not in digests]
+    if not missing:
+        return digests
+    data = await run_blocking(download_pool, DOWNLOAD_TIMEOUT, new.fetch_historical_nse_data,
+                              missing, start_date, end_date, as_frame=True, cache=price_cache,
+                              provider=provider, chunk_size=DOWNLOAD_CHUNK_SIZE,
+                              max_workers=DOWNLOAD_CHUNK_WORKERS, retries=DOWNLOAD_RETRIES,
+                              backoff=DOWNLOAD_BACKOFF)
+    by_symbol = {}
+    for symbol in data.symbols:
+        cached = result_cache.get(indicator_key(symbol, start_date, end_date, BASICDATA_INDICATORS)) \
+            if result_cache is not None else None
+        if cached is not None:
+            by_symbol[symbol] = cached
+    uncomputed = PriceFrame({symbol: data[symbol] for symbol in data.symbols if symbol not in by_symbol})
+    if len(uncomputed):
+        computed = await run_blocking(compute_pool, COMPUTE_TIMEOUT, compute_by_symbol,
+                                      uncomputed, BASICDATA_INDICATORS)
+        if result_cache is not None:
+            for symbol, value in computed.items():
+                result_cache.put(indicator_key(symbol, start_date, end_date, BASICDATA_INDICATORS),
+                                 value, end_date)
+        by_symbol.update(computed)
+    computed = await run_blocking(download_pool, COMPUTE_TIMEOUT, digest_frame,
+                                  data, by_symbol, start_date, end_date, max_episodes)
+    if result_cache is not None:
+        for symbol, value in computed.items():
+            result_cache.put(key(symbol), value, end_date)
+    digests.update(computed)
+    return digests
+
+
+async def warm_watchlist(symbols):
+    """
+    Refreshes one watchlist batch: re-downloads today's bar, prefetches the lookback period into
+    the price cache and recomputes the indicators for each WATCHLIST_WINDOWS range ending today.
+    """
+    today = today_ist()
+    if price_cache is not None:
+        price_cache.refresh_today(symbols)
+        await run_blocking(download_pool, DOWNLOAD_TIMEOUT, new.fetch_historical_nse_data,
+                           symbols, (today - timedelta(days=WATCHLIST_LOOKBACK_DAYS)).isoformat(),
+                           today.isoformat(), as_frame=True, cache=price_cache, provider=provider,
+                           chunk_size=DOWNLOAD_CHUNK_SIZE, max_workers=DOWNLOAD_CHUNK_WORKERS,
+                           retries=DOWNLOAD_RETRIES, backoff=DOWNLOAD_BACKOFF)
+    if result_cache is not None:
+        result_cache.invalidate(symbols)
+        for days in WATCHLIST_WINDOWS:
+            await indicators_by_symbol(symbols, (today - timedelta(days=days)).isoformat(), today.isoformat())
+
+
+async def refresh_screener(symbols):
+    """
+    Brings one batch of the screener universe up to date: loads the last SCREENER_LOOKBACK_DAYS of
+    bars (from the price cache where possible) and recomputes the indicators only for symbols whose
+    latest bar is new or has changed.
+    """
+    today = today_ist()
+    data = await run_blocking(download_pool, DOWNLOAD_TIMEOUT, new.fetch_historical_nse_data,
+                              symbols, (today - timedelta(days=SCREENER_LOOKBACK_DAYS)).isoformat(),
+                              today.isoformat(), as_frame=True, cache=price_cache, provider=provider,
+                              chunk_size=DOWNLOAD_CHUNK_SIZE, max_workers=DOWNLOAD_CHUNK_WORKERS,
+                              retries=DOWNLOAD_RETRIES, backoff=DOWNLOAD_BACKOFF)
+    changed = PriceFrame({
+        symbol: data[symbol] for symbol in data.symbols
+        if len(data[symbol]['close']) and
+        screener_index.needs_update(symbol, data[symbol]['date'][-1], data[symbol]['close'][-1])
+    })
+    metrics.count('screener.symbols.checked', len(data.symbols))
+    metrics.count('screener.symbols.recomputed', len(changed.symbols))
+    rows = await run_blocking(compute_pool, COMPUTE_TIMEOUT, latest_rows, changed) if changed.symbols else None
+    screener_index.update(rows)
+
+
+def metrics_snapshot(reset=False):
+    """
+    Collects the metrics registry, cache statistics, coalescing stats and warm-up status.
+    """
+    snapshot = metrics.REGISTRY.snapshot()
+    counters = snapshot['counters']
+    cached = counters.get('download.symbols.cached', 0)
+    downloaded = sum(counters.get(f"download.symbols.{status}", 0) for status in ('ok', 'missing', 'failed'))
+    snapshot['caches'] = {
+        'result_cache': result_cache.stats() if result_cache is not None else {},
+        'price_cache': {
+            'symbols_cached': cached,
+            'symbols_downloaded': downloaded,
+            'hit_ratio': cached / (cached + downloaded) if cached + downloaded else 0.0
+        } if price_cache is not None else {}
+    }
+    snapshot['requests'] = {tool: flight.stats() for tool, flight in flights.items()}
+    snapshot['warmup'] = warmup.status()
+    snapshot['screener'] = {**screener_index.stats(), 'refresh': screener_refresh.status()}
+    snapshot['startup'] = {name: value for name, value in STARTUP.items() if name != 'started'}
+    if reset:
+        metrics.REGISTRY.reset()
+    return snapshot
+
+
+warmup = WarmupScheduler(warm_watchlist, normalize_symbols(WATCHLIST.split(',')) if WATCHLIST.strip() else [],
+                         WATCHLIST_REFRESH_TIMES, SYMBOL_BATCH_SIZE)
+
+screener_index = ScreenerIndex()
+screener_refresh = WarmupScheduler(refresh_screener,
+                                   normalize_symbols(s.strip() for s in SCREENER_UNIVERSE.split(',') if s.strip()),
+                                   SCREENER_REFRESH_TIMES, DOWNLOAD_CHUNK_SIZE)
+
+
+# Set IMPORT_WARMUP=0 to skip loading the data provider's libraries (e.g. yfinance) and starting
+# the compute processes in the background once the server is listening; the first tool call
+# then pays for them instead.
+IMPORT_WARMUP = os.environ.get('IMPORT_WARMUP', '1') == '1'
+
+
+async def warm_up_imports():
+    """
+    Loads the provider's deferred imports and starts the compute workers off the request path.
+    """
+    start = time.perf_counter()
+    try:
+        await run_blocking(download_pool, DOWNLOAD_TIMEOUT, provider.warm_up)
+        if compute_pool is not download_pool:
+            await run_blocking(compute_pool, COMPUTE_TIMEOUT, os.getpid)
+    except Exception as e:
+        STARTUP['warmup_error'] = f"{type(e).__name__}: {e}"
+    STARTUP['warmup_seconds'] = time.perf_counter() - start
+
 
 #### Tools ####
 # Add an addition tool
 @mcp.tool()
-def basicdata(company:list,start_date:str,end_date:str):
+async def basicdata(company:list,start_date:str,end_date:str,response_format:str='legacy',
+                    detail:str='full',precision:int=None,page_size:int=0,cursor:str=None,
+                    stream:bool=False,ctx:Context=None):
     """
     Fetches and analyzes comprehensive market data for given companies, including price data,
     technical indicators, and statistical metrics.
@@ -16,6 +496,26 @@ def basicdata(company:list,start_date:str,end_date:str):
         company (list): List of company symbols (e.g., ['RELIANCE', 'TCS'])
         start_date (str): Start date in 'YYYY-MM-DD' format (the difference between the start and end date should be 30 days)
         end_date (str): End date in 'YYYY-MM-DD' format (the difference between the start and end date should be 30 days)
+        response_format (str): 'legacy' (default) returns the list described below;
+            'columnar' returns one array per field instead of one dict per day, which is far
+            smaller for long ranges:
+                {'stats': {symbol: {...}},
+                 'rsi': {symbol: {'date': [...], 'rsi': [...], 'signal': [...]}},
+                 'atr': {symbol: {'date': [...], 'atr': [...], 'atr_percent': [...]}},
+                 'mfi': {symbol: {'date': [...], 'mfi': [...], 'typical_price': [...], 'money_flow': [...]}}}
+        detail (str): 'full' (default, every trading day), 'weekly-sampled' (last trading day
+            of each week plus the latest day) or 'latest' (latest trading day only)
+        precision (int, optional): Round numbers to this many decimal places (e.g. 2)
+        page_size (int, optional): Analyse at most this many companies per call. The result is then
+            {'results': <data in the format below>, 'next_cursor': str or None}; pass next_cursor
+            back as `cursor` (with the same other arguments) to get the next page.
+        cursor (str, optional): next_cursor from the previous page
+        stream (bool, optional): Send each company's data as a notification as soon as it is ready
+            instead of in the final result, which is then
+            {'symbols': [companies delivered], 'next_cursor': str or None}. The first companies
+            are analysed on their own, so their results arrive without waiting for a full batch
+
+    Progress notifications are sent after each batch of companies when the client requests them.
 
     Returns:
         list: A list containing 5 elements in the following order:
@@ -123,20 +623,102 @@ def basicdata(company:list,start_date:str,end_date:str):
             }
         ]
     """
-    return_data=[]
-    data=new.fetch_historical_nse_data(company, start_date, end_date)
-    stats=new.compute_summary_statistics(data)
-    rsi_signals=new.generate_rsi_signals(data)
-    atr_results=new.calculate_atr(data)
-    mfi_results=new.calculate_money_flow_index(data)
-    return_data.append(stats)
-    return_data.append(rsi_signals)
-    return_data.append(atr_results)
-    return_data.append(mfi_results)
+    symbols, next_cursor = page_symbols(company, cursor, page_size)
+    batches = symbol_batches(symbols, STREAM_FIRST_BATCH_SIZE if stream else SYMBOL_BATCH_SIZE) or [[]]
+
+    def start(batch):
+        key = (tuple(batch), start_date, end_date, response_format, detail, precision)
+        return asyncio.ensure_future(flights['basicdata'].run(
+            key, analyse_batch, batch, start_date, end_date, response_format, detail, precision
+        ))
+
+    parts = []
+    delivered = []
+    async with tool_limits['basicdata']:
+        # The next batch starts while the current one is still being analysed
+        pending = start(batches[0])
+        try:
+            for i, batch in enumerate(batches):
+                current = pending
+                pending = start(batches[i + 1]) if i + 1 < len(batches) else None
+                part = await current
+                if stream:
+                    for symbol, result in split_by_symbol(part, response_format).items():
+                        await notify_result(ctx, 'basicdata', symbol, result)
+                        delivered.append(symbol)
+                else:
+                    parts.append(part)
+                done = sum(len(b) for b in batches[:i + 1])
+                await notify_progress(ctx, done, len(symbols), f"{done}/{len(symbols)} companies analysed")
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    if stream:
+        return {'symbols': delivered, 'next_cursor': next_cursor}
+    return_data = merge_responses(parts, response_format)
+    if page_size > 0 or cursor:
+        return {'results': return_data, 'next_cursor': next_cursor}
     return return_data
 
 @mcp.tool()
-def sentimentdata(company:list,start_date:str,end_date:str):    
+async def digest(company:list,start_date:str,end_date:str,max_episodes:int=3,ctx:Context=None):
+    """
+    Summarizes each company's price action, technical indicators and market sentiment in a compact,
+    fixed-size digest computed on the server. Use this instead of basicdata when you need an overview:
+    the result has the same size whether the range covers a month or ten years.
+
+    Args:
+        company (list): List of company symbols (e.g., ['RELIANCE', 'TCS'])
+        start_date (str): Start date in 'YYYY-MM-DD' format
+        end_date (str): End date in 'YYYY-MM-DD' format
+        max_episodes (int, optional): Deepest drawdown episodes listed per company (default 3)
+
+    Progress notifications are sent after each batch of companies when the client requests them.
+
+    Returns:
+        dict: { symbol: {
+            'period': {'start', 'end', 'bars'}
+            'price': {'first_close', 'last_close', 'change_percent', 'high', 'low'}
+            'returns': {'avg_return', 'volatility' (daily), 'annualized_volatility', 'max_drawdown'}
+                (fractions, e.g. 0.15 = 15%)
+            'trend': {
+                'slope_percent_per_bar': Fitted % change per trading day over the whole range
+                'recent_slope_percent_per_bar': The same over the last 20 trading days
+                'sma50' (or 'sma20' for short ranges): Moving average of the last 50 (20) closes
+                'above_sma' (bool): Last close above that average
+                'regime': 'uptrend' | 'downtrend' | 'sideways'
+            }
+            'drawdowns': {'episodes': number of peak-to-recovery declines,
+                          'deepest': [{'peak_date', 'trough_date', 'recovery_date' (None if not
+                                       recovered yet), 'depth' (fraction), 'bars'}]}
+            'rsi': {'latest', 'mean', 'min', 'max',
+                    'overbought_days' (RSI >= 70), 'oversold_days' (RSI <= 30),
+                    'latest_signal' (1 buy, -1 sell, 0 hold), 'last_signal': {'date', 'signal'} or None}
+            'atr': {'latest', 'latest_percent', 'median_percent',
+                    'volatility_regime': 'high' | 'normal' | 'low' (latest ATR % vs its median)}
+            'mfi': {'latest', 'mean', 'overbought_days' (MFI > 80), 'oversold_days' (MFI < 20)}
+            'sentiment': {'days', 'news_mean', 'social_mean' (-1 to 1), 'recent_news_mean',
+                          'recent_social_mean' (last 7 days), 'news_count', 'social_mentions',
+                          'tone': 'positive' | 'neutral' | 'negative'}
+        } }
+        Companies without price data are omitted; sections without enough bars are None.
+    """
+    symbols = normalize_symbols(company)
+    result = {}
+    async with tool_limits['digest']:
+        for i in range(0, len(symbols), SYMBOL_BATCH_SIZE):
+            batch = symbols[i:i + SYMBOL_BATCH_SIZE]
+            key = (tuple(batch), start_date, end_date, max_episodes)
+            result.update(await flights['digest'].run(key, digest_batch, batch, start_date, end_date,
+                                                      max_episodes))
+            await notify_progress(ctx, i + len(batch), len(symbols), f"Digested {i + len(batch)} companies")
+    return result
+
+
+@mcp.tool()
+async def sentimentdata(company:list,start_date:str,end_date:str,aggregate:str=None,window:int=7,
+                        ctx:Context=None):
     '''
     Fetches market sentiment data from news headlines and social media for given symbols.
     This is a placeholder function that simulates sentiment data collection.
@@ -145,6 +727,15 @@ def sentimentdata(company:list,start_date:str,end_date:str):
         symbols (list of str): List of stock symbols to analyze
         start_date (str): Start date in 'YYYY-MM-DD' format (the difference between the start and end date should be 30 days)
         end_date (str): End date in 'YYYY-MM-DD' format (the difference between the start and end date should be 30 days)
+        aggregate (str, optional): Return compact arrays instead of daily entries:
+            'daily' (one value per day, no headlines), 'weekly' (mean sentiment and total counts per
+            week, keyed by 'week_start', plus 'days') or 'rolling' (trailing `window`-day mean
+            sentiment and total counts for each day):
+                {symbol: {'date': [...], 'news_sentiment': [...], 'social_sentiment': [...],
+                          'news_count': [...], 'social_mentions': [...]}}
+        window (int, optional): Days in the rolling window (default 7)
+
+    Progress notifications are sent after each batch of companies when the client requests them.
 
     Returns:
         dict: {
@@ -165,11 +756,278 @@ def sentimentdata(company:list,start_date:str,end_date:str):
         }
     '''
 
-    sentiment_data = new.fetch_market_sentiment(company, start_date, end_date)
+    symbols = normalize_symbols(company)
+    key = ('sentimentdata', tuple(symbols), start_date, end_date, aggregate, window)
+    sentiment_data = result_cache.get(key) if result_cache is not None else None
+    if sentiment_data is not None:
+        await notify_progress(ctx, len(symbols), len(symbols))
+        return sentiment_data
+    sentiment_data = {}
+    done = 0
+    async with tool_limits['sentimentdata']:
+        for batch in symbol_batches(symbols, SYMBOL_BATCH_SIZE):
+            batch_key = ('sentimentdata', tuple(batch), start_date, end_date, aggregate, window)
+            # The store is vectorized and in memory, so a thread beats pickling to a process
+            if aggregate is None:
+                part = await flights['sentimentdata'].run(
+                    batch_key, run_blocking, download_pool, COMPUTE_TIMEOUT, new.fetch_market_sentiment,
+                    batch, start_date, end_date, store=sentiment_store
+                )
+            else:
+                part = await flights['sentimentdata'].run(
+                    batch_key, run_blocking, download_pool, COMPUTE_TIMEOUT, sentiment_store.aggregate,
+                    batch, start_date, end_date, aggregate, window
+                )
+            sentiment_data.update(part)
+            done += len(batch)
+            await notify_progress(ctx, done, len(symbols), f"{done}/{len(symbols)} companies scored")
+    if result_cache is not None:
+        result_cache.put(key, sentiment_data, end_date)
     return sentiment_data
 
 
+def options_response(spots, valuation_date, expiry_dates, strikes_per_side, rate, include_contracts):
+    """
+    Builds and analyses option chains for the optionsdata tool; NaN becomes None for JSON.
+    """
+    chain = synthetic_chain(spots, valuation_date, expiry_dates, strikes_per_side, rate)
+    analysis = analyze_chains(chain, spots, valuation_date, rate)
+    response = {'valuation_date': valuation_date, 'summary': analysis['summary']}
+    if include_contracts:
+        contracts = analysis['contracts']
+        columns = {field: values.tolist() for field, values in contracts.items()
+                   if field not in ('symbol', 'expiry')}
+        columns['expiry'] = [str(e) for e in contracts['expiry'].astype('datetime64[D]')]
+        by_symbol = {}
+        for i, symbol in enumerate(contracts['symbol'].tolist()):
+            rows = by_symbol.setdefault(symbol, {field: [] for field in columns})
+            for field, values in columns.items():
+                value = values[i]
+                rows[field].append(None if isinstance(value, float) and math.isnan(value) else value)
+        response['contracts'] = by_symbol
+    return response
+
+
+@mcp.tool()
+async def optionsdata(company:list,expiry_dates:list=None,strikes_per_side:int=10,rate:float=DEFAULT_RATE,
+                      include_contracts:bool=False):
+    """
+    Analyzes option chains for several companies and expiries at once: max pain, put/call ratios,
+    implied volatility and Black-Scholes Greeks. Chains are simulated around each company's
+    latest close (placeholder for a live options feed).
+
+    Args:
+        company (list): List of company symbols (e.g., ['RELIANCE', 'TCS'])
+        expiry_dates (list, optional): Expiry dates in 'YYYY-MM-DD' format, today or later (default:
+            the next three monthly expiries, the last Thursday of each month)
+        strikes_per_side (int, optional): Strikes above and below the at-the-money strike (default 10)
+        rate (float, optional): Annual risk-free rate (default 0.065)
+        include_contracts (bool, optional): Also return every contract's price, implied volatility
+            and Greeks (large); by default only the per-expiry summary is returned
+
+    Returns:
+        dict: {
+            'valuation_date': str,
+            'summary': list of dict, one per company and expiry:
+                - symbol (str), expiry (str), spot (float): latest close
+                - max_pain (float): Strike at which option holders would be paid the least at expiry;
+                    prices often gravitate towards it near expiry
+                - max_pain_payout (float): Total payout to holders if the stock settles at max_pain
+                - put_call_ratio (float): Put volume / call volume
+                    * > 1: More puts traded (bearish positioning or hedging)
+                    * < 1: More calls traded (bullish positioning)
+                - put_call_oi_ratio (float): Put open interest / call open interest
+                - atm_strike (float): Strike closest to spot
+                - atm_iv (float): At-the-money implied volatility (annualised, 0.25 = 25%)
+            'contracts' (only with include_contracts): { symbol: { 'expiry', 'option_type', 'strike',
+                'last_price', 'bid', 'ask', 'volume', 'open_interest', 'days_to_expiry', 'price',
+                'implied_volatility', 'delta', 'gamma', 'vega', 'theta', 'rho': list per contract } }
+        }
+    """
+    symbols = normalize_symbols(company)
+    valuation_date = today_ist().isoformat()
+    lookback = (today_ist() - timedelta(days=14)).isoformat()
+    async with tool_limits['optionsdata']:
+        data = await run_blocking(download_pool, DOWNLOAD_TIMEOUT, new.fetch_historical_nse_data,
+                                  symbols, lookback, valuation_date, as_frame=True, cache=price_cache,
+                                  provider=provider, chunk_size=DOWNLOAD_CHUNK_SIZE,
+                                  max_workers=DOWNLOAD_CHUNK_WORKERS, retries=DOWNLOAD_RETRIES,
+                                  backoff=DOWNLOAD_BACKOFF)
+        spots = {symbol: float(columns['close'][-1]) for symbol, columns in data.items()}
+        return await run_blocking(download_pool, COMPUTE_TIMEOUT, options_response, spots, valuation_date,
+                                  expiry_dates, strikes_per_side, rate, include_contracts)
+
+
+@mcp.tool()
+async def screener(filters:list=None,sort_by:str=None,descending:bool=True,limit:int=20,fields:list=None):
+    """
+    Screens the configured market universe (e.g. NIFTY 50) by each company's latest
+    technical indicators and ranks the matches. Answers from an index kept up to date on the server,
+    so use it to find candidates before fetching details with basicdata or digest.
+
+    Args:
+        filters (list, optional): Conditions that must all hold, as '<field> <op> <number>' strings with
+            op one of <, <=, >, >=, ==, != (e.g. ['rsi < 30', 'mfi < 20'])
+        sort_by (str, optional): Field to rank by (e.g. 'atr_percent' or 'max_drawdown'); default
+            is alphabetical by symbol
+        descending (bool, optional): Highest values first (default True)
+        limit (int, optional): Companies returned (default 20, 0 for all matches)
+        fields (list, optional): Fields included per company (default: all)
+
+        Fields (latest trading day, over the last year of prices):
+            'close', 'change_percent' (% vs previous close), 'return_20d' (% over 20 trading days),
+            'rsi' (14-day), 'rsi_signal' (1 buy, -1 sell, 0 hold), 'atr', 'atr_percent' (ATR as % of close),
+            'mfi' (14-day), 'avg_return', 'volatility' (daily, fractions), 'max_drawdown' (largest
+            peak-to-trough fall, fraction), 'drawdown' (current fall from the period high, fraction)
+
+    Returns:
+        dict: {
+            'as_of' (str): Date of the latest bar in the index
+            'universe' (int): Companies indexed
+            'matched' (int): Companies meeting all filters
+            'results' (list of dict): {'symbol', 'last_date', <fields>} in rank order; None where a
+                company has too few bars for an indicator
+        }
+    """
+    if not screener_refresh.symbols:
+        raise ValueError("No screener universe configured (set SCREENER_UNIVERSE, e.g. to nifty50)")
+    if not len(screener_index):
+        await flights['screener'].run('refresh', screener_refresh.run_once, 'on demand')
+        if not len(screener_index):
+            raise RuntimeError(f"Screener index could not be built: {'; '.join(screener_refresh.errors)}")
+    elif time.time() - screener_index.refreshed_at > SCREENER_MAX_AGE:
+        # Answer from the current index; pick up new bars for the next call
+        run_in_background(flights['screener'].run('refresh', screener_refresh.run_once, 'stale'),
+                          'screener refresh')
+    rows, matched = screener_index.query(filters or [], sort_by, descending, limit)
+    stats = screener_index.stats()
+    return {
+        'as_of': stats['as_of'],
+        'universe': stats['symbols'],
+        'matched': matched,
+        'results': screener_index.records(rows, fields or SCREENER_FIELDS)
+    }
+
+
+@mcp.tool()
+async def requeststats():
+    """
+    Reports how many tool calls were served by sharing an identical call already in progress,
+    and how often computed indicators came from the result cache.
+
+    Returns:
+        dict: { tool: {'calls': int, 'executed': int, 'coalesced': int, 'in_flight': int} }
+            where 'calls' counts batches for basicdata (one per SYMBOL_BATCH_SIZE companies),
+            plus 'result_cache': {'entries', 'bytes', 'max_bytes', 'hits', 'misses', 'hit_ratio',
+            'evictions'} (empty when the cache is disabled).
+    """
+    stats = {tool: flight.stats() for tool, flight in flights.items()}
+    stats['result_cache'] = result_cache.stats() if result_cache is not None else {}
+    return stats
+
+
+@mcp.tool()
+async def diagnostics(reset:bool=False):
+    """
+    Reports server metrics for capacity planning: per-tool latency and payload size histograms,
+    per-stage timings (download, indicator math, formatting), cache hit ratios and error counts.
+
+    Args:
+        reset (bool, optional): Clear the histograms and counters after reading them
+
+    Returns:
+        dict: {
+            'uptime' (float): Seconds since the metrics were started or reset
+            'histograms' (dict): { name: {'count', 'sum', 'mean', 'min', 'p50', 'p90', 'p99', 'max', 'buckets'} }
+                - 'tool.<tool>.seconds': Latency of each tool call
+                - 'tool.<tool>.payload_bytes': Size of each serialized result
+                - 'stage.<stage>': Time per stage, e.g. 'stage.fetch_historical_nse_data',
+                    'stage.download.provider', 'stage.compute_by_symbol', 'stage.indicator.rsi',
+                    'stage.basicdata_response'
+            'counters' (dict): { name: int }, e.g. 'tool.<tool>.calls', 'tool.<tool>.errors',
+                'tool.<tool>.errors.<ErrorType>', 'download.symbols.<status>', 'timeouts.<stage>',
+                'screener.symbols.checked', 'screener.symbols.recomputed'
+            'caches' (dict): 'result_cache' stats and 'price_cache' {'symbols_cached',
+                'symbols_downloaded', 'hit_ratio'}
+            'requests' (dict): Coalescing stats per tool (see requeststats)
+            'warmup' (dict): Watchlist warm-up status (see warmupstatus)
+            'screener' (dict): Screener index 'symbols', 'as_of', 'refreshed_at', 'updates' and
+                'refresh' (its refresh schedule, in the warmupstatus format)
+            'startup' (dict): 'import_seconds' (module load), 'ready_seconds' (until accepting
+                connections) and 'warmup_seconds' (background import warm-up), from server start
+        }
+    """
+    return metrics_snapshot(reset)
+
+
+@mcp.custom_route('/metrics', methods=['GET'])
+async def metrics_endpoint(request):
+    """
+    Serves the diagnostics tool's output over HTTP for scrapers and dashboards.
+    """
+    return JSONResponse(metrics_snapshot())
+
+
+@mcp.tool()
+async def warmupstatus():
+    """
+    Reports the background watchlist warm-up: whether it is running, how far the current refresh
+    has got and when data was last refreshed. basicdata calls for watchlist companies over the
+    last WATCHLIST_WINDOWS days (e.g. 30 days ending today) are answered from cache once a
+    refresh has completed.
+
+    Returns:
+        dict: {
+            'state' (str): 'stopped' (no watchlist), 'idle' or 'running'
+            'watchlist' (int): Number of companies kept warm
+            'progress' (dict): {'completed': int, 'total': int} companies in the current or last refresh
+            'reason' (str): 'startup' or 'scheduled'
+            'runs' (int): Refreshes completed
+            'started_at', 'last_refresh', 'next_refresh' (str or None): ISO times in IST
+            'last_duration' (float): Seconds the last refresh took
+            'failed' (list of str): Companies whose refresh failed
+            'errors' (list of str): Error messages of failed batches
+        }
+    """
+    return warmup.status()
+
+
+
+STARTUP['import_seconds'] = time.perf_counter() - STARTUP['started']
+
+
+async def serve():
+    """
+    Serves MCP over SSE; once the server is accepting connections, starts the import warm-up,
+    the watchlist warm-up and the screener index build in the background.
+    """
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(
+        mcp.sse_app(),
+        host=mcp.settings.host,
+        port=mcp.settings.port,
+        log_level=mcp.settings.log_level.lower()
+    ))
+    serving = asyncio.ensure_future(server.serve())
+    while not server.started and not serving.done():
+        await asyncio.sleep(0.01)
+    STARTUP['ready_seconds'] = time.perf_counter() - STARTUP['started']
+    background = []
+    if server.started:
+        if IMPORT_WARMUP:
+            background.append(asyncio.ensure_future(warm_up_imports()))
+        warmup.start()
+        screener_refresh.start()
+    try:
+        await serving
+    finally:
+        for task in background:
+            task.cancel()
+        await warmup.stop()
+        await screener_refresh.stop()
+
 
 if __name__ == "__main__":
     # Initialize and run the server
-    mcp.run(transport='sse')
\ No newline at end of file
+    asyncio.run(serve())
@@ -0,0 +1,374 @@
+import zlib
+from datetime import date, timedelta
+
+import numpy as np
+
+
+# Columns of an option chain table; every column is an array with one entry per contract
+CHAIN_FIELDS = ('symbol', 'expiry', 'option_type', 'strike', 'last_price', 'bid', 'ask', 'volume',
+                'open_interest')
+
+# Annual risk-free rate used when none is given (approximate Indian T-bill yield)
+DEFAULT_RATE = 0.065
+
+_SQRT_2PI = np.sqrt(2 * np.pi)
+
+
+def norm_cdf(x):
+    """
+    Standard normal CDF on arrays, accurate to double precision (Hart's rational approximation).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    z = np.abs(x)
+    e = np.exp(-z * z / 2)
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        num = ((((((0.0352624965998911 * z + 0.700383064443688) * z + 6.37396220353165) * z
+                  + 33.912866078383) * z + 112.079291497871) * z + 221.213596169931) * z + 220.206867912376)
+        den = (((((((0.0883883476483184 * z + 1.75566716318264) * z + 16.064177579207) * z
+                   + 86.7807322029461) * z + 296.564248779674) * z + 637.333633378831) * z
+                + 793.826512519948) * z + 440.413735824752)
+        near = e * num / den
+        tail = e / (z + 1 / (z + 2 / (z + 3 / (z + 4 / (z + 0.65))))) / _SQRT_2PI
+    tail_prob = np.where(z < 7.07106781186547, near, np.where(z < 37, tail, 0.0))
+    return np.where(x > 0, 1 - tail_prob, tail_prob)
+
+
+def norm_pdf(x):
+    x = np.asarray(x, dtype=np.float64)
+    return np.exp(-x * x / 2) / _SQRT_2PI
+
+
+def _d1_d2(spot, strike, t, rate, vol):
+    sqrt_t = np.sqrt(t)
+    d1 = (np.log(spot / strike) + (rate + vol * vol / 2) * t) / (vol * sqrt_t)
+    return d1, d1 - vol * sqrt_t
+
+
+def black_scholes(spot, strike, t, rate, vol, is_call):
+    """
+    European option prices under Black-Scholes, broadcast over array arguments.
+
+    Args:
+        spot, strike (array-like): Underlying and strike prices.
+        t (array-like): Years to expiry (> 0).
+        rate (float or array-like): Continuously compounded risk-free rate.
+        vol (array-like): Annualised volatility (> 0).
+        is_call (array-like of bool): True for calls, False for puts.
+
+    Returns:
+        numpy.ndarray: Option prices.
+    """
+    d1, d2 = _d1_d2(spot, strike, t, rate, vol)
+    discount = strike * np.exp(-rate * np.asarray(t))
+    call = spot * norm_cdf(d1) - discount * norm_cdf(d2)
+    put = discount * norm_cdf(-d2) - spot * norm_cdf(-d1)
+    return np.where(is_call, call, put)
+
+
+def greeks(spot, strike, t, rate, vol, is_call):
+    """
+    Black-Scholes Greeks, broadcast over array arguments (see black_scholes()).
+
+    Returns:
+        dict: 'delta', 'gamma', 'vega' (per 1.00 of volatility), 'theta' (per calendar day)
+            and 'rho' (per 1.00 of rate), each a numpy.ndarray.
+    """
+    t = np.asarray(t, dtype=np.float64)
+    d1, d2 = _d1_d2(spot, strike, t, rate, vol)
+    sqrt_t = np.sqrt(t)
+    pdf = norm_pdf(d1)
+    discount = strike * np.exp(-rate * t)
+    call_theta = -spot * pdf * vol / (2 * sqrt_t) - rate * discount * norm_cdf(d2)
+    put_theta = -spot * pdf * vol / (2 * sqrt_t) + rate * discount * norm_cdf(-d2)
+    return {
+        'delta': np.where(is_call, norm_cdf(d1), norm_cdf(d1) - 1),
+        'gamma': pdf / (spot * vol * sqrt_t),
+        'vega': spot * pdf * sqrt_t,
+        'theta': np.where(is_call, call_theta, put_theta) / 365,
+        'rho': np.where(is_call, discount * t * norm_cdf(d2), -discount * t * norm_cdf(-d2))
+    }
+
+
+def implied_volatility(price, spot, strike, t, rate, is_call, initial=0.3, tol=1e-8, max_iter=50,
+                       bounds=(1e-4, 5.0)):
+    """
+    Solves Black-Scholes implied volatility for many contracts at once.
+
+    All contracts take Newton steps together; a contract whose step leaves the bracket or
+    stalls on a tiny vega bisects its bracket instead. Contracts that have not converged after
+    max_iter iterations are NaN rather than their last iterate.
+
+    Args:
+        price (array-like): Observed option prices.
+        spot, strike, t, rate, is_call: As for black_scholes().
+        initial (float): Starting volatility.
+        tol (float): Price tolerance.
+        max_iter (int): Iteration limit.
+        bounds (tuple): (lowest, highest) volatility searched.
+
+    Returns:
+        numpy.ndarray: Implied volatilities; NaN where the price is outside the no-arbitrage range
+            (below intrinsic value or above the spot/discounted-strike bound), t <= 0, or no
+            volatility within `bounds` reprices the contract to `tol` in max_iter iterations.
+    """
+    arrays = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (price, spot, strike, t, rate, is_call)))
+    shape = arrays[0].shape
+    price, spot, strike, t, rate, is_call = (a.ravel() for a in arrays)
+    is_call = is_call.astype(bool)
+    valid_t = t > 0
+    t = np.where(valid_t, t, 1.0)
+    discount = strike * np.exp(-rate * t)
+    lower = np.where(is_call, np.maximum(spot - discount, 0), np.maximum(discount - spot, 0))
+    upper = np.where(is_call, spot, discount)
+    solvable = valid_t & (price > lower) & (price < upper)
+
+    vol = np.full(len(price), float(initial))
+    low = np.full(len(price), bounds[0])
+    high = np.full(len(price), bounds[1])
+    active = np.nonzero(solvable)[0]
+    for _ in range(max_iter):
+        if not len(active):
+            break
+        v, lo, hi = vol[active], low[active], high[active]
+        args = (spot[active], strike[active], t[active], rate[active], v, is_call[active])
+        diff = black_scholes(*args) - price[active]
+        # The price rises with volatility, so the sign of diff tells which side the root is on
+        hi = np.where(diff > 0, v, hi)
+        lo = np.where(diff < 0, v, lo)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = v - diff / greeks(*args)['vega']
+        bisect = ~np.isfinite(step) | (step <= lo) | (step >= hi)
+        done = np.abs(diff) < tol
+        vol[active] = np.where(done, v, np.where(bisect, (lo + hi) / 2, step))
+        low[active], high[active] = lo, hi
+        active = active[~done]
+    # Contracts still searching after max_iter (e.g. a root outside `bounds`) have no solution
+    solvable[active] = False
+    return np.where(solvable, vol, np.nan).reshape(shape)
+
+
+def _group_index(symbols, expiries):
+    # Dense group id per (symbol, expiry) pair, plus the sorted unique pairs
+    keys = np.rec.fromarrays([np.asarray(symbols, dtype=str), np.asarray(expiries, dtype='datetime64[D]')],
+                             names='symbol,expiry')
+    groups, index = np.unique(keys, return_inverse=True)
+    return groups, index.ravel()
+
+
+def max_pain(group, strike, call_oi, put_oi):
+    """
+    Finds the max pain strike of every group (e.g. one group per symbol and expiry).
+
+    Max pain is the settlement price, among the listed strikes, that minimises the total
+    intrinsic value paid to option holders: sum(call_oi * max(S - K, 0) + put_oi * max(K - S, 0)).
+    Computed for all groups in one pass with cumulative sums over sorted strikes.
+
+    Args:
+        group (array-like of int): Dense group id per contract (0 .. n_groups - 1).
+        strike (array-like): Strike per contract.
+        call_oi, put_oi (array-like): Open interest per contract (0 for the other type).
+
+    Returns:
+        tuple: (max pain strike per group, total payout at that strike per group) as arrays.
+    """
+    group = np.asarray(group)
+    strike = np.asarray(strike, dtype=np.float64)
+    # Collapse to one row per (group, strike), sorted by group then strike
+    pairs, row = np.unique(np.stack([group.astype(np.float64), strike]), axis=1, return_inverse=True)
+    row = row.ravel()
+    g, k = pairs[0].astype(np.int64), pairs[1]
+    coi = np.bincount(row, weights=call_oi, minlength=len(k))
+    poi = np.bincount(row, weights=put_oi, minlength=len(k))
+
+    def group_cumsum(values):
+        total = np.cumsum(values)
+        starts = np.searchsorted(g, g, side='left')
+        offset = np.where(starts > 0, total[starts - 1], 0.0)
+        return total - offset
+
+    def group_total(values):
+        return np.bincount(g, weights=values)[g]
+
+    # Calls pay S - K for strikes below S; puts pay K - S for strikes above S
+    call_payout = k * group_cumsum(coi) - group_cumsum(coi * k)
+    put_payout = (group_total(poi * k) - group_cumsum(poi * k)) - k * (group_total(poi) - group_cumsum(poi))
+    payout = call_payout + put_payout
+    order = np.lexsort((k, payout, g))
+    first = order[np.searchsorted(g[order], np.arange(g.max() + 1 if len(g) else 0))]
+    return k[first], payout[first]
+
+
+def _reject_expired(expiries, valuation_date):
+    # Expiries before the valuation date have no time value to solve for
+    expiries = np.unique(np.asarray(expiries, dtype='datetime64[D]'))
+    expired = expiries[expiries < np.datetime64(valuation_date, 'D')]
+    if len(expired):
+        raise ValueError(f"Expiries {[str(e) for e in expired]} are before the valuation date {valuation_date}")
+
+
+def last_thursdays(valuation_date, count=3):
+    """
+    The last Thursday of each of the next `count` months with one on or after valuation_date
+    (the NSE monthly expiry day).
+    """
+    day = date.fromisoformat(str(valuation_date))
+    expiries = []
+    year, month = day.year, day.month
+    while len(expiries) < count:
+        next_month = date(year + month // 12, month % 12 + 1, 1)
+        last = next_month - timedelta(days=1)
+        expiry = last - timedelta(days=(last.weekday() - 3) % 7)
+        if expiry >= day:
+            expiries.append(expiry.isoformat())
+        year, month = next_month.year, next_month.month
+    return expiries
+
+
+def synthetic_chain(spots, valuation_date, expiries=None, strikes_per_side=10, rate=DEFAULT_RATE, seed=0):
+    """
+    Generates a deterministic option chain for many symbols, as a placeholder for a real feed.
+
+    Prices come from Black-Scholes with a per-symbol volatility smile, so implied volatilities
+    recovered from the chain are realistic. Open interest peaks near the money.
+
+    Args:
+        spots (dict): { symbol: underlying price }.
+        valuation_date (str): Pricing date in 'YYYY-MM-DD'.
+        expiries (list of str, optional): Expiry dates on or after valuation_date (default: next
+            three monthly expiries).
+        strikes_per_side (int): Strikes above and below the at-the-money strike.
+        rate (float): Risk-free rate.
+        seed (int): Random seed.
+
+    Returns:
+        dict: Chain table with the CHAIN_FIELDS columns, one row per contract.
+
+    Raises:
+        ValueError: If an expiry is before valuation_date.
+    """
+    expiries = expiries or last_thursdays(valuation_date)
+    _reject_expired(expiries, valuation_date)
+    valuation = np.datetime64(valuation_date, 'D')
+    offsets = np.arange(-strikes_per_side, strikes_per_side + 1)
+    parts = []
+    for symbol, spot in spots.items():
+        rng = np.random.default_rng([seed, zlib.crc32(symbol.encode()), int(valuation.astype(np.int64))])
+        magnitude = 10 ** np.floor(np.log10(spot * 0.025))
+        step = magnitude * min((1, 2, 2.5, 5, 10), key=lambda m: abs(m * magnitude - spot * 0.025))
+        strikes = np.round(spot / step) * step + offsets * step
+        strikes = strikes[strikes > 0]
+        base_vol, skew = rng.uniform(0.18, 0.45), rng.uniform(0.05, 0.2)
+        for expiry in expiries:
+            t = max((np.datetime64(expiry, 'D') - valuation).astype(np.int64), 1) / 365
+            n = len(strikes)
+            strike = np.concatenate([strikes, strikes])
+            is_call = np.repeat([True, False], n)
+            moneyness = np.log(strike / spot) / np.sqrt(t)
+            vol = base_vol - skew * moneyness * 0.1 + 0.05 * moneyness ** 2
+            theo = black_scholes(spot, strike, t, rate, vol, is_call)
+            spread = np.maximum(0.05, theo * rng.uniform(0.005, 0.03, 2 * n))
+            tick = 0.05
+            bid = np.maximum(np.round((theo - spread / 2) / tick) * tick, 0.0)
+            ask = np.round((theo + spread / 2) / tick) * tick
+            last = np.round(theo * (1 + rng.normal(0, 0.01, 2 * n)) / tick) * tick
+            open_interest = (rng.lognormal(9, 0.5, 2 * n) * np.exp(-2 * moneyness ** 2)).astype(np.int64)
+            volume = (open_interest * rng.uniform(0.05, 0.5, 2 * n)).astype(np.int64)
+            parts.append({
+                'symbol': np.full(2 * n, symbol),
+                'expiry': np.full(2 * n, np.datetime64(expiry, 'D')),
+                'option_type': np.where(is_call, 'call', 'put'),
+                'strike': strike,
+                'last_price': last,
+                'bid': bid,
+                'ask': ask,
+                'volume': volume,
+                'open_interest': open_interest
+            })
+    if not parts:
+        return {field: np.empty(0) for field in CHAIN_FIELDS}
+    return {field: np.concatenate([part[field] for part in parts]) for field in CHAIN_FIELDS}
+
+
+def analyze_chains(chain, spots, valuation_date, rate=DEFAULT_RATE):
+    """
+    Implied volatility, Greeks, max pain and put/call ratios for option chains of many symbols
+    and expiries in one vectorized pass.
+
+    Args:
+        chain (dict): Table with the CHAIN_FIELDS columns (see synthetic_chain()). Contracts are
+            priced at the bid/ask midpoint when both are quoted, otherwise at last_price.
+        spots (dict): { symbol: underlying price }.
+        valuation_date (str): Pricing date in 'YYYY-MM-DD'.
+        rate (float): Risk-free rate.
+
+    Returns:
+        dict: {
+            'contracts': the chain columns plus 'days_to_expiry', 'price', 'implied_volatility',
+                'delta', 'gamma', 'vega', 'theta' and 'rho' (numpy arrays, NaN where unsolvable),
+            'summary': list of dict per (symbol, expiry) with 'symbol', 'expiry', 'spot',
+                'max_pain', 'max_pain_payout', 'put_call_ratio' (volume), 'put_call_oi_ratio',
+                'atm_strike' and 'atm_iv' (mean of the at-the-money call and put IVs)
+        }
+
+    Raises:
+        ValueError: If the chain has contracts that expired before valuation_date.
+    """
+    symbols = np.asarray(chain['symbol'], dtype=str)
+    expiries = np.asarray(chain['expiry'], dtype='datetime64[D]')
+    _reject_expired(expiries, valuation_date)
+    strike = np.asarray(chain['strike'], dtype=np.float64)
+    is_call = np.asarray(chain['option_type']) == 'call'
+    bid = np.asarray(chain['bid'], dtype=np.float64)
+    ask = np.asarray(chain['ask'], dtype=np.float64)
+    volume = np.asarray(chain['volume'], dtype=np.float64)
+    open_interest = np.asarray(chain['open_interest'], dtype=np.float64)
+
+    spot_of = np.array([spots[s] for s in symbols], dtype=np.float64) if len(symbols) else np.empty(0)
+    days = (expiries - np.datetime64(valuation_date, 'D')).astype(np.int64)
+    t = days / 365
+    quoted = (bid > 0) & (ask > 0)
+    price = np.where(quoted, (bid + ask) / 2, np.asarray(chain['last_price'], dtype=np.float64))
+
+    iv = implied_volatility(price, spot_of, strike, t, rate, is_call)
+    solved = np.isfinite(iv)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        contract_greeks = greeks(spot_of, strike, np.where(t > 0, t, np.nan), rate, np.where(solved, iv, np.nan), is_call)
+
+    contracts = {field: np.asarray(chain[field]) for field in CHAIN_FIELDS}
+    contracts.update(days_to_expiry=days, price=price, implied_volatility=iv, **contract_greeks)
+
+    summary = []
+    if not len(symbols):
+        return {'contracts': contracts, 'summary': summary}
+    groups, group = _group_index(symbols, expiries)
+    n_groups = len(groups)
+    pain, payout = max_pain(group, strike, np.where(is_call, open_interest, 0.0),
+                            np.where(is_call, 0.0, open_interest))
+    call_volume = np.bincount(group, weights=volume * is_call, minlength=n_groups)
+    put_volume = np.bincount(group, weights=volume * ~is_call, minlength=n_groups)
+    call_oi = np.bincount(group, weights=open_interest * is_call, minlength=n_groups)
+    put_oi = np.bincount(group, weights=open_interest * ~is_call, minlength=n_groups)
+
+    # At-the-money strike: the listed strike closest to spot in each group
+    distance = np.abs(strike - spot_of)
+    order = np.lexsort((distance, group))
+    atm_strike = strike[order[np.searchsorted(group[order], np.arange(n_groups))]]
+    at_money = (strike == atm_strike[group]) & solved
+    atm_iv = np.bincount(group, weights=np.where(at_money, iv, 0.0), minlength=n_groups) / \
+        np.maximum(np.bincount(group, weights=at_money, minlength=n_groups), 1)
+    has_atm = np.bincount(group, weights=at_money, minlength=n_groups) > 0
+
+    spot_by_group = np.array([spots[s] for s in groups['symbol']], dtype=np.float64)
+    for i, (symbol, expiry) in enumerate(groups.tolist()):
+        summary.append({
+            'symbol': symbol,
+            'expiry': str(np.datetime64(expiry, 'D')),
+            'spot': float(spot_by_group[i]),
+            'max_pain': float(pain[i]),
+            'max_pain_payout': float(payout[i]),
+            'put_call_ratio': float(put_volume[i] / call_volume[i]) if call_volume[i] else None,
+            'put_call_oi_ratio': float(put_oi[i] / call_oi[i]) if call_oi[i] else None,
+            'atm_strike': float(atm_strike[i]),
+            'atm_iv': float(atm_iv[i]) if has_atm[i] else None
+        })
+    return {'contracts': contracts, 'summary': summary}
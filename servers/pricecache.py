@@ -0,0 +1,297 @@
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date, datetime, time as dtime, timedelta, timezone
+
+import numpy as np
+
+
+# NSE trades on Indian Standard Time
+IST = timezone(timedelta(hours=5, minutes=30))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    symbol TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, adj_close REAL,
+    volume INTEGER,
+    PRIMARY KEY (symbol, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    symbol TEXT NOT NULL,
+    start TEXT NOT NULL,
+    end TEXT NOT NULL,
+    PRIMARY KEY (symbol, start)
+);
+CREATE TABLE IF NOT EXISTS live (
+    symbol TEXT PRIMARY KEY,
+    date TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS access (
+    symbol TEXT PRIMARY KEY,
+    last_used REAL NOT NULL
+);
+"""
+
+_BAR_FIELDS = ('open', 'high', 'low', 'close', 'adj_close', 'volume')
+
+
+def today_ist():
+    """
+    Returns the current calendar date on the NSE (IST).
+    """
+    return datetime.now(IST).date()
+
+
+# Regular NSE session (IST). Bars are treated as live for SESSION_SETTLE after the close,
+# while data vendors publish the final print. Exchange holidays are not modelled.
+NSE_OPEN = dtime(9, 15)
+NSE_CLOSE = dtime(15, 30)
+SESSION_SETTLE = timedelta(minutes=15)
+
+
+def in_session(now=None):
+    """
+    Returns True while today's bar can still change: a weekday between the NSE open and
+    SESSION_SETTLE after the close.
+    """
+    now = now or datetime.now(IST)
+    settled = (datetime.combine(now.date(), NSE_CLOSE) + SESSION_SETTLE).time()
+    return now.weekday() < 5 and NSE_OPEN <= now.time() < settled
+
+
+def next_session_open(now=None):
+    """
+    Returns the next weekday NSE open (an aware IST datetime) after `now`.
+    """
+    now = now or datetime.now(IST)
+    day = now.date()
+    while True:
+        opening = datetime.combine(day, NSE_OPEN, tzinfo=IST)
+        if day.weekday() < 5 and opening > now:
+            return opening
+        day += timedelta(days=1)
+
+
+def _to_date(value):
+    return value if isinstance(value, date) else datetime.strptime(value, '%Y-%m-%d').date()
+
+
+class PriceCache:
+    """
+    On-disk SQLite cache of daily OHLCV bars keyed by symbol and trading date.
+
+    Closed calendar ranges that have already been downloaded are recorded per symbol, so
+    only the gaps of a requested range need to be fetched again. The current trading day is
+    tracked separately and re-fetched once it is older than `live_ttl` seconds, since its
+    bar keeps changing until the close.
+
+    Args:
+        path (str): SQLite database file (':memory:' for a throwaway cache).
+        max_bytes (int, optional): Size limit for stored data; least recently used symbols
+            are evicted once it is exceeded, except those held by in_use(). None disables eviction.
+        live_ttl (float): Seconds a fetched bar for the current trading day stays valid.
+            0 re-fetches it on every call.
+    """
+
+    def __init__(self, path='price_cache.sqlite', max_bytes=None, live_ttl=300):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.live_ttl = live_ttl
+        self._lock = threading.Lock()
+        self._in_use = Counter()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    def missing_ranges(self, symbol, start_date, end_date):
+        """
+        Returns the parts of [start_date, end_date] that are not cached for a symbol.
+
+        Args:
+            symbol (str): Symbol without the '.NS' suffix.
+            start_date (str or date): Inclusive start.
+            end_date (str or date): Inclusive end; dates after today are ignored.
+
+        Returns:
+            list of (date, date): Inclusive gaps in ascending order.
+        """
+        start, end = _to_date(start_date), min(_to_date(end_date), today_ist())
+        if start > end:
+            return []
+        today = today_ist()
+        with self._lock:
+            segments = self._conn.execute(
+                "SELECT start, end FROM coverage WHERE symbol = ? AND end >= ? AND start <= ? ORDER BY start",
+                (symbol, start.isoformat(), end.isoformat())
+            ).fetchall()
+            live = self._conn.execute(
+                "SELECT date, fetched_at FROM live WHERE symbol = ?", (symbol,)
+            ).fetchone()
+        if live and live[0] == today.isoformat() and (
+                self.live_ttl is None or time.time() - live[1] <= self.live_ttl):
+            segments.append((today.isoformat(), today.isoformat()))
+            segments.sort()
+
+        gaps = []
+        cursor = start
+        for seg_start, seg_end in segments:
+            seg_start, seg_end = _to_date(seg_start), _to_date(seg_end)
+            if seg_start > cursor:
+                gaps.append((cursor, min(seg_start - timedelta(days=1), end)))
+            cursor = max(cursor, seg_end + timedelta(days=1))
+            if cursor > end:
+                break
+        if cursor <= end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def store(self, symbol, columns, start_date, end_date):
+        """
+        Saves downloaded bars and marks [start_date, end_date] as covered for the symbol.
+
+        Args:
+            symbol (str): Symbol without the '.NS' suffix.
+            columns (dict, optional): One symbol's PriceFrame columns; None when the download
+                returned no bars (e.g. a holiday-only range).
+            start_date (str or date): Inclusive start of the downloaded range.
+            end_date (str or date): Inclusive end of the downloaded range.
+        """
+        start, end = _to_date(start_date), _to_date(end_date)
+        today = today_ist()
+        with self._lock, self._conn:
+            if columns is not None and len(columns['date']):
+                dates = np.datetime_as_string(columns['date'], unit='D').tolist()
+                rows = zip([symbol] * len(dates), dates, *(columns[field].tolist() for field in _BAR_FIELDS))
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+                )
+            # Only closed days count as covered; today is tracked in the live table
+            closed_end = min(end, today - timedelta(days=1))
+            if start <= closed_end:
+                self._merge_coverage(symbol, start, closed_end)
+            if start <= today <= end:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO live VALUES (?, ?, ?)", (symbol, today.isoformat(), time.time())
+                )
+            self._touch(symbol)
+        if self.max_bytes is not None:
+            self.evict(self.max_bytes)
+
+    @contextmanager
+    def in_use(self, symbols):
+        """
+        Keeps the given symbols from being evicted until the block exits, e.g. between storing a
+        request's downloads and loading them back; eviction then runs once if the cache is over
+        max_bytes.
+        """
+        symbols = list(symbols)
+        with self._lock:
+            self._in_use.update(symbols)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_use.subtract(symbols)
+                self._in_use += Counter()  # drop symbols no longer in use
+            if self.max_bytes is not None:
+                self.evict(self.max_bytes)
+
+    def load(self, symbol, start_date, end_date):
+        """
+        Reads cached bars for one symbol as PriceFrame columns.
+
+        Returns:
+            dict: Columns keyed like PriceFrame ('date', 'open', ..., 'volume'); may be empty arrays.
+        """
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT date, open, high, low, close, adj_close, volume FROM bars "
+                "WHERE symbol = ? AND date BETWEEN ? AND ? ORDER BY date",
+                (symbol, _to_date(start_date).isoformat(), _to_date(end_date).isoformat())
+            ).fetchall()
+            self._touch(symbol)
+        fields = list(zip(*rows)) if rows else [()] * 7
+        columns = {'date': np.array(fields[0], dtype='datetime64[D]')}
+        for field, values in zip(_BAR_FIELDS, fields[1:]):
+            columns[field] = np.array(values, dtype=np.int64 if field == 'volume' else np.float64)
+        return columns
+
+    def refresh_today(self, symbols=None):
+        """
+        Forces the current trading day to be re-fetched for the given symbols (default: all).
+        """
+        with self._lock, self._conn:
+            if symbols is None:
+                self._conn.execute("DELETE FROM live")
+            else:
+                self._conn.executemany("DELETE FROM live WHERE symbol = ?", [(s,) for s in symbols])
+
+    def invalidate(self, symbols=None):
+        """
+        Drops all cached bars and coverage for the given symbols (default: everything).
+        """
+        with self._lock, self._conn:
+            if symbols is None:
+                symbols = [row[0] for row in self._conn.execute("SELECT symbol FROM access")]
+            for symbol in symbols:
+                self._delete_symbol(symbol)
+
+    def size_bytes(self):
+        """
+        Returns the bytes used by live database pages (freed pages are not counted).
+        """
+        with self._lock:
+            page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+            page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            free_pages = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - free_pages) * page_size
+
+    def evict(self, max_bytes):
+        """
+        Evicts least recently used symbols until the cache fits in max_bytes.
+        The most recently used symbol and symbols held by in_use() are always kept.
+
+        Returns:
+            list of str: Evicted symbols.
+        """
+        evicted = []
+        while self.size_bytes() > max_bytes:
+            with self._lock, self._conn:
+                rows = self._conn.execute(
+                    "SELECT symbol FROM access ORDER BY last_used LIMIT ?", (len(self._in_use) + 2,)
+                ).fetchall()
+                candidates = [row[0] for row in rows[:-1] if row[0] not in self._in_use]
+                if len(rows) < 2 or not candidates:
+                    break
+                self._delete_symbol(candidates[0])
+            evicted.append(candidates[0])
+        return evicted
+
+    def close(self):
+        self._conn.close()
+
+    def _merge_coverage(self, symbol, start, end):
+        # Absorb every segment that overlaps or touches [start, end]
+        rows = self._conn.execute(
+            "SELECT start, end FROM coverage WHERE symbol = ? AND end >= ? AND start <= ?",
+            (symbol, (start - timedelta(days=1)).isoformat(), (end + timedelta(days=1)).isoformat())
+        ).fetchall()
+        for seg_start, seg_end in rows:
+            start = min(start, _to_date(seg_start))
+            end = max(end, _to_date(seg_end))
+        self._conn.executemany(
+            "DELETE FROM coverage WHERE symbol = ? AND start = ?", [(symbol, row[0]) for row in rows]
+        )
+        self._conn.execute(
+            "INSERT INTO coverage VALUES (?, ?, ?)", (symbol, start.isoformat(), end.isoformat())
+        )
+
+    def _touch(self, symbol):
+        self._conn.execute("INSERT OR REPLACE INTO access VALUES (?, ?)", (symbol, time.time()))
+
+    def _delete_symbol(self, symbol):
+        for table in ('bars', 'coverage', 'live', 'access'):
+            self._conn.execute(f"DELETE FROM {table} WHERE symbol = ?", (symbol,))
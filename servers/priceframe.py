@@ -0,0 +1,140 @@
+from collections import defaultdict
+
+import numpy as np
+
+
+PRICE_FIELDS = ('open', 'high', 'low', 'close', 'adj_close', 'volume')
+
+# yfinance column name for each PriceFrame field
+_YF_COLUMNS = {
+    'open': 'Open',
+    'high': 'High',
+    'low': 'Low',
+    'close': 'Close',
+    'adj_close': 'Adj Close',
+    'volume': 'Volume'
+}
+
+
+class PriceFrame:
+    """
+    Columnar OHLCV container holding one set of contiguous NumPy arrays per symbol.
+
+    Each symbol maps to a dict with keys 'date' (datetime64[D]), 'open', 'high', 'low',
+    'close', 'adj_close' (float64) and 'volume' (int64), all sorted by date.
+    Iterating a PriceFrame yields the same dicts fetch_historical_nse_data() has always
+    returned, so it can be passed anywhere a list of price records is expected.
+    """
+
+    def __init__(self, columns=None):
+        self._columns = dict(columns or {})
+
+    @classmethod
+    def from_download(cls, data, tickers):
+        """
+        Builds a PriceFrame straight from a yf.download(group_by='ticker') frame.
+
+        Args:
+            data (pandas.DataFrame): Frame with (ticker, field) column MultiIndex.
+            tickers (list of str): Tickers to extract, with or without the '.NS' suffix.
+
+        Returns:
+            PriceFrame: Symbols (without '.NS') in sorted order; missing tickers and tickers
+                without a single bar (yfinance's all-NaN columns for a failed ticker) are skipped.
+        """
+        frame = cls()
+        if data.empty:
+            return frame
+        for ticker in sorted(tickers, key=lambda t: t.replace('.NS', '')):
+            if ticker not in data:
+                continue
+            df = data[ticker].dropna(subset=['Close'])
+            if df.empty:
+                continue
+            index = df.index
+            if getattr(index, 'tz', None) is not None:
+                index = index.tz_localize(None)
+            columns = {'date': np.asarray(index.values, dtype='datetime64[D]')}
+            for field, yf_column in _YF_COLUMNS.items():
+                dtype = np.int64 if field == 'volume' else np.float64
+                columns[field] = np.ascontiguousarray(df[yf_column].to_numpy(dtype=dtype))
+            frame.add(ticker.replace('.NS', ''), columns)
+        return frame
+
+    @classmethod
+    def from_records(cls, price_records):
+        """
+        Builds a PriceFrame from a list of price record dicts.
+
+        Args:
+            price_records (list of dict): Records with at least 'symbol', 'date' and 'close'.
+                Missing price fields become NaN and a missing volume becomes 0.
+
+        Returns:
+            PriceFrame: Symbols in first-seen order, each sorted by date.
+        """
+        if isinstance(price_records, cls):
+            return price_records
+        symbol_records = defaultdict(list)
+        for rec in price_records:
+            symbol_records[rec['symbol']].append(rec)
+        frame = cls()
+        for symbol, records in symbol_records.items():
+            dates = np.array([r['date'] for r in records], dtype='datetime64[D]')
+            order = np.argsort(dates, kind='stable')
+            columns = {'date': dates[order]}
+            for field in PRICE_FIELDS:
+                if field == 'volume':
+                    values = np.array([r.get(field, 0) for r in records], dtype=np.int64)
+                else:
+                    values = np.array([r.get(field) for r in records], dtype=np.float64)
+                columns[field] = values[order]
+            frame.add(symbol, columns)
+        return frame
+
+    def add(self, symbol, columns):
+        """
+        Adds (or replaces) one symbol's columns. Arrays must be date-sorted and equal length.
+        """
+        self._columns[symbol] = columns
+
+    @property
+    def symbols(self):
+        return list(self._columns)
+
+    def items(self):
+        return self._columns.items()
+
+    def dates(self, symbol):
+        """
+        Returns the symbol's dates as 'YYYY-MM-DD' strings.
+        """
+        return np.datetime_as_string(self._columns[symbol]['date'], unit='D').tolist()
+
+    def to_records(self):
+        """
+        Returns the list-of-dicts view, sorted by symbol and date like fetch_historical_nse_data().
+        """
+        records = []
+        for symbol, columns in self._columns.items():
+            fields = [columns[field].tolist() for field in PRICE_FIELDS]
+            for date, *values in zip(self.dates(symbol), *fields):
+                rec = {'symbol': symbol, 'date': date}
+                rec.update(zip(PRICE_FIELDS, values))
+                records.append(rec)
+        return records
+
+    def __getitem__(self, symbol):
+        return self._columns[symbol]
+
+    def __contains__(self, symbol):
+        return symbol in self._columns
+
+    def __iter__(self):
+        return iter(self.to_records())
+
+    def __len__(self):
+        return sum(len(columns['date']) for columns in self._columns.values())
+
+    def __repr__(self):
+        return f"PriceFrame({len(self._columns)} symbols, {len(self)} bars)"
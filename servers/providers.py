@@ -0,0 +1,305 @@
+import os
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from priceframe import PRICE_FIELDS, PriceFrame
+
+
+class MarketDataProvider:
+    """
+    Source of daily OHLCV bars for fetch_historical_nse_data().
+
+    Subclasses implement download(); it must return a PriceFrame keyed by symbol
+    (without the '.NS' suffix) and silently skip symbols it has no data for.
+    `retry_missing` tells bulk downloads whether a skipped symbol may appear on a retry
+    (true for network sources that drop symbols on transient errors).
+    """
+
+    name = 'base'
+    retry_missing = True
+
+    def download(self, tickers, start_date, end_date):
+        """
+        Args:
+            tickers (list of str): NSE tickers with the '.NS' suffix.
+            start_date (str): Inclusive start date in 'YYYY-MM-DD'.
+            end_date (str): Inclusive end date in 'YYYY-MM-DD'.
+
+        Returns:
+            PriceFrame: Bars within [start_date, end_date] for every ticker the provider knows.
+        """
+        raise NotImplementedError
+
+    def warm_up(self):
+        """
+        Loads what the first download needs (heavy imports, fixtures) ahead of time.
+
+        Providers defer this work so the server can start quickly; the server calls warm_up()
+        in the background once it is accepting connections.
+        """
+
+
+class YFinanceProvider(MarketDataProvider):
+    """
+    Downloads bars from Yahoo Finance through yfinance.
+    """
+
+    name = 'yfinance'
+
+    def warm_up(self):
+        # yfinance pulls in pandas and requests, which take far longer to import than the server
+        import yfinance  # noqa: F401
+
+    def download(self, tickers, start_date, end_date):
+        import yfinance as yf
+
+        # yfinance treats `end` as exclusive
+        yf_end = (datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+        data = yf.download(
+            tickers,
+            start=start_date,
+            end=yf_end,
+            group_by='ticker',
+            auto_adjust=False,
+            progress=False
+        )
+        return PriceFrame.from_download(data, tickers)
+
+
+def _slice_frame(frame, tickers, start_date, end_date):
+    start, end = np.datetime64(start_date, 'D'), np.datetime64(end_date, 'D')
+    result = PriceFrame()
+    for ticker in sorted(tickers, key=lambda t: t.replace('.NS', '')):
+        symbol = ticker.replace('.NS', '')
+        if symbol not in frame:
+            continue
+        columns = frame[symbol]
+        lo = np.searchsorted(columns['date'], start, side='left')
+        hi = np.searchsorted(columns['date'], end, side='right')
+        if hi > lo:
+            result.add(symbol, {field: values[lo:hi] for field, values in columns.items()})
+    return result
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Serves bars from local CSV/Parquet fixtures held in memory, for offline and deterministic runs.
+    Fixture files are read on first use.
+
+    Args:
+        source (str or PriceFrame): A fixture file, a directory of fixture files, or an
+            in-memory PriceFrame. Fixture files need 'date', 'open', 'high', 'low', 'close',
+            'adj_close' and 'volume' columns (yfinance names such as 'Adj Close' also work)
+            plus a 'symbol' column, or one file per symbol named '<SYMBOL>.csv' / '<SYMBOL>.parquet'.
+    """
+
+    name = 'replay'
+    retry_missing = False
+
+    def __init__(self, source):
+        self.source = source
+        self._frame = source if isinstance(source, PriceFrame) else None
+        self._lock = threading.Lock()
+
+    @property
+    def frame(self):
+        if self._frame is None:
+            with self._lock:
+                if self._frame is None:
+                    self._frame = self._load(self.source)
+        return self._frame
+
+    def warm_up(self):
+        self.frame
+
+    def download(self, tickers, start_date, end_date):
+        return _slice_frame(self.frame, tickers, start_date, end_date)
+
+    @staticmethod
+    def _load(path):
+        import pandas as pd
+
+        if os.path.isdir(path):
+            files = sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.endswith(('.csv', '.parquet'))
+            )
+        else:
+            files = [path]
+
+        tables = []
+        for file in files:
+            table = pd.read_parquet(file) if file.endswith('.parquet') else pd.read_csv(file)
+            table.columns = [str(column).strip().lower().replace(' ', '_') for column in table.columns]
+            if 'symbol' not in table:
+                table['symbol'] = os.path.splitext(os.path.basename(file))[0]
+            tables.append(table)
+        if not tables:
+            return PriceFrame()
+        table = pd.concat(tables, ignore_index=True)
+        table['symbol'] = table['symbol'].astype(str).str.replace('.NS', '', regex=False)
+        table['date'] = pd.to_datetime(table['date']).dt.strftime('%Y-%m-%d')
+        if 'adj_close' not in table:
+            table['adj_close'] = table['close']
+
+        frame = PriceFrame()
+        for symbol, group in table.groupby('symbol', sort=True):
+            group = group.sort_values('date', kind='stable')
+            columns = {'date': group['date'].to_numpy(dtype='datetime64[D]')}
+            for field in PRICE_FIELDS:
+                dtype = np.int64 if field == 'volume' else np.float64
+                columns[field] = np.ascontiguousarray(group[field].to_numpy(dtype=dtype))
+            frame.add(symbol, columns)
+        return frame
+
+
+def write_fixture(frame, path):
+    """
+    Saves a PriceFrame as a replay fixture (CSV, or Parquet when path ends with '.parquet').
+
+    Args:
+        frame (PriceFrame): Bars to save, e.g. fetch_historical_nse_data(..., as_frame=True).
+        path (str): Output file.
+    """
+    import pandas as pd
+
+    table = pd.DataFrame(frame.to_records(), columns=('symbol', 'date') + PRICE_FIELDS)
+    if path.endswith('.parquet'):
+        table.to_parquet(path, index=False)
+    else:
+        table.to_csv(path, index=False)
+
+
+class SyntheticProvider(MarketDataProvider):
+    """
+    Generates geometric-Brownian-motion bars for any symbol, for load tests and benchmarks.
+
+    Every symbol gets its own random stream derived from `seed` and the symbol name, and paths
+    always start at `origin`, so the same symbol and date give the same bar on every call.
+
+    Args:
+        seed (int): Base random seed.
+        drift (float): Annualised drift of the log price.
+        volatility (float): Annualised volatility.
+        origin (str): First business day of every generated path ('YYYY-MM-DD').
+    """
+
+    name = 'synthetic'
+    retry_missing = False
+
+    def __init__(self, seed=0, drift=0.08, volatility=0.3, origin='2000-01-03'):
+        self.seed = seed
+        self.drift = drift
+        self.volatility = volatility
+        self.origin = np.datetime64(origin, 'D')
+
+    def download(self, tickers, start_date, end_date):
+        start = max(np.datetime64(start_date, 'D'), self.origin)
+        end = np.datetime64(end_date, 'D')
+        frame = PriceFrame()
+        if end < start:
+            return frame
+        # Business days from origin, so each date always maps to the same step of the path
+        all_dates = np.arange(self.origin, end + 1, dtype='datetime64[D]')
+        all_dates = all_dates[np.is_busday(all_dates)]
+        first = np.searchsorted(all_dates, start)
+        for ticker in sorted(tickers, key=lambda t: t.replace('.NS', '')):
+            symbol = ticker.replace('.NS', '')
+            columns = self._generate(symbol, len(all_dates))
+            columns = {field: values[first:] for field, values in columns.items()}
+            columns['date'] = all_dates[first:]
+            frame.add(symbol, columns)
+        return frame
+
+    def _generate(self, symbol, n):
+        # One stream per component, so the first k bars do not depend on how many are generated
+        key = zlib.crc32(symbol.encode())
+        streams = [np.random.default_rng([self.seed, key, k]) for k in range(6)]
+        step = self.volatility * np.sqrt(1 / 252)
+        start_price = streams[0].uniform(50, 5000)
+        log_returns = (self.drift - self.volatility ** 2 / 2) / 252 + step * streams[1].standard_normal(n)
+        close = start_price * np.exp(np.cumsum(log_returns))
+        prev_close = np.concatenate(([start_price], close[:-1]))
+        open_ = prev_close * np.exp(0.25 * step * streams[2].standard_normal(n))
+        high = np.maximum(open_, close) * np.exp(0.5 * step * np.abs(streams[3].standard_normal(n)))
+        low = np.minimum(open_, close) * np.exp(-0.5 * step * np.abs(streams[4].standard_normal(n)))
+        volume = streams[5].lognormal(mean=13, sigma=0.6, size=n).astype(np.int64)
+        return {
+            'open': open_,
+            'high': high,
+            'low': low,
+            'close': close,
+            'adj_close': close.copy(),
+            'volume': volume
+        }
+
+
+class FlakyProvider(MarketDataProvider):
+    """
+    Wraps another provider and injects latency, failed calls and dropped symbols, to measure
+    bulk-download throughput and retry behaviour offline.
+
+    Args:
+        inner (MarketDataProvider, optional): Source of the bars (default: SyntheticProvider()).
+        latency (float): Seconds every call takes before returning.
+        latency_per_symbol (float): Extra seconds per requested ticker.
+        failure_rate (float): Probability that a call raises ConnectionError.
+        missing_rate (float): Probability that each ticker is left out of a successful call.
+        seed (int): Seed for the injected faults.
+    """
+
+    name = 'flaky'
+
+    def __init__(self, inner=None, latency=0.05, latency_per_symbol=0.0, failure_rate=0.1,
+                 missing_rate=0.0, seed=0):
+        self.inner = inner or SyntheticProvider()
+        self.latency = latency
+        self.latency_per_symbol = latency_per_symbol
+        self.failure_rate = failure_rate
+        self.missing_rate = missing_rate
+        self.rng = np.random.default_rng(seed)
+        self.calls = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def warm_up(self):
+        self.inner.warm_up()
+
+    def download(self, tickers, start_date, end_date):
+        time.sleep(self.latency + self.latency_per_symbol * len(tickers))
+        with self._lock:
+            self.calls += 1
+            fail = self.rng.random() < self.failure_rate
+            keep = self.rng.random(len(tickers)) >= self.missing_rate
+            self.failures += fail
+        if fail:
+            raise ConnectionError(f"injected failure downloading {len(tickers)} tickers")
+        return self.inner.download([t for t, k in zip(tickers, keep) if k], start_date, end_date)
+
+
+PROVIDERS = {
+    'yfinance': YFinanceProvider,
+    'replay': ReplayProvider,
+    'synthetic': SyntheticProvider,
+    'flaky': FlakyProvider
+}
+
+
+def create_provider(name='yfinance', **options):
+    """
+    Builds a provider by name.
+
+    Args:
+        name (str): 'yfinance', 'replay', 'synthetic' or 'flaky'.
+        **options: Constructor arguments, e.g. source='fixtures/' for replay or seed=7 for synthetic.
+
+    Returns:
+        MarketDataProvider
+    """
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown market data provider {name!r}; expected one of {list(PROVIDERS)}")
+    return PROVIDERS[name](**options)
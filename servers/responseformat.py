@@ -0,0 +1,150 @@
+from datetime import date
+
+from resultcache import combine_by_symbol
+
+
+RESPONSE_FORMATS = ('legacy', 'columnar')
+DETAIL_LEVELS = ('full', 'weekly-sampled', 'latest')
+
+# Per-row fields of the dated indicators, in output order
+INDICATOR_FIELDS = {
+    'rsi': ('date', 'rsi', 'signal'),
+    'atr': ('date', 'atr', 'atr_percent'),
+    'mfi': ('date', 'mfi', 'typical_price', 'money_flow')
+}
+
+
+def _round(value, precision):
+    if precision is None or not isinstance(value, float):
+        return value
+    return round(value, precision)
+
+
+def _sample(rows, detail):
+    # rows are one symbol's dated dicts in date order
+    if detail == 'full' or not rows:
+        return rows
+    if detail == 'latest':
+        return rows[-1:]
+    # Last row of every ISO week, plus the final row so the latest value is always present
+    sampled = []
+    for i, row in enumerate(rows):
+        week = date.fromisoformat(row['date']).isocalendar()[:2]
+        if i + 1 == len(rows) or date.fromisoformat(rows[i + 1]['date']).isocalendar()[:2] != week:
+            sampled.append(row)
+    return sampled
+
+
+def _by_symbol(indicator, result):
+    # The RSI result is a flat list sorted by (symbol, date); the others are already keyed by symbol
+    if indicator != 'rsi':
+        return result
+    grouped = {}
+    for row in result:
+        grouped.setdefault(row['symbol'], []).append(row)
+    return grouped
+
+
+def format_indicators(indicators, response_format='legacy', detail='full', precision=None):
+    """
+    Shapes compute_indicators() output for a tool response.
+
+    Args:
+        indicators (dict): Output of compute_indicators() with 'stats', 'rsi', 'atr' and 'mfi'.
+        response_format (str): 'legacy' keeps the basicdata list of per-day dicts;
+            'columnar' returns one array per field for each symbol.
+        detail (str): 'full' (every day), 'weekly-sampled' (last trading day of each week
+            plus the latest day) or 'latest' (latest day only).
+        precision (int, optional): Decimal places to round floats to (default: no rounding).
+
+    Returns:
+        list or dict: 'legacy' gives [stats, rsi, atr, mfi] as before. 'columnar' gives
+            {'stats': {symbol: {...}}, 'rsi' / 'atr' / 'mfi': {symbol: {field: [values]}}}.
+    """
+    if response_format not in RESPONSE_FORMATS:
+        raise ValueError(f"response_format must be one of {RESPONSE_FORMATS}, got {response_format!r}")
+    if detail not in DETAIL_LEVELS:
+        raise ValueError(f"detail must be one of {DETAIL_LEVELS}, got {detail!r}")
+    if response_format == 'legacy' and detail == 'full' and precision is None:
+        # Nothing to reshape; the rows are shared, not copied
+        return [indicators['stats'], indicators['rsi'], indicators['atr'], indicators['mfi']]
+
+    stats = {
+        symbol: {key: _round(value, precision) for key, value in values.items()}
+        for symbol, values in indicators['stats'].items()
+    }
+    series = {}
+    for indicator, fields in INDICATOR_FIELDS.items():
+        series[indicator] = {}
+        for symbol, rows in _by_symbol(indicator, indicators[indicator]).items():
+            rows = _sample(rows, detail)
+            if response_format == 'columnar':
+                series[indicator][symbol] = {
+                    field: [_round(row[field], precision) for row in rows] for field in fields
+                }
+            else:
+                series[indicator][symbol] = [
+                    {key: _round(value, precision) for key, value in row.items()} for row in rows
+                ]
+
+    if response_format == 'columnar':
+        return {'stats': stats, **series}
+    rsi = [row for rows in series['rsi'].values() for row in rows]
+    return [stats, rsi, series['atr'], series['mfi']]
+
+
+def basicdata_response(by_symbol, response_format='legacy', detail='full', precision=None):
+    """
+    Shapes per-symbol basicdata indicators (see resultcache.compute_by_symbol()) with
+    format_indicators().
+    """
+    indicators = combine_by_symbol(by_symbol, ('stats', 'rsi', 'atr', 'mfi'))
+    return format_indicators(indicators, response_format, detail, precision)
+
+
+def split_by_symbol(response, response_format='legacy'):
+    """
+    Splits a format_indicators() response into one response of the same shape per symbol.
+
+    Returns:
+        dict: { symbol: response holding only that symbol }, in symbol order.
+    """
+    if response_format == 'columnar':
+        symbols = sorted({symbol for part in response.values() for symbol in part})
+        return {
+            symbol: {name: {symbol: part[symbol]} for name, part in response.items() if symbol in part}
+            for symbol in symbols
+        }
+    stats, rsi, atr, mfi = response
+    rsi_rows = {}
+    for row in rsi:
+        rsi_rows.setdefault(row['symbol'], []).append(row)
+    symbols = sorted(set(stats) | set(rsi_rows) | set(atr) | set(mfi))
+    return {
+        symbol: [
+            {symbol: stats[symbol]} if symbol in stats else {},
+            rsi_rows.get(symbol, []),
+            {symbol: atr[symbol]} if symbol in atr else {},
+            {symbol: mfi[symbol]} if symbol in mfi else {}
+        ]
+        for symbol in symbols
+    }
+
+
+def merge_responses(parts, response_format='legacy'):
+    """
+    Concatenates format_indicators() responses for disjoint, increasing symbol batches.
+    """
+    if response_format == 'columnar':
+        merged = {'stats': {}, **{name: {} for name in INDICATOR_FIELDS}}
+        for part in parts:
+            for name, values in part.items():
+                merged[name].update(values)
+        return merged
+    merged = [{}, [], {}, {}]
+    for stats, rsi, atr, mfi in parts:
+        merged[0].update(stats)
+        merged[1].extend(rsi)
+        merged[2].update(atr)
+        merged[3].update(mfi)
+    return merged
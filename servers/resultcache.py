@@ -0,0 +1,177 @@
+import functools
+import json
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+from new import compute_indicators
+from pricecache import in_session, next_session_open, today_ist
+from priceframe import PriceFrame
+
+
+class ResultCache:
+    """
+    In-process LRU cache for computed indicator results, bounded by memory.
+
+    Results for closed historical ranges never change, so they are kept until evicted. Results
+    for a range that reaches the current NSE session expire after `live_ttl` seconds, because
+    today's bar keeps moving until the close; outside trading hours they are kept until the
+    next session opens. Thread-safe.
+
+    Args:
+        max_bytes (int): Approximate memory budget (pickled size of the cached values).
+        live_ttl (float): Seconds a result whose range includes today stays valid.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, live_ttl=60):
+        self.max_bytes = max_bytes
+        self.live_ttl = live_ttl
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns the cached value for `key`, or None when absent or expired.
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.time():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, end_date=None):
+        """
+        Stores a value, evicting least recently used entries beyond max_bytes.
+
+        Args:
+            key (hashable): Cache key.
+            value: Result to cache; it is shared with later callers, so it must not be mutated.
+            end_date (str or date, optional): Last day the result covers; results reaching
+                today (IST) expire after live_ttl (or at the next session open when the market
+                is closed), older ones do not expire.
+        """
+        size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        if size > self.max_bytes:
+            return
+        expires = None
+        if isinstance(end_date, str):
+            end_date = date.fromisoformat(end_date)
+        if end_date is not None and end_date >= today_ist():
+            expires = time.time() + self.live_ttl
+            if not in_session():
+                expires = max(expires, next_session_open().timestamp())
+        with self._lock:
+            if key in self.entries:
+                self._drop(key)
+            self.entries[key] = (value, size, expires)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self._drop(next(iter(self.entries)))
+                self.evictions += 1
+
+    def invalidate(self, symbols=None):
+        """
+        Drops every entry (default) or the entries whose key starts with one of `symbols`.
+        """
+        with self._lock:
+            for key in list(self.entries):
+                if symbols is None or key[0] in symbols:
+                    self._drop(key)
+
+    def stats(self):
+        """
+        Returns:
+            dict: 'entries', 'bytes', 'max_bytes', 'hits', 'misses', 'hit_ratio', 'evictions'.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions
+            }
+
+    def memoize(self, func):
+        """
+        Decorator caching func(symbols, start_date, end_date, **params) results in this cache.
+
+        The key is the function name, the sorted symbols without '.NS', the dates and the
+        parameters, so the crew side or scripts can wrap their own data-plus-indicator helpers.
+        """
+        @functools.wraps(func)
+        def wrapper(symbols, start_date, end_date, **params):
+            key = (func.__name__, tuple(sorted({s.replace('.NS', '') for s in symbols})),
+                   start_date, end_date, _params_key(params))
+            value = self.get(key)
+            if value is None:
+                value = func(symbols, start_date, end_date, **params)
+                self.put(key, value, end_date)
+            return value
+        return wrapper
+
+    def _drop(self, key):
+        _, size, _ = self.entries.pop(key)
+        self.bytes -= size
+
+
+def _params_key(params):
+    return json.dumps(params or {}, sort_keys=True, default=str)
+
+
+def indicator_key(symbol, start_date, end_date, indicators, params=None):
+    """
+    Cache key for one symbol's compute_indicators() results.
+    """
+    return (symbol, start_date, end_date, tuple(indicators), _params_key(params))
+
+
+def compute_by_symbol(price_records, indicators=('stats', 'rsi', 'atr', 'mfi'), params=None):
+    """
+    Runs compute_indicators() and splits its output per symbol.
+
+    Returns:
+        dict: { symbol: { indicator: that symbol's part of the result (None if absent) } }
+    """
+    frame = PriceFrame.from_records(price_records)
+    results = compute_indicators(frame, indicators, params)
+    by_symbol = {symbol: {name: [] if name in ('sma', 'rsi') else None for name in indicators}
+                 for symbol in frame.symbols}
+    for name, result in results.items():
+        if name in ('sma', 'rsi'):
+            for row in result:
+                by_symbol[row['symbol']][name].append(row)
+        else:
+            for symbol, value in result.items():
+                by_symbol[symbol][name] = value
+    return by_symbol
+
+
+def combine_by_symbol(by_symbol, indicators=('stats', 'rsi', 'atr', 'mfi')):
+    """
+    Inverse of compute_by_symbol(): merges per-symbol results back into compute_indicators() shape.
+    """
+    results = {name: [] if name in ('sma', 'rsi') else {} for name in indicators}
+    for symbol in sorted(by_symbol):
+        for name in indicators:
+            value = by_symbol[symbol][name]
+            if name in ('sma', 'rsi'):
+                results[name].extend(value)
+            elif value is not None:
+                results[name][symbol] = value
+    return results
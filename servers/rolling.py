@@ -0,0 +1,90 @@
+import numpy as np
+
+
+SMOOTHING_MODES = ('sma', 'wilder')
+
+# Relative difference below which a short and a long SMA count as equal (no crossover)
+SMA_TIE_TOLERANCE = 1e-9
+
+
+def rolling_sum(values, window):
+    """
+    Computes the sum of every full window of `values` in O(n) using a cumulative sum.
+
+    Args:
+        values (array-like of float): Input series.
+        window (int): Window length (0 yields one empty-window sum per position).
+
+    Returns:
+        numpy.ndarray: len(values) - window + 1 sums, where element k is sum(values[k:k+window])
+            up to rounding (exactly 0 for windows of zeros). Empty when the series is shorter than the window.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if window > len(values):
+        return np.empty(0, dtype=np.float64)
+    cumulative = np.concatenate(([0.0], np.cumsum(values)))
+    sums = cumulative[window:] - cumulative[:len(cumulative) - window]
+    # A window of zeros sums to exactly 0, as a direct sum would; the cumulative-sum difference can
+    # leave rounding residue there, which would flip the `== 0` checks of RSI and MFI
+    nonzero = np.concatenate(([0], np.cumsum(values != 0)))
+    sums[nonzero[window:] == nonzero[:len(nonzero) - window]] = 0.0
+    return sums
+
+
+def rolling_mean(values, window):
+    """
+    Computes the simple moving average of every full window of `values`.
+
+    Args:
+        values (array-like of float): Input series.
+        window (int): Window length.
+
+    Returns:
+        numpy.ndarray: len(values) - window + 1 means, aligned like rolling_sum().
+    """
+    return rolling_sum(values, window) / window
+
+
+def wilder_mean(values, window):
+    """
+    Computes Wilder's smoothed average (RMA) of `values`.
+
+    The first value is the simple mean of the first `window` values; each later value is
+    (previous * (window - 1) + current) / window.
+
+    Args:
+        values (array-like of float): Input series.
+        window (int): Smoothing period.
+
+    Returns:
+        numpy.ndarray: len(values) - window + 1 values, aligned like rolling_sum().
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if window < 1 or window > len(values):
+        return np.empty(0, dtype=np.float64)
+    out = np.empty(len(values) - window + 1, dtype=np.float64)
+    avg = values[:window].sum() / window
+    out[0] = avg
+    for k, value in enumerate(values[window:].tolist(), start=1):
+        avg = (avg * (window - 1) + value) / window
+        out[k] = avg
+    return out
+
+
+def smoothed_mean(values, window, smoothing='sma'):
+    """
+    Dispatches to rolling_mean() or wilder_mean().
+
+    Args:
+        values (array-like of float): Input series.
+        window (int): Window / smoothing period.
+        smoothing (str): 'sma' for a simple moving average, 'wilder' for Wilder's smoothing.
+
+    Returns:
+        numpy.ndarray: len(values) - window + 1 values, aligned like rolling_sum().
+    """
+    if smoothing == 'sma':
+        return rolling_mean(values, window)
+    if smoothing == 'wilder':
+        return wilder_mean(values, window)
+    raise ValueError(f"smoothing must be one of {SMOOTHING_MODES}, got {smoothing!r}")
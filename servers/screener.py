@@ -0,0 +1,261 @@
+import heapq
+import re
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from new import compute_indicators
+from pricecache import IST
+from priceframe import PriceFrame
+
+
+# NIFTY 50 constituents, screened with SCREENER_UNIVERSE=nifty50
+NIFTY50 = (
+    'ADANIENT', 'ADANIPORTS', 'APOLLOHOSP', 'ASIANPAINT', 'AXISBANK', 'BAJAJ-AUTO', 'BAJAJFINSV',
+    'BAJFINANCE', 'BEL', 'BHARTIARTL', 'CIPLA', 'COALINDIA', 'DRREDDY', 'EICHERMOT', 'ETERNAL',
+    'GRASIM', 'HCLTECH', 'HDFCBANK', 'HDFCLIFE', 'HEROMOTOCO', 'HINDALCO', 'HINDUNILVR', 'ICICIBANK',
+    'INDUSINDBK', 'INFY', 'ITC', 'JIOFIN', 'JSWSTEEL', 'KOTAKBANK', 'LT', 'M&M', 'MARUTI',
+    'NESTLEIND', 'NTPC', 'ONGC', 'POWERGRID', 'RELIANCE', 'SBILIFE', 'SBIN', 'SHRIRAMFIN',
+    'SUNPHARMA', 'TATACONSUM', 'TATAMOTORS', 'TATASTEEL', 'TCS', 'TECHM', 'TITAN', 'TRENT',
+    'ULTRACEMCO', 'WIPRO'
+)
+
+# Latest value of each indexed field; all numeric, NaN when a symbol has too few bars
+SCREENER_FIELDS = (
+    'close', 'change_percent', 'return_20d', 'rsi', 'rsi_signal', 'atr', 'atr_percent', 'mfi',
+    'avg_return', 'volatility', 'max_drawdown', 'drawdown'
+)
+
+OPERATORS = ('<=', '>=', '==', '!=', '<', '>')
+_COMPARE = {'<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal,
+            '==': np.equal, '!=': np.not_equal}
+# Ranked matches up to this many go through a heap; more are taken from the sort field's index
+HEAP_SELECT_MAX = 256
+_FILTER = re.compile(r'^\s*(\w+)\s*(<=|>=|==|!=|<|>)\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*$')
+
+
+def parse_filter(text):
+    """
+    Parses a filter such as 'rsi < 30' into (field, operator, value).
+    """
+    match = _FILTER.match(text)
+    if match is None:
+        raise ValueError(f"Invalid filter {text!r}; expected '<field> <op> <number>' with op one of {OPERATORS}")
+    field, op, value = match.groups()
+    if field not in SCREENER_FIELDS:
+        raise ValueError(f"Unknown field {field!r}; expected one of {list(SCREENER_FIELDS)}")
+    return field, op, float(value)
+
+
+def latest_rows(frame):
+    """
+    Computes each symbol's latest indicator values with compute_indicators().
+
+    Args:
+        frame (PriceFrame): Bars per symbol, enough history for the indicators (e.g. a year).
+
+    Returns:
+        dict: 'symbol' (list), 'last_date' (datetime64[D] array) and one float array per SCREENER_FIELDS.
+    """
+    frame = PriceFrame.from_records(frame)
+    results = compute_indicators(frame, ('stats', 'rsi', 'atr', 'mfi'))
+    last_rsi = {}
+    for row in results['rsi']:
+        last_rsi[row['symbol']] = row
+    rows = {field: [] for field in ('symbol', 'last_date') + SCREENER_FIELDS}
+    nan = float('nan')
+    for symbol, columns in frame.items():
+        closes = columns['close']
+        stats = results['stats'].get(symbol) or {}
+        rsi = last_rsi.get(symbol)
+        atr = results['atr'].get(symbol) or []
+        mfi = results['mfi'].get(symbol) or []
+        rows['symbol'].append(symbol)
+        rows['last_date'].append(columns['date'][-1])
+        rows['close'].append(closes[-1])
+        rows['change_percent'].append((closes[-1] / closes[-2] - 1) * 100 if len(closes) > 1 else nan)
+        rows['return_20d'].append((closes[-1] / closes[-21] - 1) * 100 if len(closes) > 20 else nan)
+        rows['rsi'].append(rsi['rsi'] if rsi else nan)
+        rows['rsi_signal'].append(rsi['signal'] if rsi else nan)
+        rows['atr'].append(atr[-1]['atr'] if atr else nan)
+        rows['atr_percent'].append(atr[-1]['atr_percent'] if atr else nan)
+        rows['mfi'].append(mfi[-1]['mfi'] if mfi else nan)
+        rows['avg_return'].append(stats.get('avg_return', nan))
+        rows['volatility'].append(stats.get('volatility', nan))
+        rows['max_drawdown'].append(stats.get('max_drawdown', nan))
+        rows['drawdown'].append(1 - closes[-1] / closes.max())
+    result = {'symbol': rows['symbol'], 'last_date': np.array(rows['last_date'], dtype='datetime64[D]')}
+    result.update({field: np.array(rows[field], dtype=np.float64) for field in SCREENER_FIELDS})
+    return result
+
+
+class ScreenerIndex:
+    """
+    Latest indicator values for a universe of symbols, laid out for fast screening.
+
+    Each field is one NumPy array with a row per symbol. A sorted index (argsort, NaN excluded)
+    per field is built on first use and kept until the rows change, so a filter is two binary
+    searches; compound filters start from the most selective one and test the rest on its
+    candidates only, and top-k ranking uses heap selection. update() replaces or appends just
+    the given symbols' rows, so new bars only cost their own recomputation. Thread-safe.
+    """
+
+    def __init__(self):
+        self.symbols = []
+        self.positions = {}
+        self.columns = {field: np.empty(0) for field in SCREENER_FIELDS}
+        self.columns['last_date'] = np.empty(0, dtype='datetime64[D]')
+        self.refreshed_at = None
+        self.updates = 0
+        self._sorted = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def needs_update(self, symbol, last_date, close):
+        """
+        Returns True when `symbol` is not indexed or its latest bar (date or close) changed.
+        """
+        row = self.positions.get(symbol)
+        if row is None:
+            return True
+        return self.columns['last_date'][row] != np.datetime64(last_date, 'D') or \
+            self.columns['close'][row] != close
+
+    def update(self, rows=None):
+        """
+        Stores latest_rows() output, replacing existing symbols' rows and appending new ones.
+        Without rows, only records that the index was checked and is current.
+        """
+        with self._lock:
+            self.refreshed_at = time.time()
+            if rows is None or not rows['symbol']:
+                return
+            new_symbols = [symbol for symbol in rows['symbol'] if symbol not in self.positions]
+            if new_symbols:
+                for symbol in new_symbols:
+                    self.positions[symbol] = len(self.symbols)
+                    self.symbols.append(symbol)
+                grow = len(new_symbols)
+                for field, values in self.columns.items():
+                    filler = np.full(grow, np.datetime64('NaT') if field == 'last_date' else np.nan,
+                                     dtype=values.dtype)
+                    self.columns[field] = np.concatenate([values, filler])
+            index = np.fromiter((self.positions[symbol] for symbol in rows['symbol']), dtype=np.int64,
+                                count=len(rows['symbol']))
+            for field, values in self.columns.items():
+                values[index] = rows[field]
+            self._sorted.clear()
+            self.updates += len(index)
+
+    def _sorted_index(self, field):
+        entry = self._sorted.get(field)
+        if entry is None:
+            values = self.columns[field]
+            order = np.argsort(values, kind='stable')
+            # NaN sorts last; keep only rows with a value
+            order = order[:np.count_nonzero(~np.isnan(values))]
+            entry = self._sorted[field] = (order, values[order])
+        return entry
+
+    def _matches(self, field, op, value):
+        # Rows satisfying one filter, from two binary searches in the field's sorted index
+        order, ordered = self._sorted_index(field)
+        if op == '<':
+            return order[:np.searchsorted(ordered, value, 'left')]
+        if op == '<=':
+            return order[:np.searchsorted(ordered, value, 'right')]
+        if op == '>':
+            return order[np.searchsorted(ordered, value, 'right'):]
+        if op == '>=':
+            return order[np.searchsorted(ordered, value, 'left'):]
+        lo, hi = np.searchsorted(ordered, value, 'left'), np.searchsorted(ordered, value, 'right')
+        return order[lo:hi] if op == '==' else np.concatenate([order[:lo], order[hi:]])
+
+    def query(self, filters=(), sort_by=None, descending=True, limit=20):
+        """
+        Screens the universe.
+
+        Args:
+            filters (list): (field, operator, value) tuples or strings like 'rsi < 30', all of
+                which must hold.
+            sort_by (str, optional): Field to rank by (default: symbol order).
+            descending (bool): Rank highest first.
+            limit (int): Rows returned (0 = all matches).
+
+        Returns:
+            tuple: (row positions in rank order, number of matching symbols)
+        """
+        filters = [parse_filter(f if isinstance(f, str) else ' '.join(map(str, f))) for f in filters]
+        if sort_by is not None and sort_by not in SCREENER_FIELDS:
+            raise ValueError(f"Unknown sort field {sort_by!r}; expected one of {list(SCREENER_FIELDS)}")
+        with self._lock:
+            if filters:
+                # Start from the most selective filter and test the others on its rows only
+                ranges = sorted(((self._matches(*f), f) for f in filters), key=lambda entry: len(entry[0]))
+                candidates = ranges[0][0]
+                for _, (field, op, value) in ranges[1:]:
+                    values = self.columns[field][candidates]
+                    candidates = candidates[_COMPARE[op](values, value) & ~np.isnan(values)]
+                matched = len(candidates)
+            else:
+                candidates = None
+                matched = len(self.symbols)
+
+            k = limit if limit > 0 else matched
+            if sort_by is None:
+                rows = np.arange(len(self.symbols)) if candidates is None else candidates
+                rows = sorted(rows.tolist(), key=self.symbols.__getitem__)[:k]
+            elif candidates is None:
+                # The sorted index already holds the ranking
+                order, _ = self._sorted_index(sort_by)
+                rows = (order[::-1] if descending else order)[:k].tolist()
+            elif len(candidates) <= HEAP_SELECT_MAX:
+                values = self.columns[sort_by]
+                ranked = [row for row in candidates.tolist() if not np.isnan(values[row])]
+                select = heapq.nlargest if descending else heapq.nsmallest
+                rows = select(k, ranked, key=values.__getitem__)
+            else:
+                # Many matches: keep the sorted index's order, masked to the matches
+                order, _ = self._sorted_index(sort_by)
+                selected = np.zeros(len(self.symbols), dtype=bool)
+                selected[candidates] = True
+                order = order[::-1] if descending else order
+                rows = order[selected[order]][:k].tolist()
+            return rows, matched
+
+    def records(self, rows, fields=None, precision=4):
+        """
+        Returns the given rows as dicts with 'symbol', 'last_date' and the requested fields.
+        """
+        fields = fields or SCREENER_FIELDS
+        unknown = [field for field in fields if field not in SCREENER_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields {unknown}; expected any of {list(SCREENER_FIELDS)}")
+        result = []
+        for row in rows:
+            record = {'symbol': self.symbols[row], 'last_date': str(self.columns['last_date'][row])}
+            for field in fields:
+                value = float(self.columns[field][row])
+                record[field] = None if np.isnan(value) else round(value, precision)
+            result.append(record)
+        return result
+
+    def stats(self):
+        """
+        Returns:
+            dict: 'symbols', 'as_of' (latest bar date), 'refreshed_at' (ISO time in IST) and
+                'updates' (rows recomputed since start).
+        """
+        dates = self.columns['last_date']
+        dates = dates[~np.isnat(dates)]
+        return {
+            'symbols': len(self.symbols),
+            'as_of': str(dates.max()) if len(dates) else None,
+            'refreshed_at': datetime.fromtimestamp(self.refreshed_at, IST).isoformat(timespec='seconds')
+            if self.refreshed_at else None,
+            'updates': self.updates
+        }
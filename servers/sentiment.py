@@ -0,0 +1,187 @@
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+from rolling import rolling_mean, rolling_sum
+
+
+# Calendar days generated per (symbol, block); block k covers days [k * BLOCK_DAYS, (k + 1) * BLOCK_DAYS)
+# counted from 1970-01-01, so any date maps to the same block and values on every call
+BLOCK_DAYS = 256
+
+SENTIMENT_FIELDS = ('news_sentiment', 'social_sentiment', 'news_count', 'social_mentions')
+AGGREGATES = ('daily', 'weekly', 'rolling')
+
+HEADLINE_TEMPLATES = (
+    "{symbol} announces quarterly results",
+    "Analysts bullish on {symbol}",
+    "{symbol} expands into new markets",
+    "Market reacts to {symbol} news",
+    "{symbol} partners with tech giant"
+)
+
+
+def _day(value):
+    return np.datetime64(value, 'D')
+
+
+class SentimentStore:
+    """
+    Daily news and social sentiment per symbol, indexed by symbol and date.
+
+    This is a placeholder for a real sentiment feed: values are synthetic but deterministic.
+    Each symbol's history is generated in vectorized blocks of BLOCK_DAYS calendar days from a
+    random stream seeded by `seed`, the symbol and the block number, so a given symbol and date
+    always get the same values however the range is queried. Generated blocks are kept in an
+    LRU of at most `max_blocks` entries and range queries slice them with binary search.
+
+    Args:
+        seed (int): Base random seed.
+        max_blocks (int): Generated (symbol, block) entries kept in memory (~11 KB each).
+    """
+
+    def __init__(self, seed=0, max_blocks=8192):
+        self.seed = seed
+        self.max_blocks = max_blocks
+        self.blocks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _generate(self, symbol, block):
+        rng = np.random.default_rng([self.seed, zlib.crc32(symbol.encode()), block + 2 ** 31])
+        n = BLOCK_DAYS
+        first = np.datetime64('1970-01-01', 'D') + block * BLOCK_DAYS
+        return {
+            'date': np.arange(first, first + n, dtype='datetime64[D]'),
+            'news_sentiment': np.round(rng.uniform(-1, 1, n), 2),
+            'social_sentiment': np.round(rng.uniform(-1, 1, n), 2),
+            'news_count': rng.integers(5, 51, n),
+            'social_mentions': rng.integers(10, 201, n),
+            # Three distinct headline templates per day, in random order
+            'headlines': np.argsort(rng.random((n, len(HEADLINE_TEMPLATES))), axis=1)[:, :3].astype(np.int8)
+        }
+
+    def _block(self, symbol, block):
+        key = (symbol, block)
+        with self._lock:
+            columns = self.blocks.get(key)
+            if columns is not None:
+                self.blocks.move_to_end(key)
+                return columns
+        columns = self._generate(symbol, block)
+        with self._lock:
+            self.blocks[key] = columns
+            while len(self.blocks) > self.max_blocks:
+                self.blocks.popitem(last=False)
+        return columns
+
+    def query(self, symbol, start_date, end_date):
+        """
+        Returns one symbol's daily sentiment between two dates (inclusive).
+
+        Returns:
+            dict: Columns 'date' (datetime64[D]), 'news_sentiment', 'social_sentiment',
+                'news_count', 'social_mentions' and 'headlines' (indices into HEADLINE_TEMPLATES).
+        """
+        start, end = _day(start_date), _day(end_date)
+        if end < start:
+            return {field: values[:0] for field, values in self._block(symbol, 0).items()}
+        epoch = np.datetime64('1970-01-01', 'D')
+        first = int((start - epoch).astype(np.int64)) // BLOCK_DAYS
+        last = int((end - epoch).astype(np.int64)) // BLOCK_DAYS
+        parts = [self._block(symbol, block) for block in range(first, last + 1)]
+        columns = parts[0] if len(parts) == 1 else \
+            {field: np.concatenate([part[field] for part in parts]) for field in parts[0]}
+        lo = np.searchsorted(columns['date'], start, side='left')
+        hi = np.searchsorted(columns['date'], end, side='right')
+        return {field: values[lo:hi] for field, values in columns.items()}
+
+    def records(self, symbols, start_date, end_date):
+        """
+        Returns sentiment in the fetch_market_sentiment() format: { symbol: list of daily dicts }.
+        """
+        result = {}
+        for symbol in symbols:
+            columns = self.query(symbol, start_date, end_date)
+            headlines = [template.format(symbol=symbol) for template in HEADLINE_TEMPLATES]
+            result[symbol] = [
+                {
+                    'date': date,
+                    'news_sentiment': news,
+                    'social_sentiment': social,
+                    'news_count': news_count,
+                    'social_mentions': mentions,
+                    'top_headlines': [headlines[i] for i in picks]
+                }
+                for date, news, social, news_count, mentions, picks in zip(
+                    np.datetime_as_string(columns['date'], unit='D').tolist(),
+                    columns['news_sentiment'].tolist(), columns['social_sentiment'].tolist(),
+                    columns['news_count'].tolist(), columns['social_mentions'].tolist(),
+                    columns['headlines'].tolist()
+                )
+            ]
+        return result
+
+    def aggregate(self, symbols, start_date, end_date, freq='daily', window=7):
+        """
+        Aggregates sentiment per symbol, one array per field.
+
+        Args:
+            symbols (list of str): Symbols.
+            start_date (str): Start date in 'YYYY-MM-DD'.
+            end_date (str): End date in 'YYYY-MM-DD'.
+            freq (str): 'daily' (one value per day), 'weekly' (per Monday-based week: mean
+                sentiment, summed counts) or 'rolling' (trailing `window`-day mean sentiment and
+                summed counts for every day; earlier days are read so the first window is full).
+            window (int): Window length in days for 'rolling'.
+
+        Returns:
+            dict: { symbol: {'date' or 'week_start': [str], 'news_sentiment': [float],
+                'social_sentiment': [float], 'news_count': [int], 'social_mentions': [int]} },
+                with 'days' (days in each week) for 'weekly'.
+        """
+        if freq not in AGGREGATES:
+            raise ValueError(f"freq must be one of {AGGREGATES}, got {freq!r}")
+        if freq == 'rolling' and window < 1:
+            raise ValueError(f"window must be at least 1 day, got {window!r}")
+        result = {}
+        for symbol in symbols:
+            if freq == 'rolling':
+                history_start = _day(start_date) - (window - 1)
+                columns = self.query(symbol, history_start, end_date)
+                dates = columns['date'][window - 1:]
+                values = {
+                    'news_sentiment': np.round(rolling_mean(columns['news_sentiment'], window), 4),
+                    'social_sentiment': np.round(rolling_mean(columns['social_sentiment'], window), 4),
+                    'news_count': rolling_sum(columns['news_count'], window).astype(np.int64),
+                    'social_mentions': rolling_sum(columns['social_mentions'], window).astype(np.int64)
+                }
+                label = 'date'
+            elif freq == 'weekly':
+                columns = self.query(symbol, start_date, end_date)
+                days = columns['date'].astype(np.int64)
+                # 1970-01-01 was a Thursday, so (days + 3) % 7 is the weekday with Monday = 0
+                weeks, week_index, counts = np.unique(days - (days + 3) % 7, return_inverse=True,
+                                                      return_counts=True)
+                dates = weeks.astype('datetime64[D]')
+
+                def weekly_sum(field):
+                    return np.bincount(week_index, weights=columns[field], minlength=len(weeks))
+
+                values = {
+                    'news_sentiment': np.round(weekly_sum('news_sentiment') / np.maximum(counts, 1), 4),
+                    'social_sentiment': np.round(weekly_sum('social_sentiment') / np.maximum(counts, 1), 4),
+                    'news_count': weekly_sum('news_count').astype(np.int64),
+                    'social_mentions': weekly_sum('social_mentions').astype(np.int64),
+                    'days': counts
+                }
+                label = 'week_start'
+            else:
+                columns = self.query(symbol, start_date, end_date)
+                dates = columns['date']
+                values = {field: columns[field] for field in SENTIMENT_FIELDS}
+                label = 'date'
+            result[symbol] = {label: np.datetime_as_string(dates, unit='D').tolist()}
+            result[symbol].update({field: values[field].tolist() for field in values})
+        return result
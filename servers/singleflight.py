@@ -0,0 +1,58 @@
+import asyncio
+
+
+class SingleFlight:
+    """
+    Shares one in-flight computation among concurrent calls with the same key.
+
+    The first call for a key starts the work; calls arriving while it runs await the same task
+    and get the same result (or exception). Once it finishes the key is forgotten, so later
+    calls start fresh. A caller that is cancelled does not cancel the work for the others.
+    """
+
+    def __init__(self):
+        self.in_flight = {}
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+
+    async def run(self, key, func, *args, **kwargs):
+        """
+        Awaits func(*args, **kwargs) (a coroutine function), or the call already running for `key`.
+
+        Args:
+            key (hashable): Normalized call arguments.
+
+        Returns:
+            The coroutine's result.
+        """
+        self.calls += 1
+        task = self.in_flight.get(key)
+        if task is None:
+            self.executed += 1
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        # Mark the exception as retrieved when every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self):
+        """
+        Returns:
+            dict: 'calls', 'executed', 'coalesced' (calls that reused another call's work)
+                and 'in_flight' (keys running now).
+        """
+        return {
+            'calls': self.calls,
+            'executed': self.executed,
+            'coalesced': self.coalesced,
+            'in_flight': len(self.in_flight)
+        }
@@ -0,0 +1,159 @@
+"""
+Cold-start benchmark for the MCP server.
+
+Starts newmcpserver in fresh processes and measures how long it takes to import, to accept
+connections, and to answer a first basicdata call over SSE. Also lists heavy libraries that
+were loaded at import time although they are only needed later. Uses the synthetic provider
+by default so no network is involved; results can be saved and compared like benchmark.py.
+
+Usage:
+    python servers/startupbench.py                          # 5 runs, print a table
+    python servers/startupbench.py --no-warmup              # without the background import warm-up
+    python servers/startupbench.py --output startup.json    # save a baseline
+    python servers/startupbench.py --compare startup.json   # fail on >20% slowdowns
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+from benchmark import _metadata, compare
+
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Libraries the server should only load on first use
+DEFERRED_MODULES = ('yfinance', 'pandas', 'requests', 'scipy', 'pyarrow')
+
+IMPORT_SCRIPT = f"""
+import json, sys, time
+start = time.perf_counter()
+import newmcpserver
+print(json.dumps({{'seconds': time.perf_counter() - start,
+                  'loaded': [m for m in {DEFERRED_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _environment(provider, warmup, port=None):
+    env = dict(os.environ, MARKET_DATA_PROVIDER=provider, PRICE_CACHE_PATH='',
+               IMPORT_WARMUP='1' if warmup else '0', WATCHLIST='', SCREENER_UNIVERSE='')
+    if port is not None:
+        env.update(FASTMCP_HOST='127.0.0.1', FASTMCP_PORT=str(port), FASTMCP_LOG_LEVEL='WARNING')
+    return env
+
+
+def measure_import(provider, warmup):
+    """
+    Returns (seconds to import newmcpserver in a fresh interpreter, deferred modules it loaded).
+    """
+    output = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT], cwd=SERVER_DIR, check=True,
+                            capture_output=True, text=True, env=_environment(provider, warmup)).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result['seconds'], result['loaded']
+
+
+async def _first_call(url):
+    async with sse_client(url) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            result = await session.call_tool('basicdata', {'company': ['RELIANCE'], 'start_date': '2024-12-01',
+                                                           'end_date': '2024-12-31'})
+            if result.isError:
+                raise RuntimeError(result.content[0].text)
+
+
+def measure_server(provider, warmup, timeout=60):
+    """
+    Starts the server and returns seconds from launch until it accepts connections and until
+    a first basicdata call returns.
+    """
+    port = _free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, 'newmcpserver.py'], cwd=SERVER_DIR,
+                               env=_environment(provider, warmup, port),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with code {process.returncode}")
+            if time.perf_counter() - start > timeout:
+                raise TimeoutError(f"server not ready within {timeout}s")
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.005)
+        ready = time.perf_counter() - start
+        asyncio.run(_first_call(f"http://127.0.0.1:{port}/sse"))
+        return ready, time.perf_counter() - start
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def run(repeat=5, provider='synthetic', warmup=True):
+    """
+    Returns:
+        dict: {'import' | 'ready' | 'first_call': {'wall_s': median seconds, 'min_s', 'max_s'}},
+            plus 'loaded_at_import' (deferred modules found loaded after import).
+    """
+    samples = {'import': [], 'ready': [], 'first_call': []}
+    loaded = set()
+    for _ in range(repeat):
+        seconds, modules = measure_import(provider, warmup)
+        samples['import'].append(seconds)
+        loaded.update(modules)
+        ready, first_call = measure_server(provider, warmup)
+        samples['ready'].append(ready)
+        samples['first_call'].append(first_call)
+    results = {
+        name: {'wall_s': statistics.median(values), 'min_s': min(values), 'max_s': max(values)}
+        for name, values in samples.items()
+    }
+    return results, sorted(loaded)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='server starts to time (default: 5)')
+    parser.add_argument('--provider', default='synthetic', help='MARKET_DATA_PROVIDER for the server (default: synthetic)')
+    parser.add_argument('--no-warmup', action='store_true', help='start the server with IMPORT_WARMUP=0')
+    parser.add_argument('--output', help='write results as a JSON baseline')
+    parser.add_argument('--compare', help='compare against a JSON baseline and exit 1 on regressions')
+    parser.add_argument('--threshold', type=float, default=1.2, help='regression ratio (default: 1.2)')
+    args = parser.parse_args(argv)
+
+    results, loaded = run(args.repeat, args.provider, not args.no_warmup)
+    for name, result in results.items():
+        print(f"{name:<12} {result['wall_s'] * 1000:>9.1f} ms  (min {result['min_s'] * 1000:.1f}, "
+              f"max {result['max_s'] * 1000:.1f})")
+    print(f"deferred modules loaded at import: {', '.join(loaded) or 'none'}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'meta': _metadata(), 'results': results, 'loaded_at_import': loaded}, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"comparing against {baseline['meta'].get('commit') or args.compare}")
+        if compare(results, baseline['results'], args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
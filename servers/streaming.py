@@ -0,0 +1,381 @@
+import copy
+import json
+import os
+from collections import deque
+
+import numpy as np
+
+from rolling import SMA_TIE_TOLERANCE
+
+
+class _Window:
+    """
+    Fixed-length window with a running sum and a count of non-zero entries.
+
+    The non-zero count lets callers test "sum == 0" exactly even after float drift.
+    """
+
+    def __init__(self, size, values=(), total=0.0, nonzero=0):
+        self.size = size
+        self.values = deque(values)
+        self.total = total
+        self.nonzero = nonzero
+
+    def push(self, value):
+        """
+        Appends a value, evicting the oldest once full, and returns an undo record for pop().
+        """
+        undo = [self.total, self.nonzero, False, None]
+        self.values.append(value)
+        self.total += value
+        self.nonzero += value != 0
+        if len(self.values) > self.size:
+            old = self.values.popleft()
+            self.total -= old
+            self.nonzero -= old != 0
+            undo[2:] = [True, old]
+        return undo
+
+    def pop(self, undo):
+        """
+        Reverts the last push() in O(1), given the record it returned.
+        """
+        total, nonzero, evicted, old = undo
+        self.values.pop()
+        if evicted:
+            self.values.appendleft(old)
+        # Restore the sums exactly rather than subtracting, so replacements do not accumulate drift
+        self.total = total
+        self.nonzero = nonzero
+
+    @property
+    def full(self):
+        return len(self.values) == self.size
+
+    def to_dict(self):
+        return {'size': self.size, 'values': list(self.values), 'total': self.total, 'nonzero': self.nonzero}
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(state['size'], state['values'], state['total'], state['nonzero'])
+
+
+# Per-bar state restored by IndicatorState._revert(); the windows are reverted push by push
+_SCALARS = ('bars', 'last_date', 'prev_close', 'prev_typical_price', 'avg_gain', 'avg_loss',
+            'avg_true_range', 'peak', 'max_drawdown', 'latest')
+
+
+class IndicatorState:
+    """
+    Incremental RSI, ATR, MFI, SMA-crossover and drawdown state for one symbol.
+
+    Each update() costs O(1) in the length of the history and returns the same values the
+    batch functions in new.py produce for that bar. Feeding a bar with the same date as the
+    previous one replaces it, so intraday polls can keep revising the current day's bar.
+
+    Args:
+        symbol (str): Symbol without the '.NS' suffix.
+        rsi_period (int): RSI period (default: 14).
+        atr_period (int): ATR period (default: 14).
+        mfi_period (int): MFI period (default: 14).
+        short_window (int): Short SMA window (default: 20).
+        long_window (int): Long SMA window (default: 50).
+        overbought (int): RSI sell threshold (default: 70).
+        oversold (int): RSI buy threshold (default: 30).
+        smoothing (str): 'sma' or 'wilder' averaging for RSI and ATR (default: 'sma').
+    """
+
+    def __init__(self, symbol, rsi_period=14, atr_period=14, mfi_period=14, short_window=20,
+                 long_window=50, overbought=70, oversold=30, smoothing='sma'):
+        if smoothing not in ('sma', 'wilder'):
+            raise ValueError(f"smoothing must be 'sma' or 'wilder', got {smoothing!r}")
+        self.symbol = symbol
+        self.params = {
+            'rsi_period': rsi_period,
+            'atr_period': atr_period,
+            'mfi_period': mfi_period,
+            'short_window': short_window,
+            'long_window': long_window,
+            'overbought': overbought,
+            'oversold': oversold,
+            'smoothing': smoothing
+        }
+        self.bars = 0
+        self.last_date = None
+        self.prev_close = None
+        self.prev_typical_price = None
+        self.gains = _Window(rsi_period)
+        self.losses = _Window(rsi_period)
+        self.avg_gain = None
+        self.avg_loss = None
+        self.true_ranges = _Window(atr_period)
+        self.avg_true_range = None
+        self.positive_flows = _Window(mfi_period - 1)
+        self.negative_flows = _Window(mfi_period - 1)
+        self.short_closes = _Window(short_window)
+        self.long_closes = _Window(long_window)
+        self.peak = None
+        self.max_drawdown = 0
+        self.latest = None
+        # How to revert the last bar: its pushes and the scalar state before it
+        self._undo = None
+
+    @classmethod
+    def from_history(cls, symbol, columns, **params):
+        """
+        Seeds a state from one symbol's PriceFrame columns.
+
+        With SMA smoothing only the bars still inside an indicator window are replayed;
+        drawdown is computed over the full history in one vectorized pass.
+
+        Returns:
+            IndicatorState: Positioned after the last bar, with `latest` set.
+        """
+        state = cls(symbol, **params)
+        n = len(columns['date'])
+        if state.params['smoothing'] == 'wilder':
+            tail = n
+        else:
+            windows = [state.params[key] for key in ('rsi_period', 'atr_period', 'mfi_period',
+                                                     'short_window', 'long_window')]
+            tail = min(n, max(windows) + 1)
+        head = n - tail
+        if head:
+            closes = columns['close'][:head]
+            peaks = np.maximum.accumulate(closes)
+            state.peak = peaks[-1].item()
+            state.max_drawdown = max(0, ((peaks - closes) / peaks).max().item())
+            state.bars = head
+            state.prev_close = closes[-1].item()
+            state.prev_typical_price = ((columns['high'][head - 1] + columns['low'][head - 1]
+                                         + columns['close'][head - 1]) / 3).item()
+        dates = np.datetime_as_string(columns['date'][head:], unit='D').tolist()
+        fields = [columns[field][head:].tolist() for field in ('high', 'low', 'close', 'volume')]
+        for date, high, low, close, volume in zip(dates, *fields):
+            state.update({'date': date, 'high': high, 'low': low, 'close': close, 'volume': volume})
+        return state
+
+    def update(self, bar):
+        """
+        Applies one bar and returns the indicator values as of that bar.
+
+        Args:
+            bar (dict): Keys 'date' ('YYYY-MM-DD'), 'high', 'low', 'close', 'volume'.
+
+        Returns:
+            dict: Keys 'symbol', 'date', 'close', 'rsi', 'rsi_signal', 'atr', 'atr_percent',
+                'mfi', 'short_sma', 'long_sma', 'sma_signal', 'drawdown', 'max_drawdown'.
+                Indicators without enough history yet are None.
+        """
+        if bar['date'] == self.last_date and self._undo is not None:
+            self._revert()
+        elif self.last_date is not None and bar['date'] < self.last_date:
+            raise ValueError(f"{self.symbol}: bar for {bar['date']} is older than {self.last_date}")
+        self._undo = {'scalars': {key: getattr(self, key) for key in _SCALARS}, 'pushes': []}
+
+        p = self.params
+        high, low, close, volume = bar['high'], bar['low'], bar['close'], bar['volume']
+        i = self.bars
+        result = {'symbol': self.symbol, 'date': bar['date'], 'close': close}
+
+        # RSI over the last rsi_period price changes
+        rsi = None
+        if self.prev_close is not None:
+            delta = close - self.prev_close
+            self._push_average('gains', delta if delta > 0 else 0)
+            self._push_average('losses', -delta if delta < 0 else 0)
+            if self.avg_gain is not None:
+                no_losses = self.losses.nonzero == 0 if p['smoothing'] == 'sma' else self.avg_loss == 0
+                rsi = 100 if no_losses else 100 - (100 / (1 + self.avg_gain / self.avg_loss))
+        result['rsi'] = rsi
+        result['rsi_signal'] = None if rsi is None else (
+            1 if rsi <= p['oversold'] else -1 if rsi >= p['overbought'] else 0
+        )
+
+        # ATR over the last atr_period true ranges
+        atr = None
+        if self.prev_close is not None:
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+            self._push_average('true_ranges', true_range)
+            atr = self.avg_true_range
+        result['atr'] = atr
+        result['atr_percent'] = None if atr is None else (atr / close) * 100
+
+        # MFI for bar i uses the money flows of bars i-mfi_period+1 .. i-1
+        typical_price = (high + low + close) / 3
+        mfi = None
+        if i >= p['mfi_period']:
+            if self.negative_flows.nonzero == 0:
+                mfi = 100
+            else:
+                mfi = 100 - (100 / (1 + self.positive_flows.total / self.negative_flows.total))
+        if self.prev_typical_price is not None:
+            money_flow = typical_price * volume
+            rising = typical_price > self.prev_typical_price
+            self._push('positive_flows', money_flow if rising else 0.0)
+            self._push('negative_flows', 0.0 if rising else money_flow)
+        result['mfi'] = mfi
+
+        # SMA crossover
+        self._push('short_closes', close)
+        self._push('long_closes', close)
+        short_sma = self.short_closes.total / p['short_window'] if self.short_closes.full else None
+        long_sma = self.long_closes.total / p['long_window'] if self.long_closes.full else None
+        sma_signal = 0
+        # SMAs within rounding error of each other (e.g. on flat prices) are a tie, as in the batch path
+        if short_sma is not None and long_sma is not None and \
+                abs(short_sma - long_sma) > SMA_TIE_TOLERANCE * abs(long_sma):
+            sma_signal = 1 if short_sma > long_sma else -1
+        result['short_sma'] = short_sma
+        result['long_sma'] = long_sma
+        result['sma_signal'] = sma_signal
+
+        # Running drawdown from the highest close so far
+        self.peak = close if self.peak is None or close > self.peak else self.peak
+        drawdown = (self.peak - close) / self.peak
+        self.max_drawdown = max(self.max_drawdown, drawdown)
+        result['drawdown'] = drawdown
+        result['max_drawdown'] = self.max_drawdown
+
+        self.bars += 1
+        self.last_date = bar['date']
+        self.prev_close = close
+        self.prev_typical_price = typical_price
+        self.latest = result
+        return result
+
+    def to_dict(self):
+        """
+        Returns a JSON-serializable checkpoint of the state.
+        """
+        state = self._snapshot()
+        state['undo'] = self._undo
+        return state
+
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Restores a state saved with to_dict().
+        """
+        restored = cls(state['symbol'], **state['params'])
+        restored._restore(state)
+        restored._undo = state.get('undo')
+        return restored
+
+    def _push(self, name, value):
+        # Pushes onto the named window and remembers how to take it back
+        self._undo['pushes'].append([name, getattr(self, name).push(value)])
+
+    def _revert(self):
+        # Undoes the last bar in O(1): pops its pushes in reverse and restores the scalars
+        for name, undo in reversed(self._undo['pushes']):
+            getattr(self, name).pop(undo)
+        for key, value in self._undo['scalars'].items():
+            setattr(self, key, value)
+        self._undo = None
+
+    def _push_average(self, name, value):
+        # Maintains the window's average as a simple mean or, once it is full, Wilder's smoothing
+        self._push(name, value)
+        window = getattr(self, name)
+        attr = {'gains': 'avg_gain', 'losses': 'avg_loss', 'true_ranges': 'avg_true_range'}[name]
+        if not window.full and getattr(self, attr) is None:
+            return
+        if self.params['smoothing'] == 'wilder' and getattr(self, attr) is not None:
+            size = window.size
+            setattr(self, attr, (getattr(self, attr) * (size - 1) + value) / size)
+        else:
+            setattr(self, attr, window.total / window.size)
+
+    def _snapshot(self):
+        return {
+            'symbol': self.symbol,
+            'params': dict(self.params),
+            'bars': self.bars,
+            'last_date': self.last_date,
+            'prev_close': self.prev_close,
+            'prev_typical_price': self.prev_typical_price,
+            'gains': self.gains.to_dict(),
+            'losses': self.losses.to_dict(),
+            'avg_gain': self.avg_gain,
+            'avg_loss': self.avg_loss,
+            'true_ranges': self.true_ranges.to_dict(),
+            'avg_true_range': self.avg_true_range,
+            'positive_flows': self.positive_flows.to_dict(),
+            'negative_flows': self.negative_flows.to_dict(),
+            'short_closes': self.short_closes.to_dict(),
+            'long_closes': self.long_closes.to_dict(),
+            'peak': self.peak,
+            'max_drawdown': self.max_drawdown,
+            'latest': copy.copy(self.latest)
+        }
+
+    def _restore(self, state):
+        for key in ('bars', 'last_date', 'prev_close', 'prev_typical_price', 'avg_gain', 'avg_loss',
+                    'avg_true_range', 'peak', 'max_drawdown'):
+            setattr(self, key, state[key])
+        for key in ('gains', 'losses', 'true_ranges', 'positive_flows', 'negative_flows',
+                    'short_closes', 'long_closes'):
+            setattr(self, key, _Window.from_dict(state[key]))
+        self.latest = copy.copy(state['latest'])
+
+
+class StreamingIndicators:
+    """
+    Per-symbol IndicatorState registry for live bar updates.
+
+    Args:
+        **params: IndicatorState parameters shared by every symbol.
+    """
+
+    def __init__(self, **params):
+        self.params = params
+        self.states = {}
+
+    def seed(self, price_frame):
+        """
+        Seeds (or re-seeds) every symbol in a PriceFrame from its history.
+        """
+        for symbol, columns in price_frame.items():
+            self.states[symbol] = IndicatorState.from_history(symbol, columns, **self.params)
+
+    def update(self, symbol, bar):
+        """
+        Feeds one bar to a symbol, creating its state on first use. See IndicatorState.update().
+        """
+        if symbol not in self.states:
+            self.states[symbol] = IndicatorState(symbol, **self.params)
+        return self.states[symbol].update(bar)
+
+    def latest(self, symbols=None):
+        """
+        Returns { symbol: latest indicator dict } for the given symbols (default: all).
+        """
+        symbols = self.states if symbols is None else symbols
+        return {symbol: self.states[symbol].latest for symbol in symbols if symbol in self.states}
+
+    def checkpoint(self, path):
+        """
+        Atomically writes every symbol's state to a JSON file.
+        """
+        payload = {
+            'params': self.params,
+            'states': {symbol: state.to_dict() for symbol, state in self.states.items()}
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def restore(cls, path):
+        """
+        Loads a registry saved with checkpoint().
+        """
+        with open(path) as f:
+            payload = json.load(f)
+        registry = cls(**payload['params'])
+        registry.states = {
+            symbol: IndicatorState.from_dict(state) for symbol, state in payload['states'].items()
+        }
+        return registry
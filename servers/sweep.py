@@ -0,0 +1,260 @@
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from backtest import align_frame, run_backtest
+from rolling import SMA_TIE_TOLERANCE
+
+
+STRATEGIES = ('sma', 'rsi')
+
+# Metrics copied from run_backtest() into each result row
+METRICS = ('total_pnl', 'win_rate', 'sharpe', 'turnover', 'n_trades')
+
+
+def expand_grid(grid):
+    """
+    Expands {param: [values]} into a list of parameter dicts (cartesian product).
+    SMA combinations with short_window >= long_window are dropped.
+    """
+    names = sorted(grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+    return [c for c in combos if not ('short_window' in c and 'long_window' in c
+                                      and c['short_window'] >= c['long_window'])]
+
+
+def prepare_prices(price_frame, symbols=None):
+    """
+    Precomputes the arrays every sweep combination shares.
+
+    Each symbol's own bars are packed end-aligned into a (bars x symbols) matrix so window
+    kernels see the same sequence as the per-symbol functions in new.py, and cumulative sums
+    are taken once so any window length costs a single subtraction.
+
+    Returns:
+        dict: Arrays used by evaluate_combo(); safe to pickle to worker processes.
+    """
+    dates, symbols, prices = align_frame(price_frame, symbols=symbols)
+    valid = ~np.isnan(prices)
+    counts = valid.sum(axis=0)
+    depth = int(counts.max()) if len(symbols) else 0
+
+    # Row in the packed matrix for every valid (date, symbol) cell
+    packed_row = depth - counts + np.cumsum(valid, axis=0) - 1
+    date_row, symbol_col = np.nonzero(valid)
+    packed_index = (packed_row[date_row, symbol_col], symbol_col)
+    closes = np.full((depth, len(symbols)), np.nan)
+    closes[packed_index] = prices[date_row, symbol_col]
+
+    deltas = np.diff(closes, axis=0, prepend=np.nan)
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
+    return {
+        'dates': dates,
+        'symbols': symbols,
+        'prices': prices,
+        'packed_index': packed_index,
+        'date_index': (date_row, symbol_col),
+        'close_sum': _cumulative(np.nan_to_num(closes)),
+        'close_count': _cumulative(~np.isnan(closes)),
+        'gain_sum': _cumulative(gains),
+        'loss_sum': _cumulative(losses),
+        'loss_count': _cumulative(losses > 0),
+        'delta_count': _cumulative(~np.isnan(deltas))
+    }
+
+
+def _cumulative(values):
+    values = np.asarray(values, dtype=np.float64)
+    return np.vstack([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
+
+
+def _window(cumulative, window):
+    # Sum over the `window` rows ending at each row; NaN until a full window exists
+    out = np.full((cumulative.shape[0] - 1, cumulative.shape[1]), np.nan)
+    if 0 < window < cumulative.shape[0]:
+        out[window - 1:] = cumulative[window:] - cumulative[:-window]
+    return out
+
+
+def _packed_signals(prepared, strategy, params):
+    if strategy == 'sma':
+        short_window, long_window = params.get('short_window', 20), params.get('long_window', 50)
+        short_sma = _window(prepared['close_sum'], short_window) / short_window
+        long_sma = _window(prepared['close_sum'], long_window) / long_window
+        full = (_window(prepared['close_count'], short_window) == short_window) & \
+               (_window(prepared['close_count'], long_window) == long_window)
+        spread = short_sma - long_sma
+        # SMAs within rounding error of each other (e.g. on flat prices) are a tie, not a crossover
+        with np.errstate(invalid='ignore'):
+            crossed = full & (np.abs(spread) > SMA_TIE_TOLERANCE * np.abs(long_sma))
+        return np.where(crossed, np.sign(spread), 0.0)
+
+    period = params.get('period', 14)
+    overbought, oversold = params.get('overbought', 70), params.get('oversold', 30)
+    avg_gain = _window(prepared['gain_sum'], period) / period
+    avg_loss = _window(prepared['loss_sum'], period) / period
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    rsi = np.where(_window(prepared['loss_count'], period) == 0, 100.0, rsi)
+    full = _window(prepared['delta_count'], period) == period
+    signals = np.where(rsi <= oversold, 1.0, np.where(rsi >= overbought, -1.0, 0.0))
+    return np.where(full, signals, 0.0)
+
+
+def evaluate_combo(prepared, strategy, params, **backtest_options):
+    """
+    Backtests one parameter combination on prepared prices.
+
+    Returns:
+        dict: The parameters plus the run_backtest() metrics in METRICS.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"strategy must be one of {STRATEGIES}, got {strategy!r}")
+    packed = _packed_signals(prepared, strategy, params)
+    signals = np.zeros_like(prepared['prices'])
+    signals[prepared['date_index']] = packed[prepared['packed_index']]
+    result = run_backtest(prepared['prices'], signals, **backtest_options)
+    row = dict(params)
+    row.update({metric: result[metric] for metric in METRICS})
+    return row
+
+
+# Worker-process copy of the prepared arrays, set once per process by _init_worker()
+_worker_state = {}
+
+
+def _init_worker(prepared, strategy, backtest_options):
+    _worker_state.update(prepared=prepared, strategy=strategy, backtest_options=backtest_options)
+
+
+def _run_chunk(combos):
+    state = _worker_state
+    return [evaluate_combo(state['prepared'], state['strategy'], params, **state['backtest_options'])
+            for params in combos]
+
+
+def _sweep_header(price_frame, strategy, symbols, backtest_options):
+    # First checkpoint line: what the rows were computed for, so a resume cannot mix sweeps
+    symbols = sorted(price_frame.symbols if symbols is None else symbols)
+    spans = [price_frame[symbol]['date'] for symbol in symbols
+             if symbol in price_frame and len(price_frame[symbol]['date'])]
+    header = {'sweep': {
+        'strategy': strategy,
+        'symbols': symbols,
+        'start': str(min(dates[0] for dates in spans)) if spans else None,
+        'end': str(max(dates[-1] for dates in spans)) if spans else None,
+        'backtest_options': backtest_options
+    }}
+    # Compare in the form it takes after a JSON round trip
+    return json.loads(json.dumps(header, sort_keys=True, default=str))
+
+
+def _combo_key(params):
+    return json.dumps(params, sort_keys=True)
+
+
+def _read_checkpoint(path):
+    # JSON rows of a checkpoint file; a final line cut short by a killed process is dropped and
+    # truncated away, so that combination is recomputed and appending starts on a fresh line
+    rows, valid = [], 0
+    with open(path, 'rb') as f:
+        lines = f.readlines()
+    for number, line in enumerate(lines, 1):
+        try:
+            row = json.loads(line) if line.strip() else None
+            complete = line.endswith(b'\n')
+        except ValueError:
+            complete = False
+        if not complete:
+            if number < len(lines):
+                raise ValueError(f"Checkpoint {path} has a malformed line {number}")
+            break
+        if row is not None:
+            rows.append(row)
+        valid += len(line)
+    if valid < sum(map(len, lines)):
+        with open(path, 'r+b') as f:
+            f.truncate(valid)
+    return rows
+
+
+def run_sweep(price_frame, strategy, grid, symbols=None, checkpoint_path=None, max_workers=None,
+              chunk_size=16, rank_by='sharpe', **backtest_options):
+    """
+    Backtests every combination of a parameter grid over a symbol set and ranks the results.
+
+    Price arrays are prepared once and shipped to each worker process a single time; combinations
+    are evaluated in chunks across a process pool. Finished rows are appended to
+    `checkpoint_path` as JSON lines, and combinations already in that file are skipped, so an
+    interrupted sweep resumes where it stopped; a last line cut off mid-write is dropped and its
+    combination recomputed. The file's first line records the strategy, symbols, date range and
+    backtest options; resuming a different sweep raises ValueError.
+
+    Args:
+        price_frame (PriceFrame): Price history for the symbols.
+        strategy (str): 'sma' (short_window, long_window) or 'rsi' (period, overbought, oversold).
+        grid (dict): { param: list of values }, e.g. {'short_window': [10, 20], 'long_window': [50, 100]}.
+        symbols (list of str, optional): Subset of the frame's symbols.
+        checkpoint_path (str, optional): JSON-lines file for resumable results.
+        max_workers (int, optional): Worker processes (default: CPU count; 0 or 1 runs inline).
+        chunk_size (int): Combinations per worker task.
+        rank_by (str): Metric to sort by, descending (default: 'sharpe').
+        **backtest_options: Passed to run_backtest(), e.g. cost_bps=5, slippage_bps=2.
+
+    Returns:
+        list of dict: One row per combination (parameters plus METRICS), best first.
+    """
+    combos = expand_grid(grid)
+    results = {}
+    header = _sweep_header(price_frame, strategy, symbols, backtest_options)
+    resumed = False
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        for row in _read_checkpoint(checkpoint_path):
+            if not resumed:
+                if row.get('sweep') != header['sweep']:
+                    raise ValueError(f"Checkpoint {checkpoint_path} belongs to a different sweep "
+                                     f"({row.get('sweep')}); expected {header['sweep']}")
+                resumed = True
+                continue
+            results[_combo_key({k: row[k] for k in row if k not in METRICS})] = row
+    pending = [c for c in combos if _combo_key(c) not in results]
+
+    if pending:
+        prepared = prepare_prices(price_frame, symbols)
+        checkpoint = open(checkpoint_path, 'a') if checkpoint_path else None
+        if checkpoint and not resumed:
+            checkpoint.write(json.dumps(header) + '\n')
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        try:
+            if max_workers is not None and max_workers <= 1:
+                _init_worker(prepared, strategy, backtest_options)
+                finished = (_run_chunk(chunk) for chunk in chunks)
+                _collect(finished, results, checkpoint)
+            else:
+                with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                         initargs=(prepared, strategy, backtest_options)) as pool:
+                    futures = [pool.submit(_run_chunk, chunk) for chunk in chunks]
+                    _collect((future.result() for future in as_completed(futures)), results, checkpoint)
+        finally:
+            if checkpoint:
+                checkpoint.close()
+
+    wanted = {_combo_key(c) for c in combos}
+    rows = [row for key, row in results.items() if key in wanted]
+    rows.sort(key=lambda row: row[rank_by], reverse=True)
+    return rows
+
+
+def _collect(finished_chunks, results, checkpoint):
+    for rows in finished_chunks:
+        for row in rows:
+            key = _combo_key({k: row[k] for k in row if k not in METRICS})
+            results[key] = row
+            if checkpoint:
+                checkpoint.write(json.dumps(row) + '\n')
+        if checkpoint:
+            checkpoint.flush()
@@ -0,0 +1,155 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from pricecache import IST
+
+
+def parse_times(value):
+    """
+    Parses a comma-separated list of 'HH:MM' IST times, e.g. '09:05,15:50'.
+    """
+    times = []
+    for item in value.split(','):
+        if item.strip():
+            times.append(datetime.strptime(item.strip(), '%H:%M').time())
+    return sorted(times)
+
+
+def next_run(times, now=None):
+    """
+    Returns the next weekday IST datetime after `now` at one of `times`, or None without times.
+    """
+    if not times:
+        return None
+    now = now or datetime.now(IST)
+    day = now.date()
+    while True:
+        if day.weekday() < 5:
+            for at in times:
+                candidate = datetime.combine(day, at, tzinfo=IST)
+                if candidate > now:
+                    return candidate
+        day += timedelta(days=1)
+
+
+def _timestamp(value):
+    return datetime.fromtimestamp(value, IST).isoformat(timespec='seconds') if value else None
+
+
+class WarmupScheduler:
+    """
+    Keeps a watchlist's data and indicators warm in the background.
+
+    A refresh runs once when the scheduler starts and again on weekdays at each of `times`
+    (IST, e.g. shortly after the NSE close). Each refresh walks the watchlist in batches and
+    awaits `refresh(symbols)` for every batch; a failing batch is recorded and the rest continue.
+    Only one refresh runs at a time.
+
+    Args:
+        refresh (coroutine function): Called with a list of symbols; fetches and caches them.
+        symbols (list of str): Watchlist.
+        times (list of datetime.time): Daily refresh times in IST.
+        batch_size (int): Symbols per refresh() call.
+    """
+
+    def __init__(self, refresh, symbols, times=(), batch_size=25):
+        self.refresh = refresh
+        self.symbols = list(symbols)
+        self.times = list(times)
+        self.batch_size = max(1, batch_size)
+        self.task = None
+        self.state = 'stopped'
+        self.runs = 0
+        self.reason = None
+        self.completed = 0
+        self.failed = []
+        self.errors = []
+        self.started_at = None
+        self.last_refresh = None
+        self.last_duration = None
+        self.next_refresh = None
+        self._lock = asyncio.Lock()
+
+    def start(self):
+        """
+        Starts the background loop on the running event loop (no-op with an empty watchlist).
+        """
+        if self.symbols and self.task is None:
+            self.state = 'idle'
+            self.task = asyncio.ensure_future(self._loop())
+        return self.task
+
+    async def stop(self):
+        """
+        Cancels the background loop.
+        """
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        self.state = 'stopped'
+
+    async def run_once(self, reason='manual'):
+        """
+        Refreshes the whole watchlist now (waiting for a refresh already running to finish first).
+        """
+        async with self._lock:
+            self.state = 'running'
+            self.reason = reason
+            self.completed = 0
+            self.failed = []
+            self.errors = []
+            self.started_at = time.time()
+            try:
+                for i in range(0, len(self.symbols), self.batch_size):
+                    batch = self.symbols[i:i + self.batch_size]
+                    try:
+                        await self.refresh(batch)
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        self.failed.extend(batch)
+                        self.errors.append(f"{type(e).__name__}: {e}")
+                    self.completed += len(batch)
+                self.runs += 1
+                self.last_refresh = time.time()
+                self.last_duration = self.last_refresh - self.started_at
+            finally:
+                self.state = 'idle' if self.task is not None else 'stopped'
+
+    async def _loop(self):
+        await self.run_once('startup')
+        while True:
+            upcoming = next_run(self.times)
+            if upcoming is None:
+                self.next_refresh = None
+                return
+            self.next_refresh = upcoming.timestamp()
+            await asyncio.sleep(max(0.0, self.next_refresh - time.time()))
+            await self.run_once('scheduled')
+
+    def status(self):
+        """
+        Returns:
+            dict: 'state' ('stopped', 'idle' or 'running'), 'watchlist' (int symbols),
+                'progress' ({'completed', 'total'} for the current or last refresh), 'reason',
+                'runs', 'started_at', 'last_refresh', 'next_refresh' (ISO times in IST or None),
+                'last_duration' (seconds), 'failed' (symbols whose batch failed) and 'errors'.
+        """
+        return {
+            'state': self.state,
+            'watchlist': len(self.symbols),
+            'progress': {'completed': self.completed, 'total': len(self.symbols)},
+            'reason': self.reason,
+            'runs': self.runs,
+            'started_at': _timestamp(self.started_at),
+            'last_refresh': _timestamp(self.last_refresh),
+            'last_duration': round(self.last_duration, 3) if self.last_duration is not None else None,
+            'next_refresh': _timestamp(self.next_refresh),
+            'failed': list(self.failed),
+            'errors': list(self.errors)
+        }
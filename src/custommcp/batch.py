@@ -0,0 +1,177 @@
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
+from crewai_tools import MCPServerAdapter
+
+from custommcp.crew import StockAnalysis
+
+
+DEFAULT_SERVER_PARAMS = {"url": "http://localhost:8000/sse"}
+
+
+class MCPConnectionPool:
+    """
+    A fixed set of MCP server connections shared by concurrent crew runs.
+
+    Opening an MCPServerAdapter starts a session and lists the server's tools, so batch runs
+    borrow an already-open connection instead of connecting once per company. Each connection
+    is used by one crew at a time. Connections are opened on first use; one whose run failed is
+    closed and reopened by the next borrower, so a dropped session does not fail the rest of
+    the batch.
+
+    Args:
+        server_params (dict): MCPServerAdapter parameters (e.g. {"url": "http://localhost:8000/sse"}).
+        size (int): Number of connections, normally the number of crews run at once.
+    """
+
+    def __init__(self, server_params=None, size=4):
+        self.server_params = server_params or DEFAULT_SERVER_PARAMS
+        self.size = size
+        self.idle = queue.Queue()
+        for _ in range(size):
+            self.idle.put(None)
+        self.opened = 0
+        self._adapters = []
+        self._lock = threading.Lock()
+
+    def _open(self):
+        adapter = MCPServerAdapter(self.server_params)
+        with self._lock:
+            self._adapters.append(adapter)
+            self.opened += 1
+        return adapter
+
+    def _close(self, adapter):
+        with self._lock:
+            if adapter in self._adapters:
+                self._adapters.remove(adapter)
+        try:
+            adapter.stop()
+        except Exception:
+            pass
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrows a connection for one crew run.
+
+        Yields:
+            list: The server's tools, ready to pass to an Agent.
+        """
+        adapter = self.idle.get()
+        try:
+            if adapter is None:
+                adapter = self._open()
+            yield adapter.tools
+        except BaseException:
+            if adapter is not None:
+                self._close(adapter)
+            adapter = None
+            raise
+        finally:
+            self.idle.put(adapter)
+
+    def close(self):
+        """
+        Closes every open connection.
+        """
+        with self._lock:
+            adapters, self._adapters = self._adapters, []
+        for adapter in adapters:
+            try:
+                adapter.stop()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def analyse_company(pool, company, start_date, end_date, output_dir):
+    """
+    Runs the StockAnalysis crew for one company on a pooled connection.
+
+    Returns:
+        dict: 'company', 'status' ('ok' or 'failed'), 'seconds', 'output_file' and 'error'.
+    """
+    output_file = os.path.join(output_dir, f"{company}.md")
+    inputs = {'company': company, 'start_date': start_date, 'end_date': end_date}
+    started = time.perf_counter()
+    try:
+        with pool.connection() as tools:
+            StockAnalysis(tools=tools, output_file=output_file).crew().kickoff(inputs=inputs)
+        status, error = 'ok', None
+    except Exception as e:
+        status, error, output_file = 'failed', f"{type(e).__name__}: {e}", None
+    return {
+        'company': company,
+        'status': status,
+        'seconds': round(time.perf_counter() - started, 3),
+        'output_file': output_file,
+        'error': error
+    }
+
+
+def run_batch(companies, start_date, end_date, output_dir='reports', max_parallel=4, server_params=None):
+    """
+    Analyses many companies, running up to `max_parallel` crews at once over pooled MCP connections.
+
+    Each company's report is written to `<output_dir>/<COMPANY>.md` and a run summary to
+    `<output_dir>/summary.json`. A failing company is recorded in the summary and does not stop
+    the others.
+
+    Args:
+        companies (list of str): Company symbols (e.g., ['RELIANCE', 'TCS']); duplicates are run once.
+        start_date (str): Start date in 'YYYY-MM-DD' format.
+        end_date (str): End date in 'YYYY-MM-DD' format.
+        output_dir (str): Directory for the reports and the summary.
+        max_parallel (int): Crews run at once (and MCP connections opened).
+        server_params (dict, optional): MCPServerAdapter parameters (default: the local SSE server).
+
+    Returns:
+        dict: {
+            'started_at' (str), 'start_date' (str), 'end_date' (str), 'companies' (int),
+            'succeeded' (int), 'failed' (int), 'wall_seconds' (float),
+            'crew_seconds' (float): Sum of the per-company run times,
+            'connections_opened' (int),
+            'runs': list of analyse_company() results in input order
+        }
+    """
+    companies = list(dict.fromkeys(c.strip().upper() for c in companies if c.strip()))
+    max_parallel = max(1, min(max_parallel, len(companies) or 1))
+    os.makedirs(output_dir, exist_ok=True)
+    started_at = datetime.now().isoformat(timespec='seconds')
+    started = time.perf_counter()
+
+    with MCPConnectionPool(server_params, size=max_parallel) as pool:
+        with ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix='crew') as executor:
+            runs = list(executor.map(
+                lambda company: analyse_company(pool, company, start_date, end_date, output_dir),
+                companies
+            ))
+        opened = pool.opened
+
+    summary = {
+        'started_at': started_at,
+        'start_date': start_date,
+        'end_date': end_date,
+        'companies': len(runs),
+        'succeeded': sum(run['status'] == 'ok' for run in runs),
+        'failed': sum(run['status'] == 'failed' for run in runs),
+        'wall_seconds': round(time.perf_counter() - started, 3),
+        'crew_seconds': round(sum(run['seconds'] for run in runs), 3),
+        'connections_opened': opened,
+        'runs': runs
+    }
+    with open(os.path.join(output_dir, 'summary.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+    return summary
@@ -2,6 +2,8 @@ from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
 from typing import List
+
+from custommcp.llmcache import shared_llm
 # If you want to run a snippet of code before or after the crew starts,
 # you can use the @before_kickoff and @after_kickoff decorators
 # https://docs.crewai.com/concepts/crews#example-crew-class-with-decorators
@@ -23,6 +25,7 @@ class Custommcp():
     def researcher(self) -> Agent:
         return Agent(
             config=self.agents_config['researcher'], # type: ignore[index]
+            llm=shared_llm(), # LLM_CACHE_MODE: record/replay responses, see llmcache.py
             verbose=True
         )
 
@@ -30,6 +33,7 @@ class Custommcp():
     def reporting_analyst(self) -> Agent:
         return Agent(
             config=self.agents_config['reporting_analyst'], # type: ignore[index]
+            llm=shared_llm(), # LLM_CACHE_MODE: record/replay responses, see llmcache.py
             verbose=True
         )
 
@@ -62,3 +66,45 @@ class Custommcp():
             verbose=True,
             # process=Process.hierarchical, # In case you wanna use that instead https://docs.crewai.com/how-to/Hierarchical/
         )
+
+
+@CrewBase
+class StockAnalysis():
+    """Single-company stock analysis crew using the MCP server's tools"""
+
+    agents: List[BaseAgent]
+    tasks: List[Task]
+
+    agents_config = 'config/stock_agents.yaml'
+    tasks_config = 'config/stock_tasks.yaml'
+
+    def __init__(self, tools=None, output_file='analysis.md'):
+        # tools: MCP tools from an open MCPServerAdapter; output_file: where the report is written
+        self.mcp_tools = list(tools or [])
+        self.output_file = output_file
+
+    @agent
+    def stock_analyst(self) -> Agent:
+        return Agent(
+            config=self.agents_config['stock_analyst'], # type: ignore[index]
+            llm=shared_llm(), # LLM_CACHE_MODE: record/replay responses, see llmcache.py
+            tools=self.mcp_tools,
+            verbose=True
+        )
+
+    @task
+    def stock_analysis_task(self) -> Task:
+        return Task(
+            config=self.tasks_config['stock_analysis_task'], # type: ignore[index]
+            output_file=self.output_file
+        )
+
+    @crew
+    def crew(self) -> Crew:
+        """Creates the StockAnalysis crew"""
+        return Crew(
+            agents=self.agents,
+            tasks=self.tasks,
+            process=Process.sequential,
+            verbose=True,
+        )
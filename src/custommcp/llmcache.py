@@ -0,0 +1,247 @@
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from crewai import LLM, BaseLLM
+
+
+CACHE_MODES = ('off', 'record', 'replay')
+
+
+class ReplayMissError(LookupError):
+    """
+    Raised in replay mode when no recorded response matches a call.
+    """
+
+
+def _tool_context(tools=None, available_functions=None):
+    # Only what the model sees: tool names and schemas, not the Python callables
+    return {
+        'tools': tools or [],
+        'functions': sorted(available_functions or {})
+    }
+
+
+def cache_key(model, messages, stop=None, tools=None, available_functions=None):
+    """
+    Returns the content address of an LLM call: a SHA-256 of the model, the prompt messages,
+    the stop words and the tool context.
+    """
+    if isinstance(messages, str):
+        messages = [{'role': 'user', 'content': messages}]
+    payload = {
+        'model': model,
+        'messages': messages,
+        'stop': sorted(stop or []),
+        **_tool_context(tools, available_functions)
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ResponseStore:
+    """
+    Directory of recorded LLM responses, one JSON file per content address.
+
+    Each file holds the response text, the model, the call's latency and when it was recorded,
+    so a transcript can also be replayed in recording order.
+
+    Args:
+        path (str): Directory, created on first write.
+    """
+
+    def __init__(self, path='.llm_cache'):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.json")
+
+    def get(self, key):
+        """
+        Returns the recorded entry for `key`, or None.
+        """
+        try:
+            with open(self._file(key)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, model, response, seconds, messages=None):
+        """
+        Records a response; the file is replaced atomically so concurrent readers never see half of it.
+        """
+        entry = {
+            'key': key,
+            'model': model,
+            'response': response,
+            'seconds': seconds,
+            'recorded_at': datetime.now().isoformat(),
+            'messages': messages
+        }
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            tmp = f"{self._file(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump(entry, f, indent=2, default=str)
+            os.replace(tmp, self._file(key))
+        return entry
+
+    def transcript(self, model=None):
+        """
+        Returns every recorded entry (for one model, or all) in recording order.
+        """
+        if not os.path.isdir(self.path):
+            return []
+        entries = []
+        for name in os.listdir(self.path):
+            if name.endswith('.json'):
+                with open(os.path.join(self.path, name)) as f:
+                    entry = json.load(f)
+                if model is None or entry.get('model') == model:
+                    entries.append(entry)
+        return sorted(entries, key=lambda entry: entry['recorded_at'])
+
+
+class CachingLLM(BaseLLM):
+    """
+    Wraps an LLM with a content-addressed response cache.
+
+    In 'record' mode a call whose model, prompt, stop words and tools were seen before returns
+    the recorded response; otherwise the wrapped LLM is called and its response recorded. In
+    'off' mode every call goes to the wrapped LLM.
+
+    Args:
+        llm (LLM): The real model.
+        store (ResponseStore): Where responses are recorded.
+        mode (str): 'record' or 'off'.
+    """
+
+    def __init__(self, llm, store, mode='record'):
+        super().__init__(model=llm.model, temperature=getattr(llm, 'temperature', None))
+        self.stop = getattr(self, 'stop', None) or []
+        self.llm = llm
+        self.store = store
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        # The agent executor sets stop words on the LLM it was given; pass them on
+        self.llm.stop = self.stop
+        if self.mode == 'off':
+            return self.llm.call(messages, tools=tools, callbacks=callbacks,
+                                 available_functions=available_functions)
+        key = cache_key(self.model, messages, self.stop, tools, available_functions)
+        entry = self.store.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry['response']
+        self.misses += 1
+        started = time.perf_counter()
+        response = self.llm.call(messages, tools=tools, callbacks=callbacks,
+                                 available_functions=available_functions)
+        # Only text can be replayed; results of functions the LLM executed are not cached
+        if isinstance(response, str):
+            self.store.put(key, self.model, response, time.perf_counter() - started, messages)
+        return response
+
+    def supports_function_calling(self):
+        return self.llm.supports_function_calling()
+
+    def supports_stop_words(self):
+        return self.llm.supports_stop_words()
+
+    def get_context_window_size(self):
+        return self.llm.get_context_window_size()
+
+
+class ReplayLLM(BaseLLM):
+    """
+    Local stand-in model that answers from recorded responses, without any network calls.
+
+    A call is answered by its exact recording when there is one; otherwise a ReplayMissError is
+    raised. With `sequential`, a miss instead gets the next unused response of the model's
+    transcript in recording order, so runs whose prompts drift (dates, tool output) still replay;
+    once the transcript is used up, misses raise ReplayMissError again.
+
+    Args:
+        store (ResponseStore): Recorded responses.
+        model (str): Model whose recordings are replayed.
+        sequential (bool): Fall back to transcript order on a miss (off by default, so a replay
+            only ever returns the recording of the same call).
+        latency_scale (float): Sleep this fraction of each recorded call's latency (0 = instant).
+    """
+
+    def __init__(self, store, model, sequential=False, latency_scale=0.0):
+        super().__init__(model=model)
+        self.stop = getattr(self, 'stop', None) or []
+        self.store = store
+        self.sequential = sequential
+        self.latency_scale = latency_scale
+        self.hits = 0
+        self.fallbacks = 0
+        self._transcript = None
+        self._position = 0
+        self._lock = threading.Lock()
+
+    def _next_in_transcript(self):
+        with self._lock:
+            if self._transcript is None:
+                self._transcript = self.store.transcript(self.model)
+            if self._position >= len(self._transcript):
+                return None
+            entry = self._transcript[self._position]
+            self._position += 1
+            return entry
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        entry = self.store.get(cache_key(self.model, messages, self.stop, tools, available_functions))
+        if entry is not None:
+            self.hits += 1
+        elif self.sequential:
+            entry = self._next_in_transcript()
+            self.fallbacks += entry is not None
+        if entry is None:
+            raise ReplayMissError(f"No recorded response for this {self.model} call in {self.store.path}")
+        if self.latency_scale:
+            time.sleep(entry.get('seconds', 0) * self.latency_scale)
+        return entry['response']
+
+    def supports_function_calling(self):
+        return False
+
+
+def configured_llm():
+    """
+    Returns the LLM selected by the environment, or None for crewAI's default model.
+
+    LLM_CACHE_MODE: 'off' (default), 'record' (serve repeated calls from LLM_CACHE_DIR and
+    record new ones) or 'replay' (answer only from LLM_CACHE_DIR with the local ReplayLLM).
+    LLM_CACHE_DIR defaults to '.llm_cache'; LLM_REPLAY_LATENCY_SCALE (default 0) replays
+    recorded latencies; LLM_REPLAY_SEQUENTIAL=1 answers unrecorded prompts from the transcript
+    in order; the model is MODEL or OPENAI_MODEL_NAME (default 'gpt-4o-mini').
+    """
+    mode = os.getenv('LLM_CACHE_MODE', 'off')
+    if mode not in CACHE_MODES:
+        raise ValueError(f"LLM_CACHE_MODE must be one of {CACHE_MODES}, got {mode!r}")
+    if mode == 'off':
+        return None
+    model = os.getenv('MODEL') or os.getenv('OPENAI_MODEL_NAME') or 'gpt-4o-mini'
+    store = ResponseStore(os.getenv('LLM_CACHE_DIR', '.llm_cache'))
+    if mode == 'replay':
+        return ReplayLLM(store, model, sequential=os.getenv('LLM_REPLAY_SEQUENTIAL', '0') == '1',
+                         latency_scale=float(os.getenv('LLM_REPLAY_LATENCY_SCALE', '0')))
+    return CachingLLM(LLM(model=model), store)
+
+
+@functools.lru_cache(maxsize=None)
+def shared_llm():
+    """
+    configured_llm(), created once per process so every agent shares one cache and its counters.
+    """
+    return configured_llm()
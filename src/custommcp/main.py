@@ -1,10 +1,12 @@
 #!/usr/bin/env python
+import os
 import sys
 import warnings
 
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from custommcp.crew import Custommcp
+from custommcp.profiler import RunProfiler
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
@@ -13,6 +15,21 @@ warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 # Replace with inputs you want to test with, it will automatically
 # interpolate any tasks and agents information
 
+# Every kickoff writes a timeline of LLM and tool calls here (JSON and CSV); '' disables profiling
+PROFILE_DIR = os.getenv('CREW_PROFILE_DIR', 'profiles')
+
+
+def profiled_crew(name):
+    """
+    Returns the crew, and its RunProfiler (None when CREW_PROFILE_DIR is empty).
+    """
+    crew = Custommcp().crew()
+    if not PROFILE_DIR:
+        return crew, None
+    profiler = RunProfiler(PROFILE_DIR, f"{name}-{datetime.now().strftime('%Y%m%dT%H%M%S')}")
+    return profiler.instrument(crew), profiler
+
+
 def run():
     """
     Run the crew.
@@ -23,7 +40,8 @@ def run():
     }
     
     try:
-        Custommcp().crew().kickoff(inputs=inputs)
+        crew, _ = profiled_crew('run')
+        crew.kickoff(inputs=inputs)
     except Exception as e:
         raise Exception(f"An error occurred while running the crew: {e}")
 
@@ -37,7 +55,10 @@ def train():
         'current_year': str(datetime.now().year)
     }
     try:
-        Custommcp().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
+        crew, profiler = profiled_crew('train')
+        crew.train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
+        if profiler is not None:
+            profiler.aggregate()
 
     except Exception as e:
         raise Exception(f"An error occurred while training the crew: {e}")
@@ -62,7 +83,47 @@ def test():
     }
     
     try:
-        Custommcp().crew().test(n_iterations=int(sys.argv[1]), eval_llm=sys.argv[2], inputs=inputs)
+        crew, profiler = profiled_crew('test')
+        crew.test(n_iterations=int(sys.argv[1]), eval_llm=sys.argv[2], inputs=inputs)
+        if profiler is not None:
+            profiler.aggregate()
 
     except Exception as e:
         raise Exception(f"An error occurred while testing the crew: {e}")
+
+def batch():
+    """
+    Run the stock analysis crew for many companies concurrently.
+
+    Usage: batch_crew COMPANIES [START_DATE] [END_DATE]
+    COMPANIES is a comma-separated list or a file with one symbol per line; the dates default
+    to the last 30 days. BATCH_CONCURRENCY (default 4), BATCH_OUTPUT_DIR (default 'reports')
+    and MCP_SERVER_URL (default http://localhost:8000/sse) configure the run.
+    """
+    from custommcp.batch import run_batch
+
+    if len(sys.argv) < 2:
+        raise Exception("Usage: batch_crew COMPANIES [START_DATE] [END_DATE]")
+    if os.path.isfile(sys.argv[1]):
+        with open(sys.argv[1]) as f:
+            companies = f.read().split()
+    else:
+        companies = sys.argv[1].split(',')
+    end_date = sys.argv[3] if len(sys.argv) > 3 else datetime.now().strftime('%Y-%m-%d')
+    start_date = sys.argv[2] if len(sys.argv) > 2 else \
+        (datetime.strptime(end_date, '%Y-%m-%d') - timedelta(days=30)).strftime('%Y-%m-%d')
+
+    try:
+        summary = run_batch(
+            companies, start_date, end_date,
+            output_dir=os.getenv('BATCH_OUTPUT_DIR', 'reports'),
+            max_parallel=int(os.getenv('BATCH_CONCURRENCY', '4')),
+            server_params={"url": os.getenv('MCP_SERVER_URL', 'http://localhost:8000/sse')}
+        )
+    except Exception as e:
+        raise Exception(f"An error occurred while running the batch: {e}")
+
+    print(f"{summary['succeeded']}/{summary['companies']} companies analysed in {summary['wall_seconds']}s")
+    for run in summary['runs']:
+        if run['status'] == 'failed':
+            print(f"  {run['company']}: {run['error']}")
@@ -0,0 +1,255 @@
+import csv
+import json
+import os
+import statistics
+import threading
+import time
+from datetime import datetime
+
+import litellm
+
+
+TIMELINE_FIELDS = ('iteration', 'kind', 'task', 'agent', 'start', 'seconds', 'model', 'tool',
+                   'prompt_tokens', 'completion_tokens', 'total_tokens', 'payload_bytes', 'error')
+
+BREAKDOWN_FIELDS = ('task_seconds', 'steps', 'llm_calls', 'llm_seconds', 'prompt_tokens',
+                    'completion_tokens', 'total_tokens', 'tool_calls', 'tool_seconds', 'payload_bytes')
+
+
+def _seconds(value):
+    # litellm passes datetimes, our own hooks pass time.time() floats
+    return value.timestamp() if isinstance(value, datetime) else float(value)
+
+
+def _usage(response):
+    usage = getattr(response, 'usage', None)
+    if usage is None and isinstance(response, dict):
+        usage = response.get('usage')
+    if usage is None:
+        return 0, 0, 0
+    get = usage.get if isinstance(usage, dict) else lambda name: getattr(usage, name, 0)
+    return get('prompt_tokens') or 0, get('completion_tokens') or 0, get('total_tokens') or 0
+
+
+def _summary(values):
+    return {
+        'mean': statistics.fmean(values),
+        'min': min(values),
+        'max': max(values)
+    }
+
+
+class RunProfiler:
+    """
+    Records a timeline of every crew kickoff: LLM calls, tool calls, agent steps and tasks.
+
+    instrument() hooks the crew's step and task callbacks, its before/after kickoff callbacks
+    and its agents' tools; those hooks survive the crew copies made by Crew.train() and
+    Crew.test(), so every iteration is profiled. LLM latency and token counts come from a
+    litellm success callback. Events are attributed to a task and agent by time, which assumes
+    one kickoff runs at a time in the process.
+
+    After each kickoff, <output_dir>/<name>-<iteration>.json (timeline plus per agent/task
+    breakdown) and .csv (timeline) are written; aggregate() combines all iterations.
+
+    Args:
+        output_dir (str): Directory for the profiles.
+        name (str): File name prefix (default: 'crew-<timestamp>').
+    """
+
+    def __init__(self, output_dir='profiles', name=None):
+        self.output_dir = output_dir
+        self.name = name or f"crew-{datetime.now().strftime('%Y%m%dT%H%M%S')}"
+        self.runs = []
+        self._rows = []
+        self._marks = []
+        self._tasks = []
+        self._started = None
+        self._lock = threading.Lock()
+
+    def instrument(self, crew):
+        """
+        Hooks the profiler into a crew and returns the crew.
+        """
+        step_callback, task_callback = crew.step_callback, crew.task_callback
+
+        def on_step(step):
+            self._on_step(step)
+            if step_callback is not None:
+                step_callback(step)
+
+        def on_task(output):
+            self._on_task(output)
+            if task_callback is not None:
+                task_callback(output)
+
+        crew.step_callback = on_step
+        crew.task_callback = on_task
+        crew.before_kickoff_callbacks.append(self._on_kickoff)
+        crew.after_kickoff_callbacks.append(self._on_kickoff_end)
+        for agent in crew.agents:
+            for tool in agent.tools or []:
+                self._wrap_tool(tool)
+        return crew
+
+    def _wrap_tool(self, tool):
+        run = tool._run
+        if getattr(run, '_profiled', False):
+            return
+
+        def timed_run(*args, **kwargs):
+            started = time.time()
+            error, result = None, None
+            try:
+                result = run(*args, **kwargs)
+                return result
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                raise
+            finally:
+                self._add(kind='tool', tool=tool.name, start=started, seconds=time.time() - started,
+                          payload_bytes=len(str(result)) if result is not None else 0, error=error)
+
+        timed_run._profiled = True
+        # Tools are pydantic models; bypass validation to shadow the method on this instance
+        object.__setattr__(tool, '_run', timed_run)
+
+    def _add(self, **row):
+        if self._started is None:
+            return
+        with self._lock:
+            self._rows.append(row)
+
+    def _on_llm_success(self, kwargs, response, start_time, end_time):
+        prompt, completion, total = _usage(response)
+        start = _seconds(start_time)
+        self._add(kind='llm', model=kwargs.get('model'), start=start, seconds=_seconds(end_time) - start,
+                  prompt_tokens=prompt, completion_tokens=completion, total_tokens=total)
+
+    def _on_llm_failure(self, kwargs, response, start_time, end_time):
+        start = _seconds(start_time)
+        self._add(kind='llm', model=kwargs.get('model'), start=start, seconds=_seconds(end_time) - start,
+                  error=str(kwargs.get('exception') or response))
+
+    def _on_step(self, step):
+        now = time.time()
+        with self._lock:
+            previous = self._marks[-1] if self._marks else self._started
+            self._marks.append(now)
+        self._add(kind='step', tool=getattr(step, 'tool', None), start=previous, seconds=now - previous)
+
+    def _on_task(self, output):
+        now = time.time()
+        with self._lock:
+            previous = self._tasks[-1][0] if self._tasks else self._started
+            task = getattr(output, 'name', None) or (getattr(output, 'description', '') or '')[:60]
+            agent = getattr(output, 'agent', None)
+            self._tasks.append((now, task, agent))
+        self._add(kind='task', task=task, agent=agent, start=previous, seconds=now - previous)
+
+    def _on_kickoff(self, inputs):
+        with self._lock:
+            self._rows, self._marks, self._tasks = [], [], []
+            self._started = time.time()
+        for callbacks, callback in ((litellm.success_callback, self._on_llm_success),
+                                    (litellm.failure_callback, self._on_llm_failure)):
+            if callback not in callbacks:
+                callbacks.append(callback)
+        return inputs
+
+    def _on_kickoff_end(self, result):
+        ended = time.time()
+        for callbacks, callback in ((litellm.success_callback, self._on_llm_success),
+                                    (litellm.failure_callback, self._on_llm_failure)):
+            if callback in callbacks:
+                callbacks.remove(callback)
+        with self._lock:
+            rows, tasks, started = self._rows, self._tasks, self._started
+            self._started = None
+        self.runs.append(self._build(rows, tasks, started, ended, result))
+        self._write(self.runs[-1])
+        return result
+
+    def _build(self, rows, tasks, started, ended, result):
+        iteration = len(self.runs) + 1
+        rows.sort(key=lambda row: row['start'])
+        breakdown = {}
+        for row in rows:
+            row.setdefault('task', None)
+            if row['task'] is None:
+                # Attribute to the first task that ended after this event finished
+                end = row['start'] + row['seconds']
+                owner = next((t for t in tasks if t[0] >= end - 1e-6), None)
+                row['task'], row['agent'] = (owner[1], owner[2]) if owner else (None, None)
+            row['iteration'] = iteration
+            row['start'] = round(row['start'] - started, 6)
+            row['seconds'] = round(row['seconds'], 6)
+            key = f"{row.get('agent')} / {row['task']}"
+            entry = breakdown.setdefault(key, dict.fromkeys(BREAKDOWN_FIELDS, 0) | {'tools': {}})
+            if row['kind'] == 'task':
+                entry['task_seconds'] += row['seconds']
+            elif row['kind'] == 'step':
+                entry['steps'] += 1
+            elif row['kind'] == 'llm':
+                entry['llm_calls'] += 1
+                entry['llm_seconds'] += row['seconds']
+                for field in ('prompt_tokens', 'completion_tokens', 'total_tokens'):
+                    entry[field] += row.get(field) or 0
+            else:
+                entry['tool_calls'] += 1
+                entry['tool_seconds'] += row['seconds']
+                entry['payload_bytes'] += row.get('payload_bytes') or 0
+                tool = entry['tools'].setdefault(row['tool'], {'calls': 0, 'seconds': 0.0,
+                                                               'payload_bytes': 0, 'errors': 0})
+                tool['calls'] += 1
+                tool['seconds'] += row['seconds']
+                tool['payload_bytes'] += row.get('payload_bytes') or 0
+                tool['errors'] += row.get('error') is not None
+        for entry in breakdown.values():
+            for values in [entry] + list(entry['tools'].values()):
+                for field, value in values.items():
+                    if isinstance(value, float):
+                        values[field] = round(value, 6)
+        usage = getattr(result, 'token_usage', None)
+        return {
+            'name': self.name,
+            'iteration': iteration,
+            'started_at': datetime.fromtimestamp(started).isoformat(timespec='seconds'),
+            'wall_seconds': round(ended - started, 6),
+            'token_usage': usage.model_dump() if hasattr(usage, 'model_dump') else None,
+            'breakdown': breakdown,
+            'timeline': rows
+        }
+
+    def _write(self, run):
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{self.name}-{run['iteration']}")
+        with open(f"{path}.json", 'w') as f:
+            json.dump(run, f, indent=2, default=str)
+        with open(f"{path}.csv", 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=TIMELINE_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(run['timeline'])
+
+    def aggregate(self):
+        """
+        Combines every profiled kickoff into <output_dir>/<name>-aggregate.json.
+
+        Returns:
+            dict: 'iterations', 'wall_seconds' ({'mean', 'min', 'max'}) and 'breakdown':
+                { '<agent> / <task>': { field: {'mean', 'min', 'max'} over iterations } }.
+        """
+        breakdown = {}
+        for key in dict.fromkeys(key for run in self.runs for key in run['breakdown']):
+            entries = [run['breakdown'].get(key, dict.fromkeys(BREAKDOWN_FIELDS, 0)) for run in self.runs]
+            breakdown[key] = {field: _summary([entry[field] for entry in entries]) for field in BREAKDOWN_FIELDS}
+        summary = {
+            'name': self.name,
+            'iterations': len(self.runs),
+            'wall_seconds': _summary([run['wall_seconds'] for run in self.runs]) if self.runs else None,
+            'breakdown': breakdown
+        }
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(os.path.join(self.output_dir, f"{self.name}-aggregate.json"), 'w') as f:
+            json.dump(summary, f, indent=2)
+        return summary
@@ -1,5 +1,7 @@
 from crewai_tools import MCPServerAdapter
 from crewai import Agent, Task, Crew
+from custommcp.llmcache import shared_llm
+from custommcp.profiler import RunProfiler
 
 server_params = {"url": "http://localhost:8000/sse"}
 
@@ -12,6 +14,7 @@ with MCPServerAdapter(server_params) as tools:
         goal="to use all available mcp tools and the data got from the mcp tool and make a report about the stock market",
         backstory="An AI that can analyze stock market problems via an MCP tool.",
         tools=tools,
+        llm=shared_llm(),
         verbose=True,
     )
     task = Task(
@@ -25,5 +28,8 @@ with MCPServerAdapter(server_params) as tools:
         tasks=[task],
         verbose=True,
     )
+    # Writes profiles/analysis-1.json and .csv: LLM and tool timings and tokens per agent and task
+    profiler = RunProfiler('profiles', 'analysis')
+    profiler.instrument(crew)
     result = crew.kickoff()
     print(result)
\ No newline at end of file
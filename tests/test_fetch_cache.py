@@ -0,0 +1,115 @@
+"""
+Cached downloads: which empty gaps are recorded as covered and which are retried.
+"""
+import numpy as np
+import pytest
+
+import new
+from pricecache import PriceCache
+from priceframe import PriceFrame
+from providers import SyntheticProvider
+
+
+class GappyProvider(SyntheticProvider):
+    """
+    Synthetic bars without the given holidays; failing symbols come back with no bars, the way
+    yfinance returns an all-NaN column for a ticker it could not fetch.
+    """
+    retry_missing = True
+
+    def __init__(self, holidays=(), failing=()):
+        super().__init__(seed=0)
+        self.holidays = np.array(holidays, dtype='datetime64[D]')
+        self.failing = set(failing)
+        self.calls = []
+
+    def download(self, tickers, start_date, end_date):
+        self.calls.append((sorted(tickers), start_date, end_date))
+        frame = PriceFrame()
+        for symbol, columns in super().download(tickers, start_date, end_date).items():
+            keep = ~np.isin(columns['date'], self.holidays)
+            if symbol in self.failing:
+                keep[:] = False
+            frame.add(symbol, {field: values[keep] for field, values in columns.items()})
+        return frame
+
+
+def fetch(provider, cache, symbols, end_date, start_date='2024-01-01'):
+    return new.fetch_historical_nse_data(symbols, start_date, end_date, as_frame=True, cache=cache,
+                                         provider=provider, retries=2, backoff=0.01, with_report=True)
+
+
+@pytest.fixture
+def cache():
+    cache = PriceCache(':memory:')
+    yield cache
+    cache.close()
+
+
+def test_holiday_gap_is_cached_after_one_download(cache):
+    # 2024-03-29 (Good Friday) had no session
+    provider = GappyProvider(holidays=['2024-03-29'])
+    fetch(provider, cache, ['AAA', 'BBB'], '2024-03-28')
+    provider.calls.clear()
+    fetch(provider, cache, ['AAA', 'BBB'], '2024-03-29')
+    assert len(provider.calls) == 1
+    assert cache.missing_ranges('AAA', '2024-01-01', '2024-03-29') == []
+    provider.calls.clear()
+    fetch(provider, cache, ['AAA', 'BBB'], '2024-03-29')
+    assert provider.calls == []
+
+
+def test_failed_symbol_on_a_trading_day_is_retried(cache):
+    provider = GappyProvider()
+    fetch(provider, cache, ['AAA', 'BBB'], '2024-03-28')
+    provider.failing = {'BBB'}
+    _, report = fetch(provider, cache, ['AAA', 'BBB'], '2024-03-29')
+    assert report['BBB']['status'] == 'missing'
+    assert cache.missing_ranges('AAA', '2024-01-01', '2024-03-29') == []
+    assert [str(day) for gap in cache.missing_ranges('BBB', '2024-01-01', '2024-03-29') for day in gap] == \
+        ['2024-03-29', '2024-03-29']
+    provider.failing = set()
+    provider.calls.clear()
+    data, report = fetch(provider, cache, ['AAA', 'BBB'], '2024-03-29')
+    assert [tickers for tickers, _, _ in provider.calls] == [['BBB.NS']]
+    assert str(data['BBB']['date'][-1]) == '2024-03-29'
+
+
+def test_empty_gap_without_evidence_is_not_cached(cache):
+    provider = GappyProvider(holidays=['2024-03-29'])
+    fetch(provider, cache, ['AAA'], '2024-03-28')
+    # The only symbol failed, so the empty day proves nothing
+    provider.failing = {'AAA'}
+    fetch(provider, cache, ['AAA'], '2024-03-29')
+    assert cache.missing_ranges('AAA', '2024-01-01', '2024-03-29') != []
+
+
+def test_failed_symbol_in_a_long_download_is_missing_and_uncovered(cache):
+    provider = GappyProvider(failing={'BBB'})
+    data, report = fetch(provider, cache, ['AAA', 'BBB'], '2024-03-28')
+    assert report['BBB']['status'] == 'missing'
+    assert report['BBB']['attempts'] == 3
+    assert data.symbols == ['AAA']
+    assert cache.missing_ranges('BBB', '2024-01-01', '2024-03-28') != []
+
+
+def test_small_cache_returns_every_symbol_of_a_request():
+    cache = PriceCache(':memory:', max_bytes=64 * 1024)
+    symbols = [f"S{i:02d}" for i in range(20)]
+    data, report = fetch(GappyProvider(), cache, symbols, '2024-12-31')
+    assert data.symbols == symbols
+    assert all(entry['bars'] > 200 for entry in report.values())
+    # Eviction still runs once the request is done, starting with the least recently used symbol
+    assert cache.missing_ranges('S00', '2024-01-01', '2024-12-31') != []
+    cache.close()
+
+
+def test_in_use_symbols_are_not_evicted():
+    cache = PriceCache(':memory:')
+    provider = GappyProvider()
+    fetch(provider, cache, ['AAA', 'BBB', 'CCC'], '2024-12-31')
+    with cache.in_use(['AAA']):
+        evicted = cache.evict(0)
+    assert 'AAA' not in evicted and len(evicted) == 1
+    assert cache.load('AAA', '2024-01-01', '2024-12-31')['date'].size > 200
+    cache.close()
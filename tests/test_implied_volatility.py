@@ -0,0 +1,32 @@
+"""
+Implied volatility: solved contracts reprice exactly, everything else is NaN.
+"""
+import numpy as np
+
+from options import DEFAULT_RATE, analyze_chains, black_scholes, implied_volatility, synthetic_chain
+
+
+def test_solved_contracts_reprice_to_tolerance():
+    spots = {'AAA': 2500.0, 'BBB': 87.5}
+    chain = synthetic_chain(spots, '2024-01-02', ['2024-01-25', '2024-03-28'], strikes_per_side=15)
+    contracts = analyze_chains(chain, spots, '2024-01-02')['contracts']
+    iv = contracts['implied_volatility']
+    solved = ~np.isnan(iv)
+    assert solved.any()
+    spot = np.array([spots[symbol] for symbol in contracts['symbol']])
+    repriced = black_scholes(spot[solved], contracts['strike'][solved], contracts['days_to_expiry'][solved] / 365,
+                             DEFAULT_RATE, iv[solved], contracts['option_type'][solved] == 'call')
+    np.testing.assert_allclose(repriced, contracts['price'][solved], atol=1e-7)
+
+
+def test_prices_outside_arbitrage_bounds_are_nan():
+    # Below intrinsic value, above the spot, and at expiry
+    iv = implied_volatility([4.0, 101.0, 10.0], 100, [95, 100, 100], [1.0, 1.0, 0.0], 0.0, True)
+    assert np.isnan(iv).all()
+
+
+def test_unconverged_contracts_are_nan():
+    # 99 for an at-the-money call on 100 needs a volatility far above the searched bounds
+    assert np.isnan(implied_volatility(99.0, 100, 100, 1.0, 0.0, True))
+    assert np.isnan(implied_volatility(10.0, 100, 100, 1.0, 0.0, True, max_iter=2))
+    assert np.isclose(implied_volatility(10.0, 100, 100, 1.0, 0.0, True), 0.2513, atol=1e-4)
@@ -0,0 +1,216 @@
+"""
+Parity of the rolling-window indicator kernels with the original list-slice implementations.
+"""
+import math
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+import new
+import sweep
+from priceframe import PriceFrame
+from rolling import rolling_mean, rolling_sum, wilder_mean
+from streaming import IndicatorState
+
+
+# Original implementations: re-sum a slice per bar
+
+def reference_sma(closes, short_window=20, long_window=50):
+    short_sma = [None] * len(closes)
+    long_sma = [None] * len(closes)
+    for i in range(len(closes)):
+        if i + 1 >= short_window:
+            short_sma[i] = sum(closes[i+1-short_window:i+1]) / short_window
+        if i + 1 >= long_window:
+            long_sma[i] = sum(closes[i+1-long_window:i+1]) / long_window
+    return short_sma, long_sma
+
+
+def reference_rsi(closes, period=14, overbought=70, oversold=30):
+    deltas = [closes[i] - closes[i-1] for i in range(1, len(closes))]
+    gains = [delta if delta > 0 else 0 for delta in deltas]
+    losses = [-delta if delta < 0 else 0 for delta in deltas]
+    rows = []
+    for i in range(period, len(closes)):
+        avg_gain = sum(gains[i-period:i]) / period
+        avg_loss = sum(losses[i-period:i]) / period
+        if avg_loss == 0:
+            rsi = 100
+        else:
+            rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+        signal = 1 if rsi <= oversold else -1 if rsi >= overbought else 0
+        rows.append((rsi, signal))
+    return rows
+
+
+def reference_atr(records, period=14):
+    tr_values = []
+    for i in range(1, len(records)):
+        high, low, prev_close = records[i]['high'], records[i]['low'], records[i-1]['close']
+        tr_values.append(max(high - low, abs(high - prev_close), abs(low - prev_close)))
+    rows = []
+    for i in range(period, len(records)):
+        atr = sum(tr_values[i-period:i]) / period
+        rows.append((atr, atr / records[i]['close'] * 100))
+    return rows
+
+
+def reference_mfi(records, period=14):
+    typical_prices = [(r['high'] + r['low'] + r['close']) / 3 for r in records]
+    money_flows = [tp * r['volume'] for tp, r in zip(typical_prices, records)]
+    rows = []
+    for i in range(period, len(records)):
+        period_tp = typical_prices[i-period:i]
+        period_mf = money_flows[i-period:i]
+        positive_flow = negative_flow = 0
+        for j in range(1, len(period_tp)):
+            if period_tp[j] > period_tp[j-1]:
+                positive_flow += period_mf[j]
+            else:
+                negative_flow += period_mf[j]
+        mfi = 100 if negative_flow == 0 else 100 - (100 / (1 + positive_flow / negative_flow))
+        rows.append((mfi, typical_prices[i], money_flows[i]))
+    return rows
+
+
+# Series
+
+def _records(closes, dates=None, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = dates or [(date(2020, 1, 1) + timedelta(days=i)).isoformat() for i in range(len(closes))]
+    spread = rng.uniform(0, 0.02, len(closes))
+    return [
+        {'symbol': 'TEST', 'date': d, 'close': c, 'high': c * (1 + s), 'low': c * (1 - s),
+         'volume': int(v)}
+        for d, c, s, v in zip(dates, closes, spread.tolist(), rng.integers(1_000, 100_000, len(closes)))
+    ]
+
+
+def _random_walk(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return (1000 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))).tolist()
+
+
+def _gapped_dates(n, seed=0):
+    # Trading days with weekends and random holidays missing
+    rng = np.random.default_rng(seed)
+    dates, day = [], date(2020, 1, 1)
+    while len(dates) < n:
+        if day.weekday() < 5 and rng.random() > 0.1:
+            dates.append(day.isoformat())
+        day += timedelta(days=1 + int(rng.integers(0, 3) == 0))
+    return dates
+
+
+def _flat_records(price, n=120):
+    return [{'symbol': 'TEST', 'date': (date(2020, 1, 1) + timedelta(days=i)).isoformat(), 'close': price,
+             'high': price, 'low': price, 'volume': 1000} for i in range(n)]
+
+
+SERIES = {
+    'random': _records(_random_walk(400, seed=1), seed=1),
+    'random_long': _records(_random_walk(2500, seed=2), seed=2),
+    'gapped': _records(_random_walk(300, seed=3), _gapped_dates(300, seed=3), seed=3),
+    'up_then_flat': _records([100.0 + i for i in range(40)] + [139.0] * 60, seed=4),
+    'short': _records(_random_walk(10, seed=5), seed=5),
+    'shorter_than_long_window': _records(_random_walk(30, seed=6), seed=6),
+    'flat': _flat_records(2500.35),
+    'flat_other': _flat_records(1234.56),
+}
+
+
+def _close(a, b):
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+
+
+@pytest.mark.parametrize('name', SERIES)
+def test_rsi_matches_reference(name):
+    records = SERIES[name]
+    expected = reference_rsi([r['close'] for r in records])
+    result = new.generate_rsi_signals(records)
+    assert len(result) == len(expected)
+    for row, (rsi, signal) in zip(result, expected):
+        assert _close(row['rsi'], rsi)
+        assert row['signal'] == signal
+
+
+@pytest.mark.parametrize('name', SERIES)
+def test_atr_matches_reference(name):
+    records = SERIES[name]
+    expected = reference_atr(records)
+    result = new.calculate_atr(records)['TEST']
+    assert [row['date'] for row in result] == [r['date'] for r in records[14:]]
+    for row, (atr, atr_percent) in zip(result, expected, strict=True):
+        assert _close(row['atr'], atr)
+        assert _close(row['atr_percent'], atr_percent)
+
+
+@pytest.mark.parametrize('name', SERIES)
+def test_mfi_matches_reference(name):
+    records = SERIES[name]
+    expected = reference_mfi(records)
+    result = new.calculate_money_flow_index(records)['TEST']
+    for row, (mfi, typical_price, money_flow) in zip(result, expected, strict=True):
+        assert _close(row['mfi'], mfi)
+        assert _close(row['typical_price'], typical_price)
+        assert _close(row['money_flow'], money_flow)
+
+
+@pytest.mark.parametrize('name', SERIES)
+def test_sma_matches_reference(name):
+    records = SERIES[name]
+    short_sma, long_sma = reference_sma([r['close'] for r in records])
+    result = new.generate_moving_average_signals(records)
+    assert len(result) == len(records)
+    for row, s_sma, l_sma in zip(result, short_sma, long_sma):
+        for value, expected in ((row['short_sma'], s_sma), (row['long_sma'], l_sma)):
+            assert (value is None) == (expected is None)
+            if expected is not None:
+                assert _close(value, expected)
+        if s_sma is None or l_sma is None or abs(s_sma - l_sma) <= new.SMA_TIE_TOLERANCE * abs(l_sma):
+            # No crossover; the reference's slice sums can differ by rounding here, which is not a signal
+            assert row['signal'] == 0
+        else:
+            assert row['signal'] == (1 if s_sma > l_sma else -1)
+
+
+@pytest.mark.parametrize('price', [2500.35, 1234.56, 0.07, 99999.99])
+def test_flat_series_has_no_crossovers(price):
+    assert all(row['signal'] == 0 for row in new.generate_moving_average_signals(_flat_records(price)))
+    assert all(row['signal'] == -1 and row['rsi'] == 100 for row in new.generate_rsi_signals(_flat_records(price)))
+
+
+def test_rolling_sum_of_zero_window_is_exact():
+    values = [0.1, 0.2, 0.3] + [0.0] * 5
+    assert rolling_sum(values, 3)[-1] == 0.0
+    assert rolling_mean(values, 5)[-1] == 0.0
+
+
+def test_wilder_mean_matches_recursive_definition():
+    values = _random_walk(200, seed=7)
+    expected = [sum(values[:14]) / 14]
+    for value in values[14:]:
+        expected.append((expected[-1] * 13 + value) / 14)
+    np.testing.assert_allclose(wilder_mean(values, 14), expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize('name', SERIES)
+def test_streaming_sma_matches_batch(name):
+    records = SERIES[name]
+    state = IndicatorState('TEST')
+    streamed = [state.update(record) for record in records]
+    for row, batch in zip(streamed, new.generate_moving_average_signals(records), strict=True):
+        assert row['sma_signal'] == batch['signal']
+        for value, expected in ((row['short_sma'], batch['short_sma']), (row['long_sma'], batch['long_sma'])):
+            assert (value is None) == (expected is None)
+            if expected is not None:
+                assert _close(value, expected)
+
+
+@pytest.mark.parametrize('price', [2500.35, 1234.56, 0.07])
+def test_sweep_flat_series_has_no_sma_trades(price):
+    frame = PriceFrame.from_records(_flat_records(price, n=200))
+    result = sweep.evaluate_combo(sweep.prepare_prices(frame), 'sma', {'short_window': 20, 'long_window': 50})
+    assert result['n_trades'] == 0
+    assert result['turnover'] == 0
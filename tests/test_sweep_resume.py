@@ -0,0 +1,103 @@
+"""
+Resumable parameter sweeps: an interrupted sweep picks up from its checkpoint.
+"""
+import json
+
+import pytest
+
+import new
+import sweep
+from providers import create_provider
+
+
+GRID = {'period': [7, 14, 21], 'overbought': [65, 70, 75], 'oversold': [25, 30]}
+
+
+@pytest.fixture(scope='module')
+def frame():
+    return new.fetch_historical_nse_data([f"S{i}" for i in range(8)], '2022-01-01', '2023-12-31',
+                                         as_frame=True, provider=create_provider('synthetic', seed=3))
+
+
+def test_interrupted_sweep_resumes_to_same_table(frame, tmp_path, monkeypatch):
+    expected = sweep.run_sweep(frame, 'rsi', GRID, max_workers=0, chunk_size=2, cost_bps=5)
+    checkpoint = tmp_path / 'sweep.jsonl'
+
+    evaluate = sweep.evaluate_combo
+    calls = []
+
+    def interrupted(*args, **kwargs):
+        calls.append(1)
+        if len(calls) > 7:
+            raise KeyboardInterrupt
+        return evaluate(*args, **kwargs)
+
+    monkeypatch.setattr(sweep, 'evaluate_combo', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        sweep.run_sweep(frame, 'rsi', GRID, checkpoint_path=str(checkpoint), max_workers=0, chunk_size=2,
+                        cost_bps=5)
+    monkeypatch.setattr(sweep, 'evaluate_combo', evaluate)
+    lines = checkpoint.read_text().splitlines()
+    # Header plus the three chunks finished before the interruption
+    assert len(lines) == 1 + 6
+
+    calls.clear()
+    monkeypatch.setattr(sweep, 'evaluate_combo', lambda *a, **k: calls.append(1) or evaluate(*a, **k))
+    resumed = sweep.run_sweep(frame, 'rsi', GRID, checkpoint_path=str(checkpoint), max_workers=0, chunk_size=2,
+                              cost_bps=5)
+    assert len(calls) == len(expected) - 6
+    assert resumed == expected
+
+
+@pytest.mark.parametrize('change', [
+    {'strategy': 'sma', 'grid': {'short_window': [5], 'long_window': [20]}},
+    {'symbols': ['S1']},
+    {'cost_bps': 50},
+])
+def test_resuming_a_different_sweep_raises(frame, tmp_path, change):
+    checkpoint = str(tmp_path / 'sweep.jsonl')
+    sweep.run_sweep(frame, 'rsi', GRID, checkpoint_path=checkpoint, max_workers=0, cost_bps=5)
+    kwargs = {'strategy': 'rsi', 'grid': GRID, 'cost_bps': 5, **change}
+    with pytest.raises(ValueError, match='different sweep'):
+        sweep.run_sweep(frame, kwargs.pop('strategy'), kwargs.pop('grid'), checkpoint_path=checkpoint,
+                        max_workers=0, **kwargs)
+
+
+def test_checkpoint_header_records_the_sweep(frame, tmp_path):
+    checkpoint = tmp_path / 'sweep.jsonl'
+    sweep.run_sweep(frame, 'rsi', GRID, symbols=['S2', 'S1'], checkpoint_path=str(checkpoint), max_workers=0,
+                    slippage_bps=2)
+    header = json.loads(checkpoint.read_text().splitlines()[0])['sweep']
+    assert header['strategy'] == 'rsi'
+    assert header['symbols'] == ['S1', 'S2']
+    assert header['backtest_options'] == {'slippage_bps': 2}
+
+
+@pytest.mark.parametrize('cut', [1, 10, -1])
+def test_resume_drops_a_truncated_last_line(frame, tmp_path, cut):
+    expected = sweep.run_sweep(frame, 'rsi', GRID, max_workers=0, cost_bps=5)
+    checkpoint = tmp_path / 'sweep.jsonl'
+    sweep.run_sweep(frame, 'rsi', GRID, checkpoint_path=str(checkpoint), max_workers=0, cost_bps=5)
+    lines = checkpoint.read_text().splitlines(keepends=True)
+    # Killed while writing the fifth row: keep part of it (cut=-1 loses only the newline)
+    checkpoint.write_text(''.join(lines[:5]) + lines[5][:cut])
+    resumed = sweep.run_sweep(frame, 'rsi', GRID, checkpoint_path=str(checkpoint), max_workers=0, cost_bps=5)
+    assert resumed == expected
+    assert len(checkpoint.read_text().splitlines()) == 1 + len(expected)
+
+
+def test_truncated_header_starts_a_new_checkpoint(frame, tmp_path):
+    checkpoint = tmp_path / 'sweep.jsonl'
+    checkpoint.write_text('{"sweep": {"strat')
+    rows = sweep.run_sweep(frame, 'rsi', GRID, checkpoint_path=str(checkpoint), max_workers=0)
+    assert json.loads(checkpoint.read_text().splitlines()[0])['sweep']['strategy'] == 'rsi'
+    assert len(checkpoint.read_text().splitlines()) == 1 + len(rows)
+
+
+def test_malformed_line_before_the_end_raises(frame, tmp_path):
+    checkpoint = tmp_path / 'sweep.jsonl'
+    sweep.run_sweep(frame, 'rsi', GRID, checkpoint_path=str(checkpoint), max_workers=0)
+    lines = checkpoint.read_text().splitlines(keepends=True)
+    checkpoint.write_text(''.join(lines[:3]) + '{"period": 7,\n' + ''.join(lines[3:]))
+    with pytest.raises(ValueError, match='malformed line 4'):
+        sweep.run_sweep(frame, 'rsi', GRID, checkpoint_path=str(checkpoint), max_workers=0)